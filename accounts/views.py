@@ -8,7 +8,8 @@ from django.urls import reverse
 from django.conf import settings
 from .models import CustomUser, OTPToken
 from .forms import RegisterForm, LoginForm, OTPRequestForm, OTPLoginForm, EmailConfirmationForm
-from core.email_service import send_email
+from core.models import EmailOutbox
+from core.services.outbox import queue_template_email
 
 
 def register(request):
@@ -250,85 +251,49 @@ def request_otp(request):
 
 # Email sending functions
 
-def send_welcome_email(user, otp):
-    """Send welcome email with email confirmation OTP"""
-    confirmation_link = f"{settings.ALLOWED_HOSTS[0] if settings.ALLOWED_HOSTS else 'http://127.0.0.1:8000'}/accounts/email-confirmation/?email={user.email}&otp={otp.otp_code}"
-    
-    subject = 'Welcome to Lwazi Blue - Confirm Your Email'
-    message = f"""
-Hello {user.username},
-
-Welcome to Lwazi Blue! We're excited to have you on board.
-
-To complete your registration, please confirm your email address using one of the following methods:
-
-Method 1: Click the link below
-{confirmation_link}
-
-Method 2: Enter this code on the confirmation page
-Your confirmation code: {otp.otp_code}
-
-This code will expire in 10 minutes.
+def _confirmation_link(user, otp):
+    host = settings.ALLOWED_HOSTS[0] if settings.ALLOWED_HOSTS else 'http://127.0.0.1:8000'
+    return f"{host}/accounts/email-confirmation/?email={user.email}&otp={otp.otp_code}"
 
-If you didn't create this account, please ignore this email.
 
-Best regards,
-The Lwazi Blue Team
-    """
-    
-    # Send email using custom smtplib service (non-blocking)
+def send_welcome_email(user, otp):
+    """Send welcome email with email confirmation OTP"""
+    # Queued ahead of notification email
     try:
-        send_email(user.email, subject, message, message)
+        queue_template_email(
+            user.email,
+            'Welcome to Lwazi Blue - Confirm Your Email',
+            'emails/account_welcome.html',
+            {'user': user, 'otp_code': otp.otp_code, 'confirmation_link': _confirmation_link(user, otp)},
+            priority=EmailOutbox.PRIORITY_HIGH
+        )
     except Exception as e:
         print(f"⚠️  Email sending failed (non-critical): {e}")
 
 
 def send_confirmation_email(user, otp):
     """Send email confirmation OTP (for resending)"""
-    confirmation_link = f"{settings.ALLOWED_HOSTS[0] if settings.ALLOWED_HOSTS else 'http://127.0.0.1:8000'}/accounts/email-confirmation/?email={user.email}&otp={otp.otp_code}"
-    
-    subject = 'Lwazi Blue - Email Confirmation Code'
-    message = f"""
-Hello {user.username},
-
-Your email confirmation code is: {otp.otp_code}
-
-Or click this link to confirm automatically:
-{confirmation_link}
-
-This code will expire in 10 minutes.
-
-If you didn't request this, please ignore this email.
-
-Best regards,
-The Lwazi Blue Team
-    """
-    
-    # Send email using custom smtplib service (non-blocking)
     try:
-        send_email(user.email, subject, message, message)
+        queue_template_email(
+            user.email,
+            'Lwazi Blue - Email Confirmation Code',
+            'emails/confirmation_code.html',
+            {'user': user, 'otp_code': otp.otp_code, 'confirmation_link': _confirmation_link(user, otp)},
+            priority=EmailOutbox.PRIORITY_HIGH
+        )
     except Exception as e:
         print(f"⚠️  Email sending failed (non-critical): {e}")
 
 
 def send_otp_login_email(user, otp):
     """Send OTP for passwordless login"""
-    subject = 'Lwazi Blue - Your Login Code'
-    message = f"""
-Hello {user.username},
-
-Your login code is: {otp.otp_code}
-
-This code will expire in 10 minutes.
-
-If you didn't request this code, please ignore this email and ensure your account is secure.
-
-Best regards,
-The Lwazi Blue Team
-    """
-    
-    # Send email using custom smtplib service (non-blocking)
     try:
-        send_email(user.email, subject, message, message)
+        queue_template_email(
+            user.email,
+            'Lwazi Blue - Your Login Code',
+            'emails/login_code.html',
+            {'user': user, 'otp_code': otp.otp_code},
+            priority=EmailOutbox.PRIORITY_HIGH
+        )
     except Exception as e:
         print(f"⚠️  Email sending failed (non-critical): {e}")
@@ -1,5 +1,8 @@
 from django.contrib import admin
-from .models import Application
+from .models import (
+    Application, ApplicationStatusEvent, ApplicationFunnelDaily, InternshipStatusCount, InternStatusCount
+)
+from .services import ApplicationService
 
 
 @admin.register(Application)
@@ -55,18 +58,58 @@ class ApplicationAdmin(admin.ModelAdmin):
     
     def mark_as_success(self, request, queryset):
         """Bulk accept applications"""
-        updated = queryset.filter(status='pending').update(status='success')
+        updated = len(ApplicationService.bulk_update_status(
+            queryset.filter(status='pending'), 'success', changed_by=request.user
+        ))
         self.message_user(request, f'{updated} application(s) marked as accepted.')
     mark_as_success.short_description = 'Mark selected as Accepted'
     
     def mark_as_declined(self, request, queryset):
         """Bulk decline applications"""
-        updated = queryset.filter(status='pending').update(status='declined')
+        updated = len(ApplicationService.bulk_update_status(
+            queryset.filter(status='pending'), 'declined', changed_by=request.user
+        ))
         self.message_user(request, f'{updated} application(s) marked as declined.')
     mark_as_declined.short_description = 'Mark selected as Declined'
     
     def mark_as_interview_pending(self, request, queryset):
         """Bulk schedule interviews"""
-        updated = queryset.filter(status='pending').update(status='interview_pending')
+        updated = len(ApplicationService.bulk_update_status(
+            queryset.filter(status='pending'), 'interview_pending', changed_by=request.user
+        ))
         self.message_user(request, f'{updated} application(s) marked for interview.')
     mark_as_interview_pending.short_description = 'Schedule Interview for selected'
+
+
+@admin.register(ApplicationStatusEvent)
+class ApplicationStatusEventAdmin(admin.ModelAdmin):
+    list_display = ['application', 'internship', 'from_status', 'status', 'changed_by', 'created_at']
+    list_filter = ['status', 'created_at']
+    search_fields = ['internship__title', 'application__intern__user__username']
+    readonly_fields = ['application', 'internship', 'from_status', 'status', 'changed_by', 'created_at']
+    date_hierarchy = 'created_at'
+
+
+@admin.register(ApplicationFunnelDaily)
+class ApplicationFunnelDailyAdmin(admin.ModelAdmin):
+    list_display = ['date', 'employer', 'status', 'count']
+    list_filter = ['status', 'date']
+    search_fields = ['employer__company_name']
+    readonly_fields = ['date', 'employer', 'status', 'count']
+    date_hierarchy = 'date'
+
+
+@admin.register(InternshipStatusCount)
+class InternshipStatusCountAdmin(admin.ModelAdmin):
+    list_display = ['internship', 'status', 'count']
+    list_filter = ['status']
+    search_fields = ['internship__title']
+    readonly_fields = ['internship', 'status', 'count']
+
+
+@admin.register(InternStatusCount)
+class InternStatusCountAdmin(admin.ModelAdmin):
+    list_display = ['intern', 'status', 'count']
+    list_filter = ['status']
+    search_fields = ['intern__user__username', 'intern__full_name']
+    readonly_fields = ['intern', 'status', 'count']
@@ -65,3 +65,21 @@ class ApplicationStatusForm(forms.ModelForm):
         self.fields['employer_notes'].help_text = 'Internal notes (not visible to applicant)'
         self.fields['employer_notes'].required = False
 
+
+class BulkApplicationStatusForm(forms.Form):
+    """Form for employers to move several selected applicants to one status"""
+    applications = forms.ModelMultipleChoiceField(
+        queryset=Application.objects.none(),
+        widget=forms.MultipleHiddenInput
+    )
+    status = forms.ChoiceField(
+        choices=Application.STATUS_CHOICES,
+        widget=forms.Select(attrs={
+            'class': 'form-select form-select-sm'
+        })
+    )
+    
+    def __init__(self, internship, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # Only applications to this employer's posting can be selected
+        self.fields['applications'].queryset = Application.objects.filter(internship=internship)
@@ -0,0 +1,42 @@
+"""
+Management command to materialize daily application funnel counts per employer
+"""
+
+from datetime import date, timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+from applications.models import ApplicationFunnelDaily
+
+
+class Command(BaseCommand):
+    help = 'Roll ApplicationStatusEvent rows up into ApplicationFunnelDaily (schedule daily, just after midnight)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--days',
+            type=int,
+            default=2,
+            help='Rebuild this many days ending today (default: 2, so yesterday is finalized)'
+        )
+        parser.add_argument(
+            '--since',
+            type=date.fromisoformat,
+            default=None,
+            help='Rebuild every day from this date (YYYY-MM-DD) to today, e.g. for a backfill'
+        )
+
+    def handle(self, *args, **options):
+        end_date = timezone.localdate()
+        if options['since']:
+            start_date = options['since']
+        else:
+            if options['days'] < 1:
+                raise CommandError('--days must be at least 1')
+            start_date = end_date - timedelta(days=options['days'] - 1)
+        if start_date > end_date:
+            raise CommandError('--since is in the future')
+
+        self.stdout.write(f'Rolling up application funnel from {start_date} to {end_date}...')
+        rows = ApplicationFunnelDaily.rollup(start_date, end_date)
+        self.stdout.write(self.style.SUCCESS(f'>> Wrote {rows} funnel row(s)'))
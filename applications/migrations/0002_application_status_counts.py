@@ -0,0 +1,56 @@
+# Generated by Django 4.2.8 on 2026-10-19 01:37
+
+from django.db import migrations, models
+import django.db.models.deletion
+from django.db.models import Count
+
+
+def backfill_status_counts(apps, schema_editor):
+    Application = apps.get_model('applications', 'Application')
+    for model_name, owner_column in (('InternshipStatusCount', 'internship_id'), ('InternStatusCount', 'intern_id')):
+        counter = apps.get_model('applications', model_name)
+        counts = Application.objects.order_by().values(owner_column, 'status').annotate(total=Count('pk'))
+        counter.objects.bulk_create(
+            [counter(**{owner_column: row[owner_column], 'status': row['status'], 'count': row['total']}) for row in counts],
+            batch_size=1000
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0008_emailoutbox_retries'),
+        ('applications', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='InternStatusCount',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('status', models.CharField(choices=[('pending', 'Pending Review'), ('success', 'Accepted'), ('declined', 'Declined'), ('interview_pending', 'Interview Scheduled'), ('interview_success', 'Interview Passed'), ('interview_unsuccess', 'Interview Failed'), ('pending_final_decision', 'Pending Final Decision')], max_length=30)),
+                ('count', models.PositiveIntegerField(default=0)),
+                ('intern', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='application_status_counts', to='core.internprofile')),
+            ],
+            options={
+                'verbose_name': 'Intern Status Count',
+                'verbose_name_plural': 'Intern Status Counts',
+                'unique_together': {('intern', 'status')},
+            },
+        ),
+        migrations.CreateModel(
+            name='InternshipStatusCount',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('status', models.CharField(choices=[('pending', 'Pending Review'), ('success', 'Accepted'), ('declined', 'Declined'), ('interview_pending', 'Interview Scheduled'), ('interview_success', 'Interview Passed'), ('interview_unsuccess', 'Interview Failed'), ('pending_final_decision', 'Pending Final Decision')], max_length=30)),
+                ('count', models.PositiveIntegerField(default=0)),
+                ('internship', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='status_counts', to='core.internshippost')),
+            ],
+            options={
+                'verbose_name': 'Internship Status Count',
+                'verbose_name_plural': 'Internship Status Counts',
+                'unique_together': {('internship', 'status')},
+            },
+        ),
+        migrations.RunPython(backfill_status_counts, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,34 @@
+# Generated by Django 4.2.8 on 2026-10-19 01:40
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('core', '0008_emailoutbox_retries'),
+        ('applications', '0002_application_status_counts'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ApplicationStatusEvent',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('from_status', models.CharField(blank=True, choices=[('pending', 'Pending Review'), ('success', 'Accepted'), ('declined', 'Declined'), ('interview_pending', 'Interview Scheduled'), ('interview_success', 'Interview Passed'), ('interview_unsuccess', 'Interview Failed'), ('pending_final_decision', 'Pending Final Decision')], max_length=30)),
+                ('status', models.CharField(choices=[('pending', 'Pending Review'), ('success', 'Accepted'), ('declined', 'Declined'), ('interview_pending', 'Interview Scheduled'), ('interview_success', 'Interview Passed'), ('interview_unsuccess', 'Interview Failed'), ('pending_final_decision', 'Pending Final Decision')], max_length=30)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('application', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='status_events', to='applications.application')),
+                ('changed_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='application_status_events', to=settings.AUTH_USER_MODEL)),
+                ('internship', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='application_status_events', to='core.internshippost')),
+            ],
+            options={
+                'verbose_name': 'Application Status Event',
+                'verbose_name_plural': 'Application Status Events',
+                'ordering': ['-created_at'],
+            },
+        ),
+    ]
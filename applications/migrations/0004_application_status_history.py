@@ -0,0 +1,76 @@
+# Generated by Django 4.2.8 on 2026-10-19 01:42
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def backfill_status_events(apps, schema_editor):
+    """Seed history for applications from before events were recorded"""
+    Application = apps.get_model('applications', 'Application')
+    ApplicationStatusEvent = apps.get_model('applications', 'ApplicationStatusEvent')
+    submitted = set(ApplicationStatusEvent.objects.filter(from_status='').values_list('application_id', flat=True))
+    with_events = set(ApplicationStatusEvent.objects.values_list('application_id', flat=True))
+
+    events = []
+    for application in Application.objects.order_by('pk').iterator(chunk_size=2000):
+        if application.pk not in submitted:
+            events.append(ApplicationStatusEvent(
+                application_id=application.pk, internship_id=application.internship_id,
+                from_status='', status='pending', created_at=application.applied_at
+            ))
+        # Only the latest transition is known: the current status and when it was set
+        if application.pk not in with_events and application.status != 'pending':
+            events.append(ApplicationStatusEvent(
+                application_id=application.pk, internship_id=application.internship_id,
+                from_status='pending', status=application.status, created_at=application.status_updated_at
+            ))
+    ApplicationStatusEvent.objects.bulk_create(events, batch_size=1000)
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0008_emailoutbox_retries'),
+        ('applications', '0003_application_status_event'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ApplicationFunnelDaily',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('status', models.CharField(choices=[('pending', 'Pending Review'), ('success', 'Accepted'), ('declined', 'Declined'), ('interview_pending', 'Interview Scheduled'), ('interview_success', 'Interview Passed'), ('interview_unsuccess', 'Interview Failed'), ('pending_final_decision', 'Pending Final Decision')], max_length=30)),
+                ('count', models.PositiveIntegerField(default=0)),
+            ],
+            options={
+                'verbose_name': 'Application Funnel Day',
+                'verbose_name_plural': 'Application Funnel Days',
+                'ordering': ['-date', 'employer'],
+            },
+        ),
+        migrations.AlterField(
+            model_name='applicationstatusevent',
+            name='created_at',
+            field=models.DateTimeField(default=django.utils.timezone.now),
+        ),
+        migrations.AddIndex(
+            model_name='applicationstatusevent',
+            index=models.Index(fields=['internship', 'created_at'], name='application_interns_1fdb49_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='applicationstatusevent',
+            index=models.Index(fields=['status', 'created_at'], name='application_status_b6df84_idx'),
+        ),
+        migrations.AddField(
+            model_name='applicationfunneldaily',
+            name='employer',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='funnel_days', to='core.employerprofile'),
+        ),
+        migrations.AlterUniqueTogether(
+            name='applicationfunneldaily',
+            unique_together={('employer', 'date', 'status')},
+        ),
+        migrations.RunPython(backfill_status_events, migrations.RunPython.noop),
+    ]
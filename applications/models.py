@@ -1,8 +1,25 @@
-from django.db import models
+from django.db import models, transaction
+from django.conf import settings
+from django.db.models import DEFERRED, Count
+from django.db.models.functions import Greatest
 from django.utils import timezone
-from django.db.models.signals import post_save
+from django.db.models.signals import post_save, pre_save, pre_delete, post_delete
 from django.dispatch import receiver
-from core.models import InternshipPost, InternProfile, InternDocument
+from core.models import InternshipPost, InternProfile, EmployerProfile, InternDocument
+
+
+class ApplicationQuerySet(models.QuerySet):
+    """Reusable aggregates over applications"""
+    
+    def status_counts(self):
+        """
+        {status: count} for every status (zeros included) in one grouped query
+        """
+        counts = dict.fromkeys((code for code, label in Application.STATUS_CHOICES), 0)
+        counts.update(
+            self.order_by().values_list('status').annotate(total=Count('pk')).values_list('status', 'total')
+        )
+        return counts
 
 
 class Application(models.Model):
@@ -18,6 +35,7 @@ class Application(models.Model):
         ('interview_unsuccess', 'Interview Failed'),
         ('pending_final_decision', 'Pending Final Decision'),
     )
+    FINAL_STATUSES = ('success', 'declined', 'interview_unsuccess')
     
     internship = models.ForeignKey(
         InternshipPost,
@@ -54,6 +72,8 @@ class Application(models.Model):
         help_text='Internal notes from employer (not visible to intern)'
     )
     
+    objects = ApplicationQuerySet.as_manager()
+    
     class Meta:
         verbose_name = 'Application'
         verbose_name_plural = 'Applications'
@@ -64,12 +84,23 @@ class Application(models.Model):
             models.Index(fields=['intern', 'status']),
         ]
     
+    # Status as last saved, so the counters know what a save moved from
+    # (None for new applications, DEFERRED when it wasn't loaded)
+    _saved_status = None
+    
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._saved_status = values[field_names.index('status')] if 'status' in field_names else DEFERRED
+        return instance
+    
     def __str__(self):
         return f"{self.intern.user.username} → {self.internship.title} ({self.get_status_display()})"
     
-    def update_status(self, new_status, notes=''):
+    def update_status(self, new_status, notes='', changed_by=None):
         """Update application status and send notification"""
         old_status = self.status
+        self._changed_by = changed_by  # Recorded on the status event
         self.status = new_status
         self.status_updated_at = timezone.now()
         if notes:
@@ -96,92 +127,316 @@ class Application(models.Model):
     @property
     def can_update_status(self):
         """Check if status can still be updated"""
-        final_statuses = ['success', 'declined', 'interview_unsuccess']
-        return self.status not in final_statuses
+        return self.status not in self.FINAL_STATUSES
 
 
-@receiver(post_save, sender=Application)
-def send_application_notification(sender, instance, created, **kwargs):
+class ApplicationStatusEvent(models.Model):
     """
-    Send email notification when application is created or status changes
+    One status transition (append-only history)
+    
+    Written for every change: submission (from_status blank), single saves
+    and bulk transitions. Funnel and time-to-hire reports read these rows
+    or the daily rollup built from them, never the applications table.
     """
-    try:
-        from core.email_service import send_email
+    application = models.ForeignKey(
+        Application,
+        on_delete=models.CASCADE,
+        related_name='status_events'
+    )
+    # Denormalized so reports can filter by posting without joining applications
+    internship = models.ForeignKey(
+        InternshipPost,
+        on_delete=models.CASCADE,
+        related_name='application_status_events'
+    )
+    from_status = models.CharField(max_length=30, choices=Application.STATUS_CHOICES, blank=True)
+    status = models.CharField(max_length=30, choices=Application.STATUS_CHOICES)
+    changed_by = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='application_status_events'
+    )
+    # Not auto_now_add so history can be backfilled with the original times
+    created_at = models.DateTimeField(default=timezone.now)
+    
+    class Meta:
+        verbose_name = 'Application Status Event'
+        verbose_name_plural = 'Application Status Events'
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['internship', 'created_at']),
+            models.Index(fields=['status', 'created_at']),
+        ]
+    
+    def __str__(self):
+        return f"{self.application_id}: {self.from_status or '-'} → {self.status}"
+
+
+class ApplicationFunnelDaily(models.Model):
+    """
+    Transitions into each status per employer and day
+    
+    Materialized from ApplicationStatusEvent by the rollup_application_funnel
+    command, so analytics read a handful of rows per day instead of the
+    event log. 'pending' counts submissions.
+    """
+    employer = models.ForeignKey(
+        EmployerProfile,
+        on_delete=models.CASCADE,
+        related_name='funnel_days'
+    )
+    date = models.DateField()
+    status = models.CharField(max_length=30, choices=Application.STATUS_CHOICES)
+    count = models.PositiveIntegerField(default=0)
+    
+    class Meta:
+        verbose_name = 'Application Funnel Day'
+        verbose_name_plural = 'Application Funnel Days'
+        ordering = ['-date', 'employer']
+        unique_together = ['employer', 'date', 'status']
+    
+    def __str__(self):
+        return f"{self.employer_id} {self.date} {self.status}: {self.count}"
+    
+    @classmethod
+    def rollup(cls, start_date, end_date):
+        """
+        Rebuild the rows for start_date..end_date (inclusive) from the events
+        Idempotent, so late events are picked up by re-running a day
+        Returns the number of rows written
+        """
+        from django.db import transaction
+        from django.db.models.functions import TruncDate
         
-        if created:
-            # Send confirmation email to intern
-            subject = f'Application Submitted - {instance.internship.title}'
-            message = f"""
-Hello {instance.intern.user.username},
+        counts = ApplicationStatusEvent.objects.filter(
+            created_at__date__gte=start_date,
+            created_at__date__lte=end_date
+        ).annotate(day=TruncDate('created_at')).order_by().values(
+            'internship__employer_id', 'day', 'status'
+        ).annotate(total=Count('pk'))
+        
+        rows = [
+            cls(employer_id=row['internship__employer_id'], date=row['day'],
+                status=row['status'], count=row['total'])
+            for row in counts
+        ]
+        with transaction.atomic():
+            cls.objects.filter(date__gte=start_date, date__lte=end_date).delete()
+            cls.objects.bulk_create(rows, batch_size=1000)
+        return len(rows)
+    
+    @classmethod
+    def funnel_for(cls, employer, start_date, end_date):
+        """{status: count} of transitions for an employer over a date range, zeros included"""
+        funnel = dict.fromkeys((code for code, label in Application.STATUS_CHOICES), 0)
+        funnel.update(
+            cls.objects.filter(
+                employer=employer, date__gte=start_date, date__lte=end_date
+            ).order_by().values_list('status').annotate(total=models.Sum('count')).values_list('status', 'total')
+        )
+        return funnel
 
-Your application for "{instance.internship.title}" at {instance.internship.employer.company_name} has been successfully submitted.
 
-Application Details:
-- Position: {instance.internship.title}
-- Company: {instance.internship.employer.company_name}
-- Location: {instance.internship.municipality}, {instance.internship.province}
-- Applied on: {instance.applied_at.strftime('%B %d, %Y at %I:%M %p')}
+class ApplicationStatusCount(models.Model):
+    """
+    Denormalized pipeline counts: one row per owner and status
+    
+    Moved by the Application signals (and rebuilt after bulk updates), so
+    a posting's or intern's status breakdown is a single indexed read.
+    """
+    owner_field = None
+    
+    status = models.CharField(max_length=30, choices=Application.STATUS_CHOICES)
+    count = models.PositiveIntegerField(default=0)
+    
+    class Meta:
+        abstract = True
+    
+    @classmethod
+    def bump(cls, owner_id, status, delta):
+        """Atomically move one counter, creating the row on first increment"""
+        rows = cls.objects.filter(**{f'{cls.owner_field}_id': owner_id, 'status': status})
+        updated = rows.update(count=Greatest(models.F('count') + delta, models.Value(0)))
+        if not updated and delta > 0:
+            cls.objects.bulk_create(
+                [cls(**{f'{cls.owner_field}_id': owner_id, 'status': status})],
+                ignore_conflicts=True
+            )
+            rows.update(count=models.F('count') + delta)
+    
+    @classmethod
+    def counts_for(cls, owner_id):
+        """{status: count} for one owner, zeros included"""
+        counts = dict.fromkeys((code for code, label in Application.STATUS_CHOICES), 0)
+        counts.update(cls.objects.filter(**{f'{cls.owner_field}_id': owner_id}).values_list('status', 'count'))
+        return counts
+    
+    @classmethod
+    def recompute(cls, owner_ids):
+        """
+        Rebuild the counters of the given owners from Application rows (repair task)
+        Delete and re-create in one transaction, so readers never see the
+        counters missing and a failure leaves the old ones in place
+        """
+        owner_ids = set(owner_ids)
+        owner_column = f'{cls.owner_field}_id'
+        with transaction.atomic():
+            cls.objects.filter(**{f'{owner_column}__in': owner_ids}).delete()
+            counts = Application.objects.filter(**{f'{owner_column}__in': owner_ids}).order_by().values(
+                owner_column, 'status'
+            ).annotate(total=Count('pk'))
+            cls.objects.bulk_create([
+                cls(**{owner_column: row[owner_column], 'status': row['status'], 'count': row['total']})
+                for row in counts
+            ])
+        return len(owner_ids)
 
-You will receive an email notification when the employer reviews your application.
 
-You can track your application status in your dashboard.
+class InternshipStatusCount(ApplicationStatusCount):
+    """Applications per status for one internship posting"""
+    owner_field = 'internship'
+    
+    internship = models.ForeignKey(
+        InternshipPost,
+        on_delete=models.CASCADE,
+        related_name='status_counts'
+    )
+    
+    class Meta:
+        verbose_name = 'Internship Status Count'
+        verbose_name_plural = 'Internship Status Counts'
+        unique_together = ['internship', 'status']
+    
+    def __str__(self):
+        return f"{self.internship_id} {self.status}: {self.count}"
 
-Good luck!
 
-Best regards,
-The Lwazi Blue Team
-            """
-            
-            # Send email using custom smtplib service (non-blocking)
-            try:
-                send_email(instance.intern.user.email, subject, message, message)
-            except Exception as e:
-                print(f"⚠️  Email notification failed (non-critical): {e}")
-            
-            # Notify employer
-            employer_subject = f'New Application - {instance.internship.title}'
-            employer_message = f"""
-Hello {instance.internship.employer.user.username},
+class InternStatusCount(ApplicationStatusCount):
+    """Applications per status for one intern"""
+    owner_field = 'intern'
+    
+    intern = models.ForeignKey(
+        InternProfile,
+        on_delete=models.CASCADE,
+        related_name='application_status_counts'
+    )
+    
+    class Meta:
+        verbose_name = 'Intern Status Count'
+        verbose_name_plural = 'Intern Status Counts'
+        unique_together = ['intern', 'status']
+    
+    def __str__(self):
+        return f"{self.intern_id} {self.status}: {self.count}"
 
-You have received a new application for "{instance.internship.title}".
 
-Applicant: {instance.intern.full_name or instance.intern.user.username}
-Applied on: {instance.applied_at.strftime('%B %d, %Y at %I:%M %p')}
+def recompute_status_counts(owners):
+    """
+    Rebuild both counters after a bulk update that skipped the signals
+    owners: (internship_id, intern_id) pairs read before the update
+    """
+    owners = list(owners)
+    InternshipStatusCount.recompute(internship_id for internship_id, intern_id in owners)
+    InternStatusCount.recompute(intern_id for internship_id, intern_id in owners)
 
-Log in to your dashboard to review the application and update its status.
 
-Best regards,
-The Lwazi Blue Team
-            """
-            
-            # Send email using custom smtplib service (non-blocking)
-            try:
-                send_email(instance.internship.employer.user.email, employer_subject, employer_message, employer_message)
-            except Exception as e:
-                print(f"⚠️  Email notification failed (non-critical): {e}")
-        
-        else:
-            # Status changed - notify intern
-            subject = f'Application Status Update - {instance.internship.title}'
-            message = f"""
-Hello {instance.intern.user.username},
+@receiver(pre_save, sender=Application)
+def read_deferred_status(sender, instance, **kwargs):
+    """Loaded with status deferred (.only()/.defer()): read the stored status before it is overwritten"""
+    if instance._saved_status is DEFERRED:
+        instance._saved_status = Application.objects.filter(pk=instance.pk).values_list('status', flat=True).first()
+
+
+@receiver(post_save, sender=Application)
+def record_status_change(sender, instance, created, **kwargs):
+    """Log the transition and move the pipeline counters when an application is created or changes status"""
+    old_status = None if created else instance._saved_status
+    if old_status == instance.status:
+        return
+    ApplicationStatusEvent.objects.create(
+        application=instance,
+        internship_id=instance.internship_id,
+        from_status=old_status or '',
+        status=instance.status,
+        changed_by=getattr(instance, '_changed_by', None)
+    )
+    for counter, owner_id in ((InternshipStatusCount, instance.internship_id),
+                              (InternStatusCount, instance.intern_id)):
+        if old_status:
+            counter.bump(owner_id, old_status, -1)
+        counter.bump(owner_id, instance.status, 1)
+    instance._saved_status = instance.status
+
 
-Your application status for "{instance.internship.title}" at {instance.internship.employer.company_name} has been updated.
+@receiver(pre_delete, sender=Application)
+def read_stored_status(sender, instance, **kwargs):
+    """The in-memory status may be stale (bulk updates), so count the stored one"""
+    instance._saved_status = Application.objects.filter(pk=instance.pk).values_list('status', flat=True).first()
 
-New Status: {instance.get_status_display()}
-Updated on: {instance.status_updated_at.strftime('%B %d, %Y at %I:%M %p')}
 
-Log in to your dashboard to view details.
+@receiver(post_delete, sender=Application)
+def release_status_counts(sender, instance, **kwargs):
+    """Deleted applications leave the pipeline"""
+    if instance._saved_status:
+        InternshipStatusCount.bump(instance.internship_id, instance._saved_status, -1)
+        InternStatusCount.bump(instance.intern_id, instance._saved_status, -1)
 
-Best regards,
-The Lwazi Blue Team
-            """
+
+@receiver(post_save, sender=Application)
+@receiver(post_delete, sender=Application)
+def invalidate_dashboards(sender, instance, **kwargs):
+    """Both the intern's and the employer's dashboard summaries list applications"""
+    from core.services.dashboard import invalidate_employer_dashboards, invalidate_intern_dashboards
+    invalidate_intern_dashboards([instance.intern_id])
+    invalidate_employer_dashboards(internship_ids=[instance.internship_id])
+
+
+@receiver(post_save, sender=Application)
+def send_application_notification(sender, instance, created, **kwargs):
+    """
+    Send email notification when application is created or status changes
+    Each email follows the recipient's preferences (immediate or digest)
+    """
+    try:
+        from notifications.services import NotificationService
+        link = f'/applications/{instance.pk}/'
+        internship = instance.internship
+        intern_user = instance.intern.user
+        context = {
+            'application': instance,
+            'internship': internship,
+            'intern_user': intern_user,
+        }
+        
+        if created:
+            # Send confirmation email to intern
+            NotificationService.send_email_notification(
+                intern_user, 'application_submitted',
+                f'Application Submitted - {internship.title}',
+                'emails/application_submitted.html', context,
+                summary=f'{internship.employer.company_name}', link=link
+            )
             
-            # Send email using custom smtplib service (non-blocking)
-            try:
-                send_email(instance.intern.user.email, subject, message, message)
-            except Exception as e:
-                print(f"⚠️  Email notification failed (non-critical): {e}")
+            # Notify employer
+            applicant_name = instance.intern.full_name or intern_user.username
+            NotificationService.send_email_notification(
+                internship.employer.user, 'new_application',
+                f'New Application - {internship.title}',
+                'emails/new_application.html',
+                {**context, 'employer_user': internship.employer.user, 'applicant_name': applicant_name},
+                summary=f'Applicant: {applicant_name}', link=link
+            )
+        
+        else:
+            # Status changed - notify intern
+            NotificationService.send_email_notification(
+                intern_user, 'application_status',
+                f'Application Status Update - {internship.title}',
+                'emails/application_status.html', context,
+                summary=f'New status: {instance.get_status_display()}', link=link
+            )
     
     except Exception as e:
         # Don't let signal errors block the request
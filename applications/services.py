@@ -0,0 +1,153 @@
+"""
+Application Service for Lwazi Blue
+Status transitions applied to many applications at once, applicant exports
+"""
+
+from django.db import transaction
+from django.db.models import Prefetch, prefetch_related_objects
+from django.utils import timezone
+from core.models import InternDocument
+from core.services.dashboard import invalidate_dashboard_summaries
+from core.services.matching import InternshipMatchingService
+from notifications.services import NotificationService
+from .models import Application, ApplicationStatusEvent, recompute_status_counts
+
+
+class ApplicationService:
+    """Service for bulk application status changes and exports"""
+    
+    EXPORT_CHUNK_SIZE = 2000
+    EXPORT_HEADER = [
+        'Applicant', 'Username', 'Email', 'Location', 'Applied On', 'Status',
+        'Match Score', 'Application Link', 'Documents',
+    ]
+    # Cells starting with these are run as formulas by spreadsheet apps
+    FORMULA_PREFIXES = ('=', '+', '-', '@', '\t', '\r')
+    
+    @staticmethod
+    def bulk_update_status(applications, new_status, changed_by=None):
+        """
+        Move many applications to a new status
+        
+        Applications already in new_status or in a final status are skipped.
+        The rest are updated in one statement with one audit row each, then
+        interns get their notifications and emails queued in one batch
+        (bulk inserts into the notification table and the email outbox)
+        instead of one post_save round per application.
+        
+        Args:
+            applications: Application queryset to transition
+            new_status: One of Application.STATUS_CHOICES
+            changed_by: User making the change (recorded on the audit rows)
+        
+        Returns:
+            list: The applications that changed
+        """
+        with transaction.atomic():
+            changed = list(
+                applications.exclude(status=new_status).exclude(
+                    status__in=Application.FINAL_STATUSES
+                ).select_related(
+                    'internship', 'internship__employer', 'intern', 'intern__user'
+                ).select_for_update(of=('self',))
+            )
+            if not changed:
+                return []
+            
+            now = timezone.now()
+            Application.objects.filter(pk__in=[a.pk for a in changed]).update(
+                status=new_status,
+                status_updated_at=now
+            )
+            ApplicationStatusEvent.objects.bulk_create([
+                ApplicationStatusEvent(
+                    application=application,
+                    internship_id=application.internship_id,
+                    from_status=application.status,
+                    status=new_status,
+                    changed_by=changed_by,
+                    created_at=now
+                )
+                for application in changed
+            ])
+            recompute_status_counts((a.internship_id, a.intern_id) for a in changed)
+            invalidate_dashboard_summaries(
+                [a.intern.user_id for a in changed] + [a.internship.employer.user_id for a in changed]
+            )
+            
+            for application in changed:
+                application.status = application._saved_status = new_status
+                application.status_updated_at = now
+            
+            NotificationService.send_status_update_notifications(changed)
+            NotificationService.send_email_notifications(
+                'application_status',
+                'emails/application_status.html',
+                [
+                    (
+                        application.intern.user,
+                        f'Application Status Update - {application.internship.title}',
+                        {
+                            'application': application,
+                            'internship': application.internship,
+                            'intern_user': application.intern.user,
+                        },
+                        f'New status: {application.get_status_display()}',
+                        f'/applications/{application.pk}/',
+                    )
+                    for application in changed
+                ]
+            )
+        return changed
+    
+    @staticmethod
+    def escape_csv_cell(value):
+        """Quote user-supplied text that a spreadsheet would evaluate (CSV injection)"""
+        if isinstance(value, str) and value.startswith(ApplicationService.FORMULA_PREFIXES):
+            return f"'{value}"
+        return value
+    
+    @staticmethod
+    def export_rows(internship, applications, build_url):
+        """
+        Yield one CSV row per application, header first
+        
+        Text cells are passed through escape_csv_cell, since names and
+        locations are entered by applicants.
+        
+        Rows are produced lazily from .iterator(chunk_size=2000); each chunk
+        brings its intern, user and the data the match score needs via
+        select_related/prefetch_related, so memory stays flat however many
+        applicants a posting has.
+        
+        Args:
+            internship: Posting being exported (used for match scores)
+            applications: Application queryset for that posting
+            build_url: Callable turning a path into an absolute URL
+        """
+        matcher = InternshipMatchingService()
+        # Loaded once: every row is scored against the same posting
+        prefetch_related_objects([internship], 'skills_required')
+        
+        applications = applications.select_related(
+            'intern', 'intern__user'
+        ).prefetch_related(
+            'intern__skills', 'intern__industries', 'intern__preferred_locations',
+            Prefetch('additional_documents', queryset=InternDocument.objects.only('pk', 'document'))
+        ).order_by('-applied_at')
+        
+        yield ApplicationService.EXPORT_HEADER
+        for application in applications.iterator(chunk_size=ApplicationService.EXPORT_CHUNK_SIZE):
+            intern = application.intern
+            row = [
+                intern.full_name or intern.user.username,
+                intern.user.username,
+                intern.user.email,
+                f'{intern.current_municipality}, {intern.current_province}',
+                application.applied_at.strftime('%Y-%m-%d %H:%M'),
+                application.get_status_display(),
+                matcher.calculate_match_score(internship, intern),
+                build_url(f'/applications/{application.pk}/'),
+                ' | '.join(build_url(doc.document.url) for doc in application.additional_documents.all()),
+            ]
+            yield [ApplicationService.escape_csv_cell(value) for value in row]
@@ -1,3 +1,85 @@
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
 from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from core.models import EmployerProfile, InternProfile, InternshipPost
+from .models import Application, ApplicationStatusEvent, InternshipStatusCount, InternStatusCount
+
+
+def create_application():
+    """One pending application to a posting of a fresh employer"""
+    User = get_user_model()
+    employer = EmployerProfile.objects.create(
+        user=User.objects.create_user('employer', 'employer@example.com', 'secret', user_type='employer'),
+        company_name='Acme', contact_person='Sam', phone='0310000000',
+        company_location='Durban', municipality='eThekwini', province='KZN'
+    )
+    today = timezone.now().date()
+    internship = InternshipPost.objects.create(
+        employer=employer, title='Data Intern', description='d', requirements='r', responsibilities='r',
+        location='Durban', municipality='eThekwini', province='KZN', duration_months=6,
+        start_date=today + timedelta(days=30), application_deadline=today + timedelta(days=10)
+    )
+    intern = InternProfile.objects.create(
+        user=User.objects.create_user('intern', 'intern@example.com', 'secret', user_type='intern')
+    )
+    return Application.objects.create(intern=intern, internship=internship)
+
+
+class ApplicationStatusCountTests(TestCase):
+    """Status events and pipeline counters follow saves, including from partially loaded rows"""
+
+    def setUp(self):
+        self.application = create_application()
+        self.internship = self.application.internship
+
+    def transitions(self):
+        return list(ApplicationStatusEvent.objects.filter(
+            application=self.application
+        ).order_by('pk').values_list('from_status', 'status'))
+
+    def test_saving_without_loading_status_moves_nothing(self):
+        application = Application.objects.only('id', 'employer_notes').get(pk=self.application.pk)
+        application.employer_notes = 'Strong CV'
+        application.save()
+
+        self.assertEqual(self.transitions(), [('', 'pending')])
+        self.assertEqual(InternshipStatusCount.counts_for(self.internship.pk)['pending'], 1)
+
+    def test_status_change_on_a_deferred_row_moves_the_counters(self):
+        application = Application.objects.defer('status').get(pk=self.application.pk)
+        application.status = 'declined'
+        application.save()
+
+        self.assertEqual(self.transitions(), [('', 'pending'), ('pending', 'declined')])
+        counts = InternStatusCount.counts_for(self.application.intern_id)
+        self.assertEqual((counts['pending'], counts['declined']), (0, 1))
+
+
+class ApplicantExportTests(TestCase):
+    """CSV export of a posting's applicants"""
+
+    def setUp(self):
+        self.application = create_application()
+        self.client.force_login(self.application.internship.employer.user)
+        self.url = reverse('applications:export_applications', args=[self.application.internship_id])
+
+    def export(self, status):
+        response = self.client.get(self.url, {'status': status})
+        self.assertEqual(response.status_code, 200)
+        return response['Content-Disposition'], b''.join(response.streaming_content).decode()
+
+    def test_known_status_filters_and_names_the_file(self):
+        disposition, body = self.export('declined')
+
+        self.assertEqual(disposition, 'attachment; filename="applicants-data-intern-declined.csv"')
+        self.assertNotIn('intern@example.com', body)
+
+    def test_unknown_status_is_ignored(self):
+        disposition, body = self.export('pending"; x=.exe')
 
-# Create your tests here.
+        self.assertEqual(disposition, 'attachment; filename="applicants-data-intern.csv"')
+        self.assertIn('intern@example.com', body)
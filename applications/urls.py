@@ -14,5 +14,7 @@ urlpatterns = [
     # Employer views
     path('<int:pk>/update-status/', views.application_update_status_view, name='update_status'),
     path('internship/<int:internship_id>/', views.internship_applications_view, name='internship_applications'),
+    path('internship/<int:internship_id>/export/', views.internship_applications_export_view, name='export_applications'),
+    path('internship/<int:internship_id>/bulk-status/', views.application_bulk_status_view, name='bulk_update_status'),
 ]
 
@@ -1,11 +1,15 @@
+import csv
+
 from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib.auth.decorators import login_required
 from django.contrib import messages
-from django.http import HttpResponseForbidden
+from django.http import HttpResponseForbidden, StreamingHttpResponse
 from django.core.paginator import Paginator
+from django.utils.text import slugify
 from core.models import InternshipPost, InternProfile, EmployerProfile
 from .models import Application
-from .forms import ApplicationForm, ApplicationStatusForm
+from .forms import ApplicationForm, ApplicationStatusForm, BulkApplicationStatusForm
+from .services import ApplicationService
 
 
 @login_required
@@ -117,23 +121,22 @@ def application_list_view(request):
     if status_filter:
         applications = applications.filter(status=status_filter)
     
+    # All status counts in one grouped query; the total and the paginator's count follow from them
+    status_counts = Application.objects.filter(intern=intern_profile).status_counts()
+    total_count = sum(status_counts.values())
+    
     # Pagination
     paginator = Paginator(applications, 10)
+    paginator.count = status_counts.get(status_filter, 0) if status_filter else total_count
     page_number = request.GET.get('page')
     page_obj = paginator.get_page(page_number)
     
-    # Get status counts for filtering
-    status_counts = {}
-    for status_code, status_name in Application.STATUS_CHOICES:
-        count = Application.objects.filter(intern=intern_profile, status=status_code).count()
-        status_counts[status_code] = count
-    
     context = {
         'applications': page_obj,
         'status_filter': status_filter,
         'status_counts': status_counts,
         'status_choices': Application.STATUS_CHOICES,
-        'total_count': applications.count(),
+        'total_count': total_count,
     }
     
     return render(request, 'applications/application_list.html', context)
@@ -158,6 +161,7 @@ def application_update_status_view(request, pk):
     if request.method == 'POST':
         form = ApplicationStatusForm(request.POST, instance=application)
         if form.is_valid():
+            application._changed_by = request.user  # Recorded on the status event
             form.save()
             messages.success(
                 request,
@@ -202,23 +206,102 @@ def internship_applications_view(request, internship_id):
     if status_filter:
         applications = applications.filter(status=status_filter)
     
+    # All status counts in one grouped query; the total and the paginator's count follow from them
+    status_counts = Application.objects.filter(internship=internship).status_counts()
+    total_count = sum(status_counts.values())
+    
     # Pagination
     paginator = Paginator(applications, 15)
+    paginator.count = status_counts.get(status_filter, 0) if status_filter else total_count
     page_number = request.GET.get('page')
     page_obj = paginator.get_page(page_number)
     
-    # Get status counts
-    status_counts = {}
-    for status_code, status_name in Application.STATUS_CHOICES:
-        count = Application.objects.filter(internship=internship, status=status_code).count()
-        status_counts[status_code] = count
-    
     context = {
         'internship': internship,
         'applications': page_obj,
         'status_filter': status_filter,
         'status_counts': status_counts,
-        'total_count': applications.count(),
+        'total_count': total_count,
+        'bulk_form': BulkApplicationStatusForm(internship),
     }
     
     return render(request, 'applications/internship_applications.html', context)
+
+
+class Echo:
+    """File-like object whose write() hands the line back instead of buffering it"""
+    
+    def write(self, value):
+        return value
+
+
+@login_required
+def internship_applications_export_view(request, internship_id):
+    """
+    Employer downloads every applicant for a posting as CSV
+    Streamed row by row, honours the ?status= filter
+    """
+    if request.user.user_type != 'employer':
+        return HttpResponseForbidden()
+    
+    employer_profile = get_object_or_404(EmployerProfile, user=request.user)
+    internship = get_object_or_404(
+        InternshipPost.objects.select_related('industry'),
+        pk=internship_id,
+        employer=employer_profile
+    )
+    
+    applications = Application.objects.filter(internship=internship)
+    # Unknown values are ignored, so only a known status slug reaches the filename
+    status_filter = request.GET.get('status', '')
+    if status_filter not in dict(Application.STATUS_CHOICES):
+        status_filter = ''
+    if status_filter:
+        applications = applications.filter(status=status_filter)
+    
+    writer = csv.writer(Echo())
+    rows = ApplicationService.export_rows(internship, applications, request.build_absolute_uri)
+    response = StreamingHttpResponse(
+        (writer.writerow(row) for row in rows),
+        content_type='text/csv; charset=utf-8'
+    )
+    filename = f"applicants-{slugify(internship.title)}{'-' + status_filter if status_filter else ''}.csv"
+    response['Content-Disposition'] = f'attachment; filename="{filename}"'
+    return response
+
+
+@login_required
+def application_bulk_status_view(request, internship_id):
+    """
+    Employer moves the selected applicants to one status
+    Interns are notified in one batch
+    """
+    if request.user.user_type != 'employer':
+        return HttpResponseForbidden()
+    
+    employer_profile = get_object_or_404(EmployerProfile, user=request.user)
+    internship = get_object_or_404(
+        InternshipPost,
+        pk=internship_id,
+        employer=employer_profile
+    )
+    
+    if request.method == 'POST':
+        form = BulkApplicationStatusForm(internship, request.POST)
+        if form.is_valid():
+            selected = form.cleaned_data['applications']
+            new_status = form.cleaned_data['status']
+            changed = ApplicationService.bulk_update_status(selected, new_status, changed_by=request.user)
+            
+            messages.success(
+                request,
+                f'{len(changed)} application(s) moved to {dict(Application.STATUS_CHOICES)[new_status]}. '
+                f'The applicants have been notified.'
+            )
+            skipped = len(selected) - len(changed)
+            if skipped:
+                messages.info(request, f'{skipped} application(s) skipped: already in that status or finalised.')
+        else:
+            messages.error(request, 'Select at least one applicant and a status.')
+    
+    return redirect('applications:internship_applications', internship_id=internship.pk)
@@ -96,7 +96,7 @@ class BlogPost(models.Model):
         
         super().save(*args, **kwargs)
     
-    def increment_views(self):
-        """Increment view count"""
-        self.views_count += 1
-        self.save(update_fields=['views_count'])
+    def increment_views(self, request=None):
+        """Count a view (buffered in the cache, flushed to views_count in bulk)"""
+        from core.services.view_counters import record_view
+        return record_view(self, request)
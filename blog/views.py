@@ -43,8 +43,8 @@ def blog_detail(request, slug):
     """View single blog post"""
     post = get_object_or_404(BlogPost, slug=slug, is_published=True)
     
-    # Increment views
-    post.increment_views()
+    # Count the view (buffered, one per session)
+    post.increment_views(request)
     
     # Get related posts
     related_posts = BlogPost.objects.filter(
@@ -1,10 +1,12 @@
 from django.contrib import admin
+from django.utils import timezone
 from .models import (
     Skill, Industry, Location,
     InternProfile, EmployerProfile,
     InternDocument, Education, WorkExperience,
-    InternshipPost, Conversation, Message
+    InternshipPost, Conversation, Message, EmailOutbox
 )
+from .services.filters import bump_filter_version
 
 
 @admin.register(Skill)
@@ -31,13 +33,39 @@ class LocationAdmin(admin.ModelAdmin):
     readonly_fields = ['created_at']
 
 
+class ProfileCompletionFilter(admin.SimpleListFilter):
+    """Filter intern profiles by stored completion score"""
+    title = 'profile completion'
+    parameter_name = 'completion'
+    
+    RANGES = {
+        'low': (0, 49),
+        'medium': (50, 79),
+        'high': (80, 100),
+    }
+    
+    def lookups(self, request, model_admin):
+        return (
+            ('low', 'Under 50%'),
+            ('medium', '50% - 79%'),
+            ('high', '80% and above'),
+        )
+    
+    def queryset(self, request, queryset):
+        if self.value() in self.RANGES:
+            low, high = self.RANGES[self.value()]
+            return queryset.filter(profile_completion__gte=low, profile_completion__lte=high)
+        return queryset
+
+
 @admin.register(InternProfile)
 class InternProfileAdmin(admin.ModelAdmin):
-    list_display = ['user', 'full_name', 'phone', 'current_municipality', 'current_province', 'created_at']
-    list_filter = ['current_province', 'created_at']
+    list_display = ['user', 'full_name', 'phone', 'current_municipality', 'current_province',
+                    'completion_display', 'created_at']
+    list_filter = [ProfileCompletionFilter, 'current_province', 'created_at']
     search_fields = ['user__username', 'user__email', 'full_name', 'phone']
     filter_horizontal = ['skills', 'industries', 'preferred_locations']
-    readonly_fields = ['created_at', 'updated_at', 'get_profile_completion_percentage']
+    readonly_fields = ['created_at', 'updated_at', 'completion_display']
     
     fieldsets = (
         ('User', {
@@ -53,14 +81,15 @@ class InternProfileAdmin(admin.ModelAdmin):
             'fields': ('skills', 'industries')
         }),
         ('System', {
-            'fields': ('created_at', 'updated_at', 'get_profile_completion_percentage'),
+            'fields': ('created_at', 'updated_at', 'completion_display'),
             'classes': ('collapse',)
         }),
     )
     
-    def get_profile_completion_percentage(self, obj):
-        return f"{obj.get_profile_completion_percentage()}%"
-    get_profile_completion_percentage.short_description = 'Profile Completion'
+    def completion_display(self, obj):
+        return f"{obj.profile_completion}%"
+    completion_display.short_description = 'Profile Completion'
+    completion_display.admin_order_field = 'profile_completion'
 
 
 @admin.register(EmployerProfile)
@@ -99,7 +128,7 @@ class InternDocumentAdmin(admin.ModelAdmin):
     list_display = ['intern', 'document_type', 'version', 'is_latest', 'uploaded_at']
     list_filter = ['document_type', 'is_latest', 'uploaded_at']
     search_fields = ['intern__user__username', 'intern__full_name', 'description']
-    readonly_fields = ['uploaded_at', 'version']
+    readonly_fields = ['uploaded_at', 'version', 'extracted_text', 'text_extracted_at']
     
     fieldsets = (
         ('Document', {
@@ -109,6 +138,10 @@ class InternDocumentAdmin(admin.ModelAdmin):
             'fields': ('version', 'is_latest', 'uploaded_at'),
             'classes': ('collapse',)
         }),
+        ('Extracted Text', {
+            'fields': ('text_extracted_at', 'extracted_text'),
+            'classes': ('collapse',)
+        }),
     )
 
 
@@ -214,31 +247,40 @@ class InternshipPostAdmin(admin.ModelAdmin):
     
     actions = ['publish_internships', 'unpublish_internships', 'mark_inactive']
     
+    # queryset.update() sends no post_save, so each action drops the cached
+    # filter results itself
+    
     def publish_internships(self, request, queryset):
         """Publish selected internships"""
         updated = queryset.update(is_published=True)
+        bump_filter_version()
         self.message_user(request, f'{updated} internship(s) published.')
     publish_internships.short_description = 'Publish selected internships'
     
     def unpublish_internships(self, request, queryset):
         """Unpublish selected internships"""
         updated = queryset.update(is_published=False)
+        bump_filter_version()
         self.message_user(request, f'{updated} internship(s) unpublished.')
     unpublish_internships.short_description = 'Unpublish selected internships'
     
     def mark_inactive(self, request, queryset):
         """Mark selected internships as inactive"""
         updated = queryset.update(is_active=False)
+        bump_filter_version()
         self.message_user(request, f'{updated} internship(s) marked as inactive.')
     mark_inactive.short_description = 'Mark selected internships as inactive'
 
 
 @admin.register(Conversation)
 class ConversationAdmin(admin.ModelAdmin):
-    list_display = ['employer_name', 'intern_name', 'last_message_at', 'created_at', 'message_count']
+    list_display = ['employer_name', 'intern_name', 'last_message_at', 'created_at', 'message_count',
+                    'intern_unread', 'employer_unread']
     list_filter = ['created_at', 'last_message_at']
     search_fields = ['intern__user__username', 'employer__company_name', 'intern__full_name']
-    readonly_fields = ['created_at', 'updated_at', 'last_message_at']
+    readonly_fields = ['created_at', 'updated_at', 'last_message_at', 'intern_unread', 'employer_unread']
+    
+    actions = ['recompute_unread_counters']
     
     def employer_name(self, obj):
         return obj.employer.company_name
@@ -251,6 +293,12 @@ class ConversationAdmin(admin.ModelAdmin):
     def message_count(self, obj):
         return obj.messages.count()
     message_count.short_description = 'Messages'
+    
+    def recompute_unread_counters(self, request, queryset):
+        """Rebuild unread counters from messages"""
+        updated = Conversation.recompute_unread_counters(queryset)
+        self.message_user(request, f'{updated} conversation(s) recounted.')
+    recompute_unread_counters.short_description = 'Recompute unread counters'
 
 
 @admin.register(Message)
@@ -264,3 +312,23 @@ class MessageAdmin(admin.ModelAdmin):
     def message_preview(self, obj):
         return obj.message[:50] + ('...' if len(obj.message) > 50 else '')
     message_preview.short_description = 'Message'
+
+
+@admin.register(EmailOutbox)
+class EmailOutboxAdmin(admin.ModelAdmin):
+    list_display = ['to_email', 'subject', 'status', 'priority', 'coalesced_count', 'attempts', 'send_after', 'sent_at']
+    list_filter = ['status', 'priority', 'created_at']
+    search_fields = ['to_email', 'subject', 'last_error']
+    readonly_fields = ['coalesce_key', 'coalesced_count', 'attempts', 'last_error', 'locked_at', 'created_at', 'sent_at']
+    date_hierarchy = 'created_at'
+    actions = ['requeue_emails']
+    
+    def requeue_emails(self, request, queryset):
+        """Put dead-lettered emails back in the queue with fresh attempts"""
+        updated = queryset.filter(status=EmailOutbox.STATUS_DEAD).update(
+            status=EmailOutbox.STATUS_PENDING,
+            attempts=0,
+            send_after=timezone.now()
+        )
+        self.message_user(request, f'{updated} email(s) requeued.')
+    requeue_emails.short_description = 'Requeue selected emails'
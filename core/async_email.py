@@ -0,0 +1,284 @@
+"""
+Async bulk email sender using asyncio streams
+Keeps several SMTP sessions busy at once for large fan-outs (match alerts, reminders)
+
+Speaks just enough SMTP (EHLO, STARTTLS, AUTH PLAIN, MAIL/RCPT/DATA) to push
+messages built by EmailService; errors are raised as smtplib exceptions so
+callers can classify them the same way as synchronous sends.
+"""
+import asyncio
+import base64
+import smtplib
+import ssl
+import time
+from dataclasses import dataclass
+from email import policy
+
+from .email_service import SMTPUnavailable, get_email_service
+
+
+@dataclass
+class BulkSendResult:
+    """Outcome of one recipient in a bulk send"""
+    to_email: str
+    ok: bool
+    error: Exception = None
+    attempted: bool = True  # False when skipped because the server was unreachable
+    key: object = None  # Caller's identifier for the message (e.g. an EmailOutbox pk)
+
+
+class AsyncSMTPSession:
+    """One SMTP conversation over asyncio streams"""
+
+    def __init__(self, host, port, use_ssl=False, use_tls=False, username=None,
+                 password=None, timeout=10, ssl_context=None):
+        self.host = host
+        self.port = port
+        self.use_ssl = use_ssl
+        self.use_tls = use_tls
+        self.username = username
+        self.password = password
+        self.timeout = timeout
+        self.ssl_context = ssl_context  # Defaults to the system trust store
+        self.reader = None
+        self.writer = None
+        self._plain_writer = None
+        self.extensions = set()
+
+    async def connect(self):
+        """Open the connection, upgrade to TLS if configured and log in"""
+        try:
+            self.reader, self.writer = await asyncio.wait_for(
+                asyncio.open_connection(
+                    self.host, self.port,
+                    ssl=self._ssl_context() if self.use_ssl else None
+                ),
+                self.timeout
+            )
+            await self._expect(220)
+            await self._ehlo()
+            if self.use_tls:
+                await self.command('STARTTLS', 220)
+                await asyncio.wait_for(self._start_tls(), self.timeout)
+                await self._ehlo()
+            if self.username and self.password:
+                token = base64.b64encode(f'\0{self.username}\0{self.password}'.encode()).decode()
+                await self.command(f'AUTH PLAIN {token}', 235)
+        except (smtplib.SMTPException, OSError, asyncio.TimeoutError) as e:
+            await self.close()
+            raise SMTPUnavailable(e) from e
+
+    def _ssl_context(self):
+        return self.ssl_context or ssl.create_default_context()
+
+    async def _start_tls(self):
+        """Upgrade the open connection to TLS"""
+        start_tls = getattr(self.writer, 'start_tls', None)
+        if start_tls is not None:
+            await start_tls(self._ssl_context(), server_hostname=self.host)
+            return
+        # StreamWriter.start_tls is Python 3.11+; on 3.10 upgrade the transport
+        # and wrap it in a new writer (the reader is fed through the same protocol).
+        # The plaintext writer is kept alive: newer versions close the transport
+        # when a StreamWriter is garbage collected.
+        loop = asyncio.get_running_loop()
+        transport = self.writer.transport
+        protocol = transport.get_protocol()
+        tls_transport = await loop.start_tls(
+            transport, protocol, self._ssl_context(), server_hostname=self.host
+        )
+        self._plain_writer = self.writer
+        self.writer = asyncio.StreamWriter(tls_transport, protocol, self.reader, loop)
+
+    async def _ehlo(self):
+        code, text = await self.command('EHLO lwazi-blue', 250)
+        self.extensions = {line.split()[0].upper() for line in text.splitlines() if line}
+
+    async def _read_reply(self):
+        """Read a (possibly multi-line) reply: (code, text)"""
+        lines = []
+        while True:
+            line = await asyncio.wait_for(self.reader.readline(), self.timeout)
+            if not line:
+                raise smtplib.SMTPServerDisconnected('Connection unexpectedly closed')
+            line = line.decode('utf-8', 'replace').rstrip('\r\n')
+            lines.append(line[4:])
+            if len(line) < 4 or line[3] != '-':
+                return int(line[:3]), '\n'.join(lines)
+
+    async def _expect(self, expected):
+        code, text = await self._read_reply()
+        if code != expected:
+            raise smtplib.SMTPResponseException(code, text)
+        return code, text
+
+    async def command(self, line, expected=250):
+        """Send one command and check the reply code"""
+        if self.writer is None:
+            raise smtplib.SMTPServerDisconnected('Not connected')
+        self.writer.write(f'{line}\r\n'.encode())
+        await self.writer.drain()
+        return await self._expect(expected)
+
+    async def send_message(self, message, from_email, to_email):
+        """Send a prepared email.message.Message to a single recipient"""
+        await self.command(f'MAIL FROM:<{from_email}>')
+        try:
+            await self.command(f'RCPT TO:<{to_email}>')
+        except smtplib.SMTPResponseException as e:
+            raise smtplib.SMTPRecipientsRefused({to_email: (e.smtp_code, e.smtp_error)})
+        await self.command('DATA', 354)
+
+        payload = message.as_bytes(policy=policy.SMTP)
+        # Dot-stuff lines that start with a period
+        payload = payload.replace(b'\r\n.', b'\r\n..')
+        if payload.startswith(b'.'):
+            payload = b'.' + payload
+        if not payload.endswith(b'\r\n'):
+            payload += b'\r\n'
+        self.writer.write(payload + b'.\r\n')
+        await self.writer.drain()
+        await self._expect(250)
+
+    async def reset(self):
+        """
+        Abort the current mail transaction (after a refused MAIL, RCPT or DATA)
+        Returns False if the session is unusable and has been closed
+        """
+        try:
+            await self.command('RSET')
+        except (smtplib.SMTPException, OSError, asyncio.TimeoutError):
+            await self.close()
+            return False
+        return True
+
+    async def close(self):
+        """QUIT politely if possible and close the socket"""
+        if self.writer is None:
+            return
+        try:
+            self.writer.write(b'QUIT\r\n')
+            await asyncio.wait_for(self.writer.drain(), self.timeout)
+            self.writer.close()
+            await asyncio.wait_for(self.writer.wait_closed(), self.timeout)
+        except (OSError, asyncio.TimeoutError):
+            pass
+        self.reader = self.writer = self._plain_writer = None
+
+
+class AsyncRateLimiter:
+    """Space sends out to at most per_minute across all concurrent sessions"""
+
+    def __init__(self, per_minute):
+        self.interval = 60 / per_minute if per_minute else 0
+        self._next = 0
+        self._lock = asyncio.Lock()
+
+    async def wait(self):
+        if not self.interval:
+            return
+        async with self._lock:
+            now = time.monotonic()
+            delay = self._next - now
+            self._next = max(now, self._next) + self.interval
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+
+class AsyncBulkEmailSender:
+    """
+    Send many emails concurrently over a bounded set of SMTP sessions
+
+    A BoundedSemaphore caps how many sends are in flight; each in-flight
+    send borrows an idle session (or opens one), so at most `concurrency`
+    sessions exist. If the server cannot be reached at all, the remaining
+    messages are skipped (attempted=False) instead of each timing out.
+    """
+
+    def __init__(self, service=None, concurrency=5, rate_per_minute=0, session_factory=None):
+        self.service = service or get_email_service()
+        self.concurrency = concurrency
+        self.rate_per_minute = rate_per_minute
+        self.session_factory = session_factory or self._default_session
+
+    def _default_session(self):
+        service = self.service
+        return AsyncSMTPSession(
+            service.smtp_host, service.smtp_port,
+            use_ssl=service.use_ssl, use_tls=service.use_tls,
+            username=service.username, password=service.password
+        )
+
+    def send_all(self, messages, progress=None):
+        """
+        Send messages and return one BulkSendResult per message, in order
+
+        Args:
+            messages: Iterable of (key, to_email, subject, html_body, text_body)
+            progress: Optional callable(done, total, result) after each message
+        """
+        return asyncio.run(self.send_all_async(list(messages), progress))
+
+    async def send_all_async(self, messages, progress=None):
+        semaphore = asyncio.BoundedSemaphore(self.concurrency)
+        limiter = AsyncRateLimiter(self.rate_per_minute)
+        idle_sessions = []
+        unavailable = []
+        done = 0
+
+        async def send_one(key, to_email, subject, html_body, text_body):
+            nonlocal done
+            async with semaphore:
+                result = await self._send_one(
+                    idle_sessions, limiter, unavailable,
+                    key, to_email, subject, html_body, text_body
+                )
+            done += 1
+            if progress:
+                progress(done, len(messages), result)
+            return result
+
+        try:
+            return await asyncio.gather(*(send_one(*message) for message in messages))
+        finally:
+            await asyncio.gather(*(session.close() for session in idle_sessions))
+
+    async def _send_one(self, idle_sessions, limiter, unavailable, key, to_email, subject, html_body, text_body):
+        if unavailable:
+            return BulkSendResult(to_email, False, unavailable[0], attempted=False, key=key)
+
+        service = self.service
+        if not service.enabled:
+            return BulkSendResult(to_email, True, key=key)
+        if not service.has_credentials:
+            service._print_email([to_email], subject, html_body, text_body)
+            return BulkSendResult(to_email, True, key=key)
+
+        message = service.build_message([to_email], subject, html_body, text_body or None)
+        await limiter.wait()
+
+        # One retry on a fresh session if an idle one turned out to be dropped
+        for attempt in range(2):
+            session = idle_sessions.pop() if idle_sessions else None
+            if session is None:
+                session = self.session_factory()
+                try:
+                    await session.connect()
+                except SMTPUnavailable as e:
+                    # Never pooled: connect() already closed it
+                    unavailable.append(e)
+                    return BulkSendResult(to_email, False, e, key=key)
+            try:
+                await session.send_message(message, service.from_email, to_email)
+            except (smtplib.SMTPRecipientsRefused, smtplib.SMTPResponseException) as e:
+                # The server answered; reset the transaction before the session is reused
+                if await session.reset():
+                    idle_sessions.append(session)
+                return BulkSendResult(to_email, False, e, key=key)
+            except (smtplib.SMTPServerDisconnected, OSError, asyncio.TimeoutError) as e:
+                await session.close()
+                if attempt:
+                    return BulkSendResult(to_email, False, e, key=key)
+                continue
+            idle_sessions.append(session)
+            return BulkSendResult(to_email, True, key=key)
@@ -0,0 +1,35 @@
+"""
+System checks for Lwazi Blue deployment settings
+"""
+
+from django.conf import settings
+from django.core.checks import Error, Tags, Warning, register
+
+
+@register(Tags.caches)
+def check_view_counter_cache(app_configs, **kwargs):
+    """
+    Buffered view counts need a cache shared by every process in production
+
+    A per-process cache can only be flushed by the web worker that holds it;
+    the flush_view_counters command never sees those counts.
+    """
+    from .services.view_counters import is_shared_cache
+
+    alias = getattr(settings, 'VIEW_COUNTERS', {}).get('cache', 'default')
+    if alias not in settings.CACHES:
+        return [Error(
+            f"VIEW_COUNTERS['cache'] refers to the undefined cache alias '{alias}'.",
+            hint='Add it to CACHES or point VIEW_COUNTERS at an existing alias.',
+            id='core.E001',
+        )]
+    if not settings.DEBUG and not is_shared_cache():
+        return [Warning(
+            f"The '{alias}' cache holding buffered view counts is local to each process.",
+            hint=(
+                'Set CACHE_URL to a shared cache so flush_view_counters can write every '
+                "worker's counts; until then each web worker flushes its own from requests."
+            ),
+            id='core.W001',
+        )]
+    return []
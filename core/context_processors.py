@@ -3,13 +3,16 @@ Context processors for Lwazi Blue
 Makes data available to all templates
 """
 
-from django.db.models import Count, Q
-from .models import Conversation, Message
+from django.utils.functional import SimpleLazyObject
+from .services.badges import get_unread_badges
 
 
 def unread_counts(request):
     """
     Add unread message and notification counts to all templates
+    
+    Counts are lazy: nothing is looked up unless a template reads them,
+    and then both come from one per-user cache entry set.
     """
     context = {
         'unread_messages_count': 0,
@@ -17,40 +20,9 @@ def unread_counts(request):
     }
     
     if request.user.is_authenticated:
-        # Get unread messages count
-        if request.user.user_type == 'intern':
-            try:
-                from .models import InternProfile
-                intern_profile = InternProfile.objects.get(user=request.user)
-                # Count unread messages in all conversations
-                unread_messages = Message.objects.filter(
-                    conversation__intern=intern_profile,
-                    is_read=False
-                ).exclude(sender_user=request.user).count()
-                context['unread_messages_count'] = unread_messages
-            except:
-                pass
-        
-        elif request.user.user_type == 'employer':
-            try:
-                from .models import EmployerProfile
-                employer_profile = EmployerProfile.objects.get(user=request.user)
-                # Count unread messages in all conversations
-                unread_messages = Message.objects.filter(
-                    conversation__employer=employer_profile,
-                    is_read=False
-                ).exclude(sender_user=request.user).count()
-                context['unread_messages_count'] = unread_messages
-            except:
-                pass
-        
-        # Get unread notifications count
-        from notifications.models import Notification
-        unread_notifications = Notification.objects.filter(
-            user=request.user,
-            is_read=False
-        ).count()
-        context['unread_notifications_count'] = unread_notifications
+        user = request.user
+        badges = SimpleLazyObject(lambda: get_unread_badges(user))
+        context['unread_messages_count'] = SimpleLazyObject(lambda: badges['messages'])
+        context['unread_notifications_count'] = SimpleLazyObject(lambda: badges['notifications'])
     
     return context
-
@@ -3,14 +3,239 @@ Email service using Python's smtplib instead of Django's email backend
 """
 import smtplib
 import os
+import re
+import threading
+import time
+from functools import lru_cache
+from html import unescape
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
 from email.mime.base import MIMEBase
 from email import encoders
-from django.template.loader import render_to_string
+from django.template import Context, Template
+from django.template.loader import get_template
 from django.conf import settings
 
 
+# =====================================================
+# TEMPLATE RENDERING
+# =====================================================
+
+# Django template syntax, protected while the HTML around it is converted
+TEMPLATE_SYNTAX = re.compile(r'{%.*?%}|{{.*?}}|{#.*?#}', re.DOTALL)
+PLACEHOLDER = re.compile(r'\x00(\d+)\x00')
+HTML_LINK = re.compile(r'<a\b[^>]*?href="([^"]*)"[^>]*>(.*?)</a\s*>', re.IGNORECASE | re.DOTALL)
+HTML_LIST_ITEM = re.compile(r'<li\b[^>]*>\s*', re.IGNORECASE)
+HTML_PARAGRAPH_END = re.compile(r'</(p|h[1-6]|ul|ol|table)\s*>', re.IGNORECASE)
+HTML_LINE_END = re.compile(r'<br\s*/?>|</(div|tr)\s*>', re.IGNORECASE)
+HTML_TAG = re.compile(r'<[^<]+?>')
+
+
+def _convert_html(html_content):
+    """Block-aware HTML to text: paragraphs and breaks become newlines, links keep their URL"""
+    text = re.sub(r'\s+', ' ', html_content)
+    text = HTML_LINK.sub(_link_to_text, text)
+    text = HTML_LIST_ITEM.sub('\n- ', text)
+    text = HTML_PARAGRAPH_END.sub('\n\n', text)
+    text = HTML_LINE_END.sub('\n', text)
+    text = unescape(HTML_TAG.sub('', text))
+    return _tidy_text(text)
+
+
+def _link_to_text(match):
+    url, label = match.group(1), match.group(2).strip()
+    if not url or url == label:
+        return label or url
+    return f'{label} ({url})'
+
+
+def _tidy_text(text):
+    """Collapse spaces in each line and keep at most one blank line between paragraphs"""
+    text = '\n'.join(re.sub(r'[ \t]+', ' ', line).strip() for line in text.split('\n'))
+    return re.sub(r'\n{3,}', '\n\n', text).strip()
+
+
+@lru_cache(maxsize=256)
+def html_to_text(html_content):
+    """Plain-text version of an HTML body (memoized, bulk sends repeat bodies)"""
+    return _convert_html(html_content)
+
+
+class EmailTemplate:
+    """
+    A compiled HTML email template and its derived plain-text template
+    
+    The text template is built once by converting the static HTML around the
+    template tags, so a send only renders two compiled templates and never
+    runs the HTML conversion. Email templates are standalone documents
+    (no extends or include) so that the conversion sees the whole body.
+    """
+    
+    def __init__(self, template_name):
+        self.html = get_template(template_name).template
+        self.text = Template(self._text_source(self.html.source), engine=self.html.engine)
+    
+    @staticmethod
+    def _text_source(source):
+        tags = []
+        
+        def protect(match):
+            # Identical tags share a placeholder, so <a href="{{ url }}">{{ url }}</a> is seen as one URL
+            if match.group(0) not in tags:
+                tags.append(match.group(0))
+            return f'\x00{tags.index(match.group(0))}\x00'
+        
+        text = _convert_html(TEMPLATE_SYNTAX.sub(protect, source))
+        text = PLACEHOLDER.sub(lambda m: tags[int(m.group(1))], text)
+        return '{% autoescape off %}' + text + '{% endautoescape %}'
+    
+    def render(self, context):
+        """Render (html, text) for one context"""
+        return self.render_many([context])[0]
+    
+    def render_many(self, contexts, common_context=None):
+        """
+        Render (html, text) for many recipients in one pass
+        
+        common_context is built once; each recipient's context is pushed on
+        top of it and popped again.
+        """
+        context = Context(common_context or {})
+        rendered = []
+        for recipient_context in contexts:
+            with context.push(recipient_context):
+                rendered.append((self.html.render(context), _tidy_text(self.text.render(context))))
+        return rendered
+
+
+@lru_cache(maxsize=64)
+def _cached_email_template(template_name):
+    return EmailTemplate(template_name)
+
+
+def get_email_template(template_name):
+    """Compiled email template, cached per process (recompiled on every call in DEBUG)"""
+    if settings.DEBUG:
+        return EmailTemplate(template_name)
+    return _cached_email_template(template_name)
+
+
+class SMTPUnavailable(Exception):
+    """The SMTP server could not be reached or refused the login"""
+
+
+class PooledConnection:
+    """An SMTP connection plus the bookkeeping the pool recycles it by"""
+    
+    def __init__(self, server):
+        self.server = server
+        self.messages_sent = 0
+        self.last_used = time.monotonic()
+    
+    def close(self):
+        try:
+            self.server.quit()
+        except (smtplib.SMTPException, OSError):
+            self.server.close()
+
+
+class SMTPConnectionPool:
+    """
+    Small thread-safe pool of authenticated SMTP connections
+    
+    Idle connections are checked with NOOP before reuse and recycled after
+    max_messages sends or max_idle seconds. A connection the server dropped
+    is replaced and the send retried once.
+    """
+    
+    def __init__(self, connect, max_size=2, max_messages=100, max_idle=60):
+        self.connect = connect
+        self.max_size = max_size
+        self.max_messages = max_messages
+        self.max_idle = max_idle
+        self._idle = []
+        self._lock = threading.Lock()
+        self.stats = {'handshakes': 0, 'reuses': 0, 'failures': 0, 'recycled': 0}
+    
+    def _count(self, key):
+        with self._lock:
+            self.stats[key] += 1
+    
+    def _is_stale(self, conn):
+        return (
+            conn.messages_sent >= self.max_messages or
+            time.monotonic() - conn.last_used > self.max_idle
+        )
+    
+    def acquire(self):
+        """Check out a healthy connection, opening a new one if none is idle"""
+        while True:
+            with self._lock:
+                conn = self._idle.pop() if self._idle else None
+            if conn is None:
+                break
+            if self._is_stale(conn):
+                self._count('recycled')
+                conn.close()
+                continue
+            try:
+                if conn.server.noop()[0] == 250:
+                    self._count('reuses')
+                    return conn
+            except (smtplib.SMTPException, OSError):
+                pass
+            self._count('failures')
+            conn.server.close()
+        
+        try:
+            server = self.connect()
+        except (smtplib.SMTPException, OSError) as e:
+            self._count('failures')
+            raise SMTPUnavailable(e) from e
+        self._count('handshakes')
+        return PooledConnection(server)
+    
+    def release(self, conn):
+        """Return a connection to the pool (or close it if the pool is full)"""
+        conn.last_used = time.monotonic()
+        with self._lock:
+            if len(self._idle) < self.max_size and not self._is_stale(conn):
+                self._idle.append(conn)
+                return
+        conn.close()
+    
+    def send_message(self, message):
+        """Send a message on a pooled connection, reconnecting once if it was dropped"""
+        for attempt in range(2):
+            conn = self.acquire()
+            try:
+                conn.server.send_message(message)
+            except smtplib.SMTPServerDisconnected:
+                self._count('failures')
+                conn.server.close()
+                if attempt:
+                    raise
+                continue
+            except (smtplib.SMTPRecipientsRefused, smtplib.SMTPResponseException):
+                # The server answered, so the connection itself is still good
+                self.release(conn)
+                raise
+            except Exception:
+                self._count('failures')
+                conn.server.close()
+                raise
+            conn.messages_sent += 1
+            self.release(conn)
+            return
+    
+    def clear(self):
+        """Close every idle connection"""
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for conn in idle:
+            conn.close()
+
+
 class EmailService:
     """
     Custom email service using smtplib
@@ -36,6 +261,15 @@ class EmailService:
             self.use_ssl = False
             self.use_tls = os.getenv('EMAIL_USE_TLS', 'True') == 'True'
         
+        # Reusable SMTP connections, shared by every send from this process
+        pool_config = getattr(settings, 'EMAIL_CONNECTION_POOL', {})
+        self.pool = SMTPConnectionPool(
+            self.open_connection,
+            max_size=pool_config.get('max_size', 2),
+            max_messages=pool_config.get('max_messages', 100),
+            max_idle=pool_config.get('max_idle', 60),
+        )
+        
         # Email notifications can be disabled via settings
         self.enabled = getattr(settings, 'ENABLE_EMAIL_NOTIFICATIONS', True)
         
@@ -80,55 +314,18 @@ class EmailService:
             print(f"📧 Debug mode: {self.debug_mode}")
             print(f"📧 Username: {self.username}")
             print(f"📧 Password: {self.password}")
-            if (not self.username) or (not self.password):
+            if not self.has_credentials:
                 print(f"📧 username or password is not set - printing email...")
                 self._print_email(recipients, subject, html_content, text_content)
                 return True
             
             # Create message
             print(f"📧 Creating message...")
-            msg = MIMEMultipart('alternative')
-            msg['From'] = self.from_email
-            msg['To'] = ', '.join(recipients)
-            msg['Subject'] = subject
-            
-            # Add text content
-            if text_content:
-                print(f"📧 Adding text content...")
-                text_part = MIMEText(text_content, 'plain')
-                msg.attach(text_part)
-            
-            # Add HTML content
-            print(f"📧 Adding HTML content...")
-            html_part = MIMEText(html_content, 'html')
-            msg.attach(html_part)
-            
-            # Add attachments if any
-            if attachments:
-                print(f"📧 Adding attachments...")
-                for file_path in attachments:
-                    self._attach_file(msg, file_path)
+            msg = self.build_message(recipients, subject, html_content, text_content, attachments)
             
             # Send email - use SSL or TLS based on port
             print(f"📧 Sending email...")
-            print(f"📧 Use SSL: {self.use_ssl}")
-            print(f"📧 Use TLS: {self.use_tls}")
-            if self.use_ssl:
-                # Port 465 - Use SMTP_SSL (SSL from the start)
-                print(f"🔒 Connecting with SMTP_SSL (port 465)...")
-                with smtplib.SMTP_SSL(self.smtp_host, self.smtp_port, timeout=10) as server:
-                    if self.username and self.password:
-                        server.login(self.username, self.password)
-                    server.send_message(msg)
-            else:
-                # Port 587 - Use SMTP with STARTTLS
-                print(f"🔒 Connecting with SMTP + STARTTLS (port 587)...")
-                with smtplib.SMTP(self.smtp_host, self.smtp_port, timeout=10) as server:
-                    if self.use_tls:
-                        server.starttls()
-                    if self.username and self.password:
-                        server.login(self.username, self.password)
-                    server.send_message(msg)
+            self.pool.send_message(msg)
             
             print(f"✅ Email sent to {', '.join(recipients)}: {subject}")
             return True
@@ -137,6 +334,66 @@ class EmailService:
             print(f"❌ Email sending failed: {e}")
             return False
     
+    @property
+    def has_credentials(self):
+        """Without SMTP credentials emails are printed instead of sent"""
+        return bool(self.username and self.password)
+    
+    def build_message(self, recipients, subject, html_content, text_content=None, attachments=None):
+        """Build the MIME message for a list of recipients"""
+        msg = MIMEMultipart('alternative')
+        msg['From'] = self.from_email
+        msg['To'] = ', '.join(recipients)
+        msg['Subject'] = subject
+        
+        # Add text content
+        if text_content:
+            msg.attach(MIMEText(text_content, 'plain'))
+        
+        # Add HTML content
+        msg.attach(MIMEText(html_content, 'html'))
+        
+        # Add attachments if any
+        for file_path in attachments or []:
+            self._attach_file(msg, file_path)
+        return msg
+    
+    def open_connection(self, timeout=10):
+        """
+        Open an authenticated SMTP connection
+        
+        The caller owns the connection and may send many messages through it.
+        """
+        if self.use_ssl:
+            # Port 465 - Use SMTP_SSL (SSL from the start)
+            print(f"🔒 Connecting with SMTP_SSL (port {self.smtp_port})...")
+            server = smtplib.SMTP_SSL(self.smtp_host, self.smtp_port, timeout=timeout)
+        else:
+            # Port 587 - Use SMTP with STARTTLS
+            print(f"🔒 Connecting with SMTP (port {self.smtp_port}, STARTTLS: {self.use_tls})...")
+            server = smtplib.SMTP(self.smtp_host, self.smtp_port, timeout=timeout)
+        try:
+            if self.use_tls:
+                server.starttls()
+            if self.has_credentials:
+                server.login(self.username, self.password)
+        except Exception:
+            server.close()
+            raise
+        return server
+    
+    def connection_stats(self):
+        """Pool counters: handshakes, reuses, failures and recycled connections"""
+        return dict(self.pool.stats)
+    
+    def render_template_email(self, template_name, context):
+        """Render (html, text) bodies from an email template"""
+        return get_email_template(template_name).render(context)
+    
+    def render_template_emails(self, template_name, contexts, common_context=None):
+        """Render (html, text) bodies for many recipients in a single pass"""
+        return get_email_template(template_name).render_many(contexts, common_context)
+    
     def send_template_email(self, to_email, subject, template_name, context):
         """
         Send an email using a Django template
@@ -151,12 +408,7 @@ class EmailService:
             bool: True if sent successfully
         """
         try:
-            # Render HTML content from template
-            html_content = render_to_string(template_name, context)
-            
-            # Generate plain text version (strip HTML tags)
-            text_content = self._html_to_text(html_content)
-            
+            html_content, text_content = self.render_template_email(template_name, context)
             return self.send_email(to_email, subject, html_content, text_content)
             
         except Exception as e:
@@ -180,13 +432,8 @@ class EmailService:
             print(f"⚠️  Failed to attach file {file_path}: {e}")
     
     def _html_to_text(self, html_content):
-        """Convert HTML to plain text (simple version)"""
-        import re
-        # Remove HTML tags
-        text = re.sub('<[^<]+?>', '', html_content)
-        # Clean up whitespace
-        text = re.sub(r'\s+', ' ', text).strip()
-        return text
+        """Convert HTML to plain text"""
+        return html_to_text(html_content)
     
     def _print_email(self, recipients, subject, html_content, text_content):
         """Print email to console in development mode"""
@@ -0,0 +1,45 @@
+"""
+Management command to extract searchable text from intern documents
+"""
+
+from django.core.management.base import BaseCommand
+from core.models import InternDocument
+from core.services.documents import DocumentTextExtractor, store_document_text
+
+
+class Command(BaseCommand):
+    help = 'Extract plain text from uploaded CVs and transcripts (DOCX/PDF) for search'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--all',
+            action='store_true',
+            help='Re-extract documents that already have text'
+        )
+
+    def handle(self, *args, **options):
+        documents = InternDocument.objects.filter(is_latest=True)
+        if not options['all']:
+            documents = documents.filter(text_extracted_at__isnull=True)
+
+        # Only formats the extractor understands
+        extension_filter = None
+        for ext in DocumentTextExtractor.SUPPORTED_EXTENSIONS:
+            query = InternDocument.objects.filter(document__iendswith=f'.{ext}')
+            extension_filter = query if extension_filter is None else extension_filter | query
+        documents = documents.filter(pk__in=extension_filter.values('pk'))
+
+        total = documents.count()
+        self.stdout.write(f'Extracting text from {total} document(s)...')
+
+        extracted = 0
+        for document in documents.iterator():
+            try:
+                if store_document_text(document):
+                    extracted += 1
+            except Exception as e:
+                self.stdout.write(self.style.WARNING(f'  Skipped document {document.pk}: {e}'))
+
+        self.stdout.write(self.style.SUCCESS(
+            f'>> Extracted text from {extracted} of {total} document(s)'
+        ))
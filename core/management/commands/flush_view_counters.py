@@ -0,0 +1,46 @@
+"""
+Management command to write buffered view counts to the database
+"""
+
+from datetime import datetime
+
+from django.core.management.base import BaseCommand
+from core.services.view_counters import flush_view_counts, is_shared_cache, view_counter_stats
+
+
+class Command(BaseCommand):
+    help = (
+        'Apply buffered internship and blog view counts with bulk F() updates '
+        '(schedule every minute; needs the shared cache from CACHE_URL)'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--stats',
+            action='store_true',
+            help='Only report pending increments and flush totals, write nothing'
+        )
+
+    def handle(self, *args, **options):
+        if not is_shared_cache():
+            # This process has its own empty buffer; the web workers flush theirs
+            self.stderr.write(self.style.WARNING(
+                "The view counter cache is local to each process, so this command can't see "
+                "the web workers' buffered views. Set CACHE_URL to a shared cache (see core.W001)."
+            ))
+            return
+
+        if options['stats']:
+            stats = view_counter_stats()
+            for label, pending in stats['pending'].items():
+                self.stdout.write(f"{label}: {pending['views']} pending view(s) on {pending['objects']} object(s)")
+            last_flush = datetime.fromtimestamp(stats['last_flush']).isoformat() if stats['last_flush'] else 'never'
+            self.stdout.write(self.style.SUCCESS(
+                f">> {stats['flushes']} flush(es), {stats['views_flushed']} view(s) written, last flush {last_flush}"
+            ))
+            return
+
+        flushed = flush_view_counts()
+        for label, views in flushed.items():
+            self.stdout.write(f'{label}: {views} view(s) written')
+        self.stdout.write(self.style.SUCCESS(f'>> Flushed {sum(flushed.values())} view(s)'))
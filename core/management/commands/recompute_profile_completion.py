@@ -0,0 +1,45 @@
+"""
+Management command to backfill the stored intern profile completion scores and record counts
+"""
+
+from django.core.management.base import BaseCommand
+from core.models import InternProfile
+
+
+class Command(BaseCommand):
+    help = 'Recompute InternProfile record counts and profile_completion for every profile (run once after deploying, or to repair)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=500,
+            help='Profiles loaded and updated per batch'
+        )
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        # Prefetched relations let exists() answer from memory
+        profiles = InternProfile.objects.prefetch_related(
+            'skills', 'industries', 'preferred_locations'
+        ).order_by('pk')
+
+        self.stdout.write('Recomputing education and experience counts...')
+        InternProfile.recompute_record_counts()
+
+        self.stdout.write('Recomputing profile completion...')
+        checked = updated = 0
+        changed = []
+        for profile in profiles.iterator(chunk_size=batch_size):
+            checked += 1
+            completion = profile.get_profile_completion_percentage()
+            if completion != profile.profile_completion:
+                profile.profile_completion = completion
+                changed.append(profile)
+                updated += 1
+            if len(changed) >= batch_size:
+                InternProfile.objects.bulk_update(changed, ['profile_completion'])
+                changed = []
+        InternProfile.objects.bulk_update(changed, ['profile_completion'], batch_size=batch_size)
+
+        self.stdout.write(self.style.SUCCESS(f'>> Checked {checked} profile(s), updated {updated}'))
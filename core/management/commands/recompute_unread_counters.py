@@ -0,0 +1,15 @@
+"""
+Management command to rebuild the denormalized conversation unread counters
+"""
+
+from django.core.management.base import BaseCommand
+from core.models import Conversation
+
+
+class Command(BaseCommand):
+    help = 'Recompute Conversation.intern_unread/employer_unread from Message rows'
+
+    def handle(self, *args, **options):
+        self.stdout.write('Recomputing unread counters...')
+        updated = Conversation.recompute_unread_counters()
+        self.stdout.write(self.style.SUCCESS(f'>> Recomputed counters for {updated} conversation(s)'))
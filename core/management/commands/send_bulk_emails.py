@@ -0,0 +1,64 @@
+"""
+Management command to drain the email outbox with concurrent async SMTP sessions
+"""
+
+from django.core.management.base import BaseCommand
+from core.services.outbox import BulkOutboxWorker
+
+
+class Command(BaseCommand):
+    help = 'Send due outbox emails over several concurrent SMTP sessions (for large fan-outs)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--concurrency',
+            type=int,
+            default=5,
+            help='Concurrent SMTP sessions (default: 5)'
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=500,
+            help='Emails claimed per batch (default: 500)'
+        )
+        parser.add_argument(
+            '--rate',
+            type=int,
+            default=None,
+            help='Maximum emails per minute, 0 for unlimited (default: EMAIL_OUTBOX["rate_per_minute"])'
+        )
+
+    def handle(self, *args, **options):
+        worker = BulkOutboxWorker(
+            concurrency=options['concurrency'],
+            batch_size=options['batch_size'],
+            rate_per_minute=options['rate']
+        )
+        totals = {'sent': 0, 'retry': 0, 'dead': 0, 'deferred': 0}
+
+        def progress(done, total, result):
+            # Roughly every 10% of the batch
+            if done % max(1, total // 10) == 0 or done == total:
+                self.stdout.write(f'  {done}/{total} processed')
+            if not result.ok and result.attempted:
+                self.stdout.write(self.style.WARNING(f'  {result.to_email}: {result.error}'))
+
+        while True:
+            results = worker.run_batch(progress)
+            if not results:
+                break
+            for outcome, count in results.items():
+                totals[outcome] += count
+            self.stdout.write(
+                f"Batch: sent {results['sent']}, retrying {results['retry']}, "
+                f"dead-lettered {results['dead']}, deferred {results['deferred']}"
+            )
+            if results['deferred']:
+                self.stdout.write(self.style.WARNING('SMTP server unavailable, stopping'))
+                break
+
+        self.stdout.write(self.style.SUCCESS(
+            f">> Sent {totals['sent']} email(s), {totals['retry']} to retry, "
+            f"{totals['dead']} dead-lettered"
+        ))
@@ -0,0 +1,76 @@
+"""
+Management command to deliver emails queued in the outbox
+"""
+
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+from core.services.outbox import OutboxWorker
+
+
+class Command(BaseCommand):
+    help = 'Send due emails from the EmailOutbox table over one SMTP connection'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=None,
+            help='Emails claimed per batch (default: EMAIL_OUTBOX["batch_size"])'
+        )
+        parser.add_argument(
+            '--rate',
+            type=int,
+            default=None,
+            help='Maximum emails per minute, 0 for unlimited (default: EMAIL_OUTBOX["rate_per_minute"])'
+        )
+        parser.add_argument(
+            '--loop',
+            action='store_true',
+            help='Keep running and poll the outbox for new emails'
+        )
+        parser.add_argument(
+            '--interval',
+            type=float,
+            default=None,
+            help='Seconds between polls when looping (default: EMAIL_OUTBOX["poll_interval"])'
+        )
+
+    def handle(self, *args, **options):
+        interval = options['interval'] or getattr(settings, 'EMAIL_OUTBOX', {}).get('poll_interval', 5)
+        worker = OutboxWorker(batch_size=options['batch_size'], rate_per_minute=options['rate'])
+        totals = {'sent': 0, 'retry': 0, 'dead': 0, 'deferred': 0}
+
+        try:
+            while True:
+                close_old_connections()
+                results = worker.run_batch()
+                for outcome, count in results.items():
+                    totals[outcome] += count
+                if results:
+                    self.stdout.write(
+                        f"Sent {results['sent']}, retrying {results['retry']}, "
+                        f"dead-lettered {results['dead']}, deferred {results['deferred']}"
+                    )
+
+                if not results or results['deferred']:
+                    if not options['loop']:
+                        break
+                    # Idle pooled connections are NOOP-checked or recycled on next use
+                    time.sleep(interval)
+        except KeyboardInterrupt:
+            self.stdout.write('Stopping...')
+        finally:
+            worker.close()
+
+        stats = worker.service.connection_stats()
+        self.stdout.write(
+            f"Connections: {stats['handshakes']} handshake(s), {stats['reuses']} reuse(s), "
+            f"{stats['failures']} failure(s), {stats['recycled']} recycled"
+        )
+        self.stdout.write(self.style.SUCCESS(
+            f">> Sent {totals['sent']} email(s), {totals['retry']} to retry, "
+            f"{totals['dead']} dead-lettered"
+        ))
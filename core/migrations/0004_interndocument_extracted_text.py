@@ -0,0 +1,102 @@
+# Generated by Django 4.2.8 on 2026-10-19 01:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0003_conversation_message'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='interndocument',
+            name='extracted_text',
+            field=models.TextField(blank=True, editable=False),
+        ),
+        migrations.AddField(
+            model_name='interndocument',
+            name='text_extracted_at',
+            field=models.DateTimeField(blank=True, editable=False, null=True),
+        ),
+        migrations.AlterField(
+            model_name='employerprofile',
+            name='province',
+            field=models.CharField(choices=[('', 'Select Province'), ('EC', 'Eastern Cape'), ('FS', 'Free State'), ('GP', 'Gauteng'), ('KZN', 'KwaZulu-Natal'), ('LP', 'Limpopo'), ('MP', 'Mpumalanga'), ('NC', 'Northern Cape'), ('NW', 'North West'), ('WC', 'Western Cape')], max_length=10),
+        ),
+        migrations.AlterField(
+            model_name='internprofile',
+            name='current_province',
+            field=models.CharField(blank=True, choices=[('', 'Select Province'), ('EC', 'Eastern Cape'), ('FS', 'Free State'), ('GP', 'Gauteng'), ('KZN', 'KwaZulu-Natal'), ('LP', 'Limpopo'), ('MP', 'Mpumalanga'), ('NC', 'Northern Cape'), ('NW', 'North West'), ('WC', 'Western Cape')], max_length=10),
+        ),
+        migrations.AlterField(
+            model_name='internshippost',
+            name='province',
+            field=models.CharField(choices=[('', 'Select Province'), ('EC', 'Eastern Cape'), ('FS', 'Free State'), ('GP', 'Gauteng'), ('KZN', 'KwaZulu-Natal'), ('LP', 'Limpopo'), ('MP', 'Mpumalanga'), ('NC', 'Northern Cape'), ('NW', 'North West'), ('WC', 'Western Cape')], max_length=10),
+        ),
+        migrations.AddIndex(
+            model_name='conversation',
+            index=models.Index(fields=['intern'], name='core_conver_intern__40efce_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='conversation',
+            index=models.Index(fields=['employer'], name='core_conver_employe_dfe354_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='conversation',
+            index=models.Index(fields=['-last_message_at'], name='core_conver_last_me_477a06_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='employerprofile',
+            index=models.Index(fields=['user'], name='core_employ_user_id_301155_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='employerprofile',
+            index=models.Index(fields=['province'], name='core_employ_provinc_2a70f7_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='internprofile',
+            index=models.Index(fields=['user'], name='core_intern_user_id_fc7693_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='internprofile',
+            index=models.Index(fields=['current_province'], name='core_intern_current_9d4f97_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='internprofile',
+            index=models.Index(fields=['-created_at'], name='core_intern_created_a306bb_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='internshippost',
+            index=models.Index(fields=['employer'], name='core_intern_employe_8dca08_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='internshippost',
+            index=models.Index(fields=['industry'], name='core_intern_industr_e42008_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='internshippost',
+            index=models.Index(fields=['province'], name='core_intern_provinc_d538d1_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='internshippost',
+            index=models.Index(fields=['-created_at'], name='core_intern_created_1654ec_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='internshippost',
+            index=models.Index(fields=['title'], name='core_intern_title_b5c90c_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='message',
+            index=models.Index(fields=['conversation', 'is_read'], name='core_messag_convers_181a3e_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='message',
+            index=models.Index(fields=['sender_user'], name='core_messag_sender__06cc25_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='message',
+            index=models.Index(fields=['sent_at'], name='core_messag_sent_at_7d3b57_idx'),
+        ),
+    ]
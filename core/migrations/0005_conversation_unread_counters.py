@@ -0,0 +1,43 @@
+# Generated by Django 4.2.8 on 2026-10-19 01:11
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def backfill_unread_counters(apps, schema_editor):
+    Conversation = apps.get_model('core', 'Conversation')
+    Message = apps.get_model('core', 'Message')
+    unread = Message.objects.filter(
+        conversation=OuterRef('pk'),
+        is_read=False
+    ).order_by().values('conversation')
+
+    def count_of(messages):
+        return Coalesce(Subquery(messages.annotate(total=Count('pk')).values('total')), 0)
+
+    Conversation.objects.update(
+        intern_unread=count_of(unread.filter(sender_user__user_type='employer')),
+        employer_unread=count_of(unread.exclude(sender_user__user_type='employer')),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0004_interndocument_extracted_text'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='conversation',
+            name='employer_unread',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='conversation',
+            name='intern_unread',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.RunPython(backfill_unread_counters, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 4.2.8 on 2026-10-19 01:14
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0005_conversation_unread_counters'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='message',
+            index=models.Index(fields=['conversation', 'sent_at'], name='core_messag_convers_92770f_idx'),
+        ),
+    ]
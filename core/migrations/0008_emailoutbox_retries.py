@@ -0,0 +1,28 @@
+# Generated by Django 4.2.8 on 2026-10-19 01:19
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0007_emailoutbox'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='emailoutbox',
+            name='locked_at',
+            field=models.DateTimeField(blank=True, help_text='When a worker claimed the email', null=True),
+        ),
+        migrations.AddField(
+            model_name='emailoutbox',
+            name='priority',
+            field=models.SmallIntegerField(default=0),
+        ),
+        migrations.AlterField(
+            model_name='emailoutbox',
+            name='status',
+            field=models.CharField(choices=[('pending', 'Pending'), ('sending', 'Sending'), ('sent', 'Sent'), ('dead', 'Dead letter')], default='pending', max_length=10),
+        ),
+    ]
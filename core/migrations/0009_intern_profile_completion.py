@@ -0,0 +1,50 @@
+# Generated by Django 4.2.8 on 2026-10-19 01:45
+
+from django.db import migrations, models
+from django.db.models import Exists, OuterRef
+
+# Same scoring as InternProfile.get_profile_completion_percentage (historical
+# models don't have the method): ten checks worth 10% each
+COMPLETION_FIELDS = ('full_name', 'phone', 'date_of_birth', 'profile_photo', 'bio', 'current_location')
+COMPLETION_RELATIONS = ('skills', 'industries', 'preferred_locations')
+
+
+def backfill_profile_completion(apps, schema_editor):
+    InternProfile = apps.get_model('core', 'InternProfile')
+    Education = apps.get_model('core', 'Education')
+
+    checks = {
+        f'has_{relation}': Exists(InternProfile.objects.filter(pk=OuterRef('pk'), **{f'{relation}__isnull': False}))
+        for relation in COMPLETION_RELATIONS
+    }
+    checks['has_education'] = Exists(Education.objects.filter(intern=OuterRef('pk')))
+    rows = InternProfile.objects.annotate(**checks).values('pk', *COMPLETION_FIELDS, *checks)
+
+    changed = []
+    for row in rows.iterator(chunk_size=500):
+        filled = sum(1 for field in COMPLETION_FIELDS if row[field]) + sum(1 for check in checks if row[check])
+        changed.append(InternProfile(pk=row['pk'], profile_completion=filled * 10))
+        if len(changed) >= 500:
+            InternProfile.objects.bulk_update(changed, ['profile_completion'])
+            changed = []
+    InternProfile.objects.bulk_update(changed, ['profile_completion'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0008_emailoutbox_retries'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='internprofile',
+            name='profile_completion',
+            field=models.PositiveSmallIntegerField(default=0, editable=False),
+        ),
+        migrations.AddIndex(
+            model_name='internprofile',
+            index=models.Index(fields=['profile_completion'], name='core_intern_profile_32da18_idx'),
+        ),
+        migrations.RunPython(backfill_profile_completion, migrations.RunPython.noop),
+    ]
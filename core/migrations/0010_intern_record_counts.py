@@ -0,0 +1,49 @@
+# Generated by Django 4.2.8 on 2026-10-19 01:47
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def backfill_record_counts(apps, schema_editor):
+    InternProfile = apps.get_model('core', 'InternProfile')
+    Education = apps.get_model('core', 'Education')
+    WorkExperience = apps.get_model('core', 'WorkExperience')
+
+    def count_of(model):
+        records = model.objects.filter(intern=OuterRef('pk')).order_by().values('intern')
+        return Coalesce(Subquery(records.annotate(total=Count('pk')).values('total')), 0)
+
+    InternProfile.objects.update(
+        education_count=count_of(Education),
+        experience_count=count_of(WorkExperience),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0009_intern_profile_completion'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='internprofile',
+            name='education_count',
+            field=models.PositiveSmallIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='internprofile',
+            name='experience_count',
+            field=models.PositiveSmallIntegerField(default=0, editable=False),
+        ),
+        migrations.AddIndex(
+            model_name='internprofile',
+            index=models.Index(fields=['education_count'], name='core_intern_educati_97c672_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='internprofile',
+            index=models.Index(fields=['experience_count'], name='core_intern_experie_0f3473_idx'),
+        ),
+        migrations.RunPython(backfill_record_counts, migrations.RunPython.noop),
+    ]
@@ -1,8 +1,9 @@
 from django.db import models
+from django.db.models.functions import Greatest
 from django.conf import settings
 from django.utils.text import slugify
 from django.utils import timezone
-from django.db.models.signals import pre_save, post_save
+from django.db.models.signals import pre_save, post_save, post_delete, m2m_changed
 from django.dispatch import receiver
 from django.core.validators import FileExtensionValidator
 
@@ -130,6 +131,15 @@ class InternProfile(models.Model):
         related_name='interested_interns'
     )
     
+    # Stored completion score, kept current by signals on the profile,
+    # its many-to-many fields and education records
+    profile_completion = models.PositiveSmallIntegerField(default=0, editable=False)
+    
+    # Denormalized record counts, moved atomically by Education/WorkExperience signals
+    education_count = models.PositiveSmallIntegerField(default=0, editable=False)
+    experience_count = models.PositiveSmallIntegerField(default=0, editable=False)
+    SIGNAL_MAINTAINED_FIELDS = ('education_count', 'experience_count', 'profile_completion')
+    
     # Timestamps
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
@@ -142,13 +152,48 @@ class InternProfile(models.Model):
             models.Index(fields=['user']),
             models.Index(fields=['current_province']),
             models.Index(fields=['-created_at']),
+            models.Index(fields=['profile_completion']),
+            models.Index(fields=['education_count']),
+            models.Index(fields=['experience_count']),
         ]
     
     def __str__(self):
         return f"{self.user.username}'s Profile"
     
+    def save(self, *args, **kwargs):
+        # A full save from an instance loaded before a record was added must
+        # not overwrite the signal-maintained columns with stale values
+        if not self._state.adding and kwargs.get('update_fields') is None:
+            kwargs['update_fields'] = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key and field.name not in self.SIGNAL_MAINTAINED_FIELDS
+            ]
+        super().save(*args, **kwargs)
+    
+    @classmethod
+    def recompute_record_counts(cls, queryset=None):
+        """
+        Rebuild education_count/experience_count from the records (repair task)
+        Returns the number of profiles updated
+        """
+        from django.db.models import Count, OuterRef, Subquery
+        from django.db.models.functions import Coalesce
+        
+        def count_of(model):
+            records = model.objects.filter(intern=OuterRef('pk')).order_by().values('intern')
+            return Coalesce(Subquery(records.annotate(total=Count('pk')).values('total')), 0)
+        
+        queryset = cls.objects.all() if queryset is None else queryset
+        return queryset.update(
+            education_count=count_of(Education),
+            experience_count=count_of(WorkExperience),
+        )
+    
     def get_profile_completion_percentage(self):
-        """Calculate profile completion percentage"""
+        """
+        Calculate profile completion percentage
+        Reads are served from profile_completion; this recomputes it
+        """
         fields_to_check = [
             self.full_name,
             self.phone,
@@ -169,13 +214,29 @@ class InternProfile(models.Model):
         if self.preferred_locations.exists():
             filled_count += 1
         
-        # Check related models
-        if hasattr(self, 'education_set') and self.education_set.exists():
+        # Check related models (counter kept current by the Education signals)
+        if self.education_count > 0:
             filled_count += 1
         
         total_fields = 10  # Total checkable fields
         return int((filled_count / total_fields) * 100)
     
+    def update_profile_completion(self):
+        """
+        Recompute and store profile_completion (without firing save signals)
+        Called whenever the profile's data changes, so the cached dashboard
+        summary (profile, matches) is dropped as well
+        """
+        from .services.dashboard import invalidate_dashboard_summary
+        # This instance may predate the latest record signals; score the stored counters
+        self.refresh_from_db(fields=self.SIGNAL_MAINTAINED_FIELDS)
+        completion = self.get_profile_completion_percentage()
+        if completion != self.profile_completion:
+            InternProfile.objects.filter(pk=self.pk).update(profile_completion=completion)
+            self.profile_completion = completion
+        invalidate_dashboard_summary(self.user_id)
+        return completion
+    
     @property
     def has_profile_photo(self):
         """Check if profile has a photo"""
@@ -269,6 +330,10 @@ class InternDocument(models.Model):
     uploaded_at = models.DateTimeField(auto_now_add=True)
     is_latest = models.BooleanField(default=True)
     
+    # Plain text pulled from DOCX/PDF uploads for search (filled in the background)
+    extracted_text = models.TextField(blank=True, editable=False)
+    text_extracted_at = models.DateTimeField(null=True, blank=True, editable=False)
+    
     class Meta:
         verbose_name = 'Intern Document'
         verbose_name_plural = 'Intern Documents'
@@ -306,6 +371,14 @@ def update_document_version(sender, instance, **kwargs):
         instance.increment_version()
 
 
+@receiver(post_save, sender=InternDocument)
+def queue_document_text_extraction(sender, instance, created, **kwargs):
+    """Extract searchable text from new latest versions in the background"""
+    if created and instance.is_latest:
+        from .services.documents import schedule_text_extraction
+        schedule_text_extraction(instance.pk)
+
+
 # =====================================================
 # EDUCATION & EXPERIENCE
 # =====================================================
@@ -372,6 +445,63 @@ class WorkExperience(models.Model):
         return f"{self.position} at {self.company}"
 
 
+@receiver(post_save, sender=InternProfile)
+def update_completion_on_save(sender, instance, **kwargs):
+    """Profile fields count towards completion"""
+    instance.update_profile_completion()
+
+
+@receiver(m2m_changed, sender=InternProfile.skills.through)
+@receiver(m2m_changed, sender=InternProfile.industries.through)
+@receiver(m2m_changed, sender=InternProfile.preferred_locations.through)
+def update_completion_on_m2m(sender, instance, action, reverse, pk_set, **kwargs):
+    """Skills, industries and preferred locations count towards completion"""
+    if action not in ('post_add', 'post_remove', 'post_clear'):
+        return
+    if not reverse:
+        instance.update_profile_completion()
+    elif pk_set:
+        # Changed from the skill/industry/location side: pk_set holds profile ids
+        for profile in InternProfile.objects.filter(pk__in=pk_set):
+            profile.update_profile_completion()
+
+
+@receiver(post_save, sender=Education)
+@receiver(post_save, sender=WorkExperience)
+def count_new_record(sender, instance, created, **kwargs):
+    """Bump the profile's education_count/experience_count"""
+    if created:
+        field = 'education_count' if sender is Education else 'experience_count'
+        InternProfile.objects.filter(pk=instance.intern_id).update(**{field: models.F(field) + 1})
+
+
+@receiver(post_delete, sender=Education)
+@receiver(post_delete, sender=WorkExperience)
+def count_deleted_record(sender, instance, **kwargs):
+    """Lower the profile's education_count/experience_count without going below zero"""
+    field = 'education_count' if sender is Education else 'experience_count'
+    InternProfile.objects.filter(pk=instance.intern_id).update(
+        **{field: Greatest(models.F(field) - 1, models.Value(0))}
+    )
+
+
+@receiver(post_save, sender=Education)
+@receiver(post_delete, sender=Education)
+def update_completion_on_education(sender, instance, **kwargs):
+    """Having an education record counts towards completion"""
+    profile = InternProfile.objects.filter(pk=instance.intern_id).first()
+    if profile:
+        profile.update_profile_completion()
+
+
+@receiver(post_save, sender=WorkExperience)
+@receiver(post_delete, sender=WorkExperience)
+def invalidate_dashboard_on_experience(sender, instance, **kwargs):
+    """Experience feeds the dashboard matches"""
+    from .services.dashboard import invalidate_intern_dashboards
+    invalidate_intern_dashboards([instance.intern_id])
+
+
 # =====================================================
 # INTERNSHIP POSTING SYSTEM
 # =====================================================
@@ -473,10 +603,10 @@ class InternshipPost(models.Model):
         from django.utils import timezone
         return timezone.now().date() > self.application_deadline
     
-    def increment_views(self):
-        """Increment the view count"""
-        self.views_count += 1
-        self.save(update_fields=['views_count'])
+    def increment_views(self, request=None):
+        """Count a view (buffered in the cache, flushed to views_count in bulk)"""
+        from .services.view_counters import record_view
+        return record_view(self, request)
     
     @property
     def is_accepting_applications(self):
@@ -493,6 +623,37 @@ class InternshipPost(models.Model):
         return delta.days
 
 
+@receiver(post_save, sender=InternshipPost)
+@receiver(post_delete, sender=InternshipPost)
+@receiver(m2m_changed, sender=InternshipPost.skills_required.through)
+def invalidate_internship_filters(sender, **kwargs):
+    """Drop cached filter results whenever the internship catalogue changes"""
+    if kwargs.get('action', 'post_').startswith('pre_'):
+        return
+    # View counter updates don't change what a search would return
+    if kwargs.get('update_fields') and set(kwargs['update_fields']) <= {'views_count'}:
+        return
+    from .services.filters import bump_filter_version
+    bump_filter_version()
+
+
+@receiver(post_save, sender=EmployerProfile)
+def invalidate_employer_dashboard_on_save(sender, instance, **kwargs):
+    """The employer dashboard shows the profile"""
+    from .services.dashboard import invalidate_dashboard_summary
+    invalidate_dashboard_summary(instance.user_id)
+
+
+@receiver(post_save, sender=InternshipPost)
+@receiver(post_delete, sender=InternshipPost)
+def invalidate_employer_dashboard_on_internship(sender, instance, **kwargs):
+    """The employer dashboard lists active internships"""
+    if kwargs.get('update_fields') and set(kwargs['update_fields']) <= {'views_count'}:
+        return
+    from .services.dashboard import invalidate_employer_dashboards
+    invalidate_employer_dashboards(employer_ids=[instance.employer_id])
+
+
 # =====================================================
 # MESSAGING SYSTEM
 # =====================================================
@@ -513,6 +674,10 @@ class Conversation(models.Model):
     updated_at = models.DateTimeField(auto_now=True)
     last_message_at = models.DateTimeField(null=True, blank=True)
     
+    # Denormalized unread counters, one per side of the conversation
+    intern_unread = models.PositiveIntegerField(default=0)
+    employer_unread = models.PositiveIntegerField(default=0)
+    
     class Meta:
         verbose_name = 'Conversation'
         verbose_name_plural = 'Conversations'
@@ -527,16 +692,86 @@ class Conversation(models.Model):
     def __str__(self):
         return f"{self.employer.company_name} ↔ {self.intern.user.username}"
     
+    @staticmethod
+    def unread_field_for(user):
+        """Name of the unread counter holding messages waiting for this user"""
+        if user.user_type == 'intern':
+            return 'intern_unread'
+        if user.user_type == 'employer':
+            return 'employer_unread'
+        return None
+    
     def get_unread_count(self, user):
-        """Get unread message count for a specific user"""
-        return self.messages.filter(is_read=False).exclude(sender_user=user).count()
+        """Get unread message count for a specific user (no query)"""
+        field = self.unread_field_for(user)
+        if field is None:
+            return self.intern_unread + self.employer_unread
+        return getattr(self, field)
     
     def mark_messages_as_read(self, user):
         """Mark all messages in conversation as read for a user"""
-        self.messages.filter(is_read=False).exclude(sender_user=user).update(
+        updated = self.messages.filter(is_read=False).exclude(sender_user=user).update(
             is_read=True,
             read_at=timezone.now()
         )
+        field = self.unread_field_for(user)
+        if updated and field:
+            self._decrement_unread(field, updated)
+        return updated
+    
+    def _decrement_unread(self, field, amount):
+        """Atomically lower an unread counter without going below zero"""
+        Conversation.objects.filter(pk=self.pk).update(
+            **{field: Greatest(models.F(field) - amount, models.Value(0))}
+        )
+        setattr(self, field, max(getattr(self, field) - amount, 0))
+        
+        from .services.badges import invalidate_unread_badges
+        from .services.dashboard import invalidate_dashboard_summary
+        invalidate_unread_badges(self.unread_user_id(field), 'messages')
+        if field == 'employer_unread':
+            invalidate_dashboard_summary(self.unread_user_id(field))
+    
+    def unread_user_id(self, field):
+        """User whose badge an unread counter feeds"""
+        if field == 'intern_unread':
+            return self.intern.user_id
+        return self.employer.user_id
+    
+    @classmethod
+    def recompute_unread_counters(cls, queryset=None):
+        """
+        Rebuild the unread counters from Message rows (repair task)
+        Returns the number of conversations updated
+        """
+        from django.db.models import Count, OuterRef, Subquery
+        from django.db.models.functions import Coalesce
+        
+        unread = Message.objects.filter(
+            conversation=OuterRef('pk'),
+            is_read=False
+        ).order_by().values('conversation')
+        
+        def count_of(messages):
+            return Coalesce(
+                Subquery(messages.annotate(total=Count('pk')).values('total')),
+                0
+            )
+        
+        queryset = cls.objects.all() if queryset is None else queryset
+        updated = queryset.update(
+            intern_unread=count_of(unread.filter(sender_user__user_type='employer')),
+            employer_unread=count_of(unread.exclude(sender_user__user_type='employer')),
+        )
+        
+        # Badges derived from the old counters are now stale
+        from .services.badges import invalidate_unread_badges
+        from .services.dashboard import invalidate_dashboard_summary
+        for intern_user_id, employer_user_id in queryset.values_list('intern__user_id', 'employer__user_id'):
+            invalidate_unread_badges(intern_user_id, 'messages')
+            invalidate_unread_badges(employer_user_id, 'messages')
+            invalidate_dashboard_summary(employer_user_id)
+        return updated
 
 
 class Message(models.Model):
@@ -562,6 +797,7 @@ class Message(models.Model):
         ordering = ['sent_at']
         indexes = [
             models.Index(fields=['conversation', 'is_read']),
+            models.Index(fields=['conversation', 'sent_at']),  # History pages
             models.Index(fields=['sender_user']),
             models.Index(fields=['sent_at']),
         ]
@@ -575,65 +811,128 @@ class Message(models.Model):
             self.is_read = True
             self.read_at = timezone.now()
             self.save(update_fields=['is_read', 'read_at'])
+            self.conversation._decrement_unread(self.recipient_unread_field, 1)
+    
+    @property
+    def recipient_unread_field(self):
+        """Unread counter on the conversation that this message counts towards"""
+        if self.sender_user.user_type == 'employer':
+            return 'intern_unread'
+        return 'employer_unread'
+
+
+# =====================================================
+# EMAIL OUTBOX
+# =====================================================
+
+class EmailOutbox(models.Model):
+    """
+    Queued outgoing email, delivered by the send_queued_emails command
+    
+    Requests only insert a row; SMTP happens in the worker. Rows sharing a
+    coalesce_key while still pending are merged into a single email. Failed
+    sends are retried with backoff until they are dead-lettered.
+    """
+    STATUS_PENDING = 'pending'
+    STATUS_SENDING = 'sending'
+    STATUS_SENT = 'sent'
+    STATUS_DEAD = 'dead'
+    STATUS_CHOICES = [
+        (STATUS_PENDING, 'Pending'),
+        (STATUS_SENDING, 'Sending'),
+        (STATUS_SENT, 'Sent'),
+        (STATUS_DEAD, 'Dead letter'),
+    ]
+    
+    PRIORITY_NORMAL = 0
+    PRIORITY_HIGH = 10  # Login codes and confirmations jump the queue
+    
+    to_email = models.EmailField()
+    subject = models.CharField(max_length=255)
+    html_body = models.TextField()
+    text_body = models.TextField(blank=True)
+    
+    coalesce_key = models.CharField(max_length=100, blank=True, help_text='Pending rows with the same key are merged')
+    coalesced_count = models.PositiveIntegerField(default=1)
+    
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=STATUS_PENDING)
+    priority = models.SmallIntegerField(default=PRIORITY_NORMAL)
+    send_after = models.DateTimeField(default=timezone.now)
+    locked_at = models.DateTimeField(null=True, blank=True, help_text='When a worker claimed the email')
+    attempts = models.PositiveIntegerField(default=0)
+    last_error = models.TextField(blank=True)
+    
+    created_at = models.DateTimeField(auto_now_add=True)
+    sent_at = models.DateTimeField(null=True, blank=True)
+    
+    class Meta:
+        verbose_name = 'Queued Email'
+        verbose_name_plural = 'Email Outbox'
+        ordering = ['send_after', 'pk']
+        indexes = [
+            models.Index(fields=['status', 'send_after']),  # Worker scan
+            models.Index(fields=['coalesce_key', 'status']),
+        ]
+    
+    def __str__(self):
+        return f"{self.to_email}: {self.subject} ({self.status})"
 
 
 @receiver(post_save, sender=Message)
-def send_message_notification(sender, instance, created, **kwargs):
-    """Send email notification when new message is sent"""
+def update_conversation_counters(sender, instance, created, **kwargs):
+    """Bump the recipient's unread counter and the conversation timestamp"""
     if created:
-        print(f"📬 Message signal triggered for message ID: {instance.pk}")
+        field = instance.recipient_unread_field
+        Conversation.objects.filter(pk=instance.conversation_id).update(
+            last_message_at=instance.sent_at,
+            **{field: models.F(field) + 1}
+        )
         
+        from .services.badges import increment_unread_badge
+        from .services.dashboard import invalidate_employer_dashboards
+        increment_unread_badge(instance.conversation.unread_user_id(field), 'messages')
+        # The employer dashboard lists recent conversations
+        invalidate_employer_dashboards(employer_ids=[instance.conversation.employer_id])
+
+
+@receiver(post_delete, sender=Message)
+def release_unread_message(sender, instance, **kwargs):
+    """Deleting an unread message (admin, cascades) takes it off the recipient's counter"""
+    if instance.is_read:
+        return
+    # The conversation may already be gone when it is the one being deleted
+    conversation = Conversation.objects.filter(pk=instance.conversation_id).first()
+    if conversation:
+        conversation._decrement_unread(instance.recipient_unread_field, 1)
+
+
+@receiver(post_save, sender=Conversation)
+@receiver(post_delete, sender=Conversation)
+def invalidate_employer_dashboard_on_conversation(sender, instance, **kwargs):
+    """New and removed conversations change the employer's recent list"""
+    from .services.dashboard import invalidate_employer_dashboards
+    invalidate_employer_dashboards(employer_ids=[instance.employer_id])
+
+
+@receiver(post_save, sender=Message)
+def publish_message_event(sender, instance, created, **kwargs):
+    """Push new messages to open conversation streams"""
+    if created:
+        from .services.events import conversation_channel, message_event, publish_on_commit
+        publish_on_commit(conversation_channel(instance.conversation_id), message_event(instance))
+
+
+@receiver(post_save, sender=Message)
+def send_message_notification(sender, instance, created, **kwargs):
+    """Queue an email notification for the recipient of a new message"""
+    if created:
         # Check if email notifications are enabled
-        from django.conf import settings
         if not getattr(settings, 'ENABLE_EMAIL_NOTIFICATIONS', True):
-            print(f"📧 Email notifications disabled in settings")
-            # Still update conversation timestamp
-            instance.conversation.last_message_at = instance.sent_at
-            instance.conversation.save(update_fields=['last_message_at'])
             return
         
         try:
-            from core.email_service import send_email
-            
-            print(f"📧 Preparing email notification...")
-            # Determine recipient
-            if instance.sender_user.user_type == 'employer':
-                recipient = instance.conversation.intern.user
-                sender_name = instance.conversation.employer.company_name
-            else:
-                recipient = instance.conversation.employer.user
-                sender_name = instance.conversation.intern.full_name or instance.conversation.intern.user.username
-            
-            subject = f'New Message from {sender_name}'
-            message = f"""
-Hello {recipient.username},<br>
-
-You have received a new message from {sender_name}.
-
-Message preview:<br>
-\"{instance.message[:200]}{'...' if len(instance.message) > 200 else ''} \"<br>
-
-Log in to your inbox to read and reply to this message.<br>
-
-Best regards,<br>
-The Lwazi Blue Team
-            """
-            
-            print(f"📤 Attempting to send email to {recipient.email}...")
-            # Send email using custom smtplib service (non-blocking - don't wait)
-            try:
-                send_email(recipient.email, subject, message, message)
-                print(f"✅ Email sent successfully")
-            except Exception as email_error:
-                # Don't let email errors block message saving
-                print(f"⚠️  Email notification failed (non-critical): {email_error}")
-            
-            # Update conversation last_message_at
-            print(f"⏰ Updating conversation last_message_at...")
-            instance.conversation.last_message_at = instance.sent_at
-            instance.conversation.save(update_fields=['last_message_at'])
-            print(f"✅ Signal completed successfully")
-            
+            from .services.outbox import queue_message_email
+            queue_message_email(instance)
         except Exception as e:
             # Don't let signal errors block the request
             print(f"⚠️  Message notification signal error: {e}")
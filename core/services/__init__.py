@@ -1,5 +1,6 @@
 from .matching import InternshipMatchingService, InternMatchingService
 from .search import SearchService
+from .filters import InternshipFilterPipeline
 
-__all__ = ['InternshipMatchingService', 'InternMatchingService', 'SearchService']
+__all__ = ['InternshipMatchingService', 'InternMatchingService', 'SearchService', 'InternshipFilterPipeline']
 
@@ -0,0 +1,93 @@
+"""
+Unread Badge Counts for Lwazi Blue
+Per-user cached message/notification counts shown in the navbar
+
+Signals drop the cached counts when they change. Only a shared cache
+(CACHE_URL) sees those deletes from every process, so without one the
+entries live for CACHE_TTL['unread_badges'] seconds only.
+"""
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Sum
+
+
+BADGE_KINDS = ('messages', 'notifications')
+
+
+def badge_cache_key(user_id, kind):
+    return f'unread_badges:{user_id}:{kind}'
+
+
+def _badge_timeout():
+    return getattr(settings, 'CACHE_TTL', {}).get('unread_badges', 60 * 60)
+
+
+def _count_unread_messages(user):
+    """Sum the denormalized conversation counters for the user's side"""
+    from ..models import Conversation
+
+    if user.user_type == 'intern':
+        conversations = Conversation.objects.filter(intern__user=user)
+        field = 'intern_unread'
+    elif user.user_type == 'employer':
+        conversations = Conversation.objects.filter(employer__user=user)
+        field = 'employer_unread'
+    else:
+        return 0
+    return conversations.aggregate(total=Sum(field))['total'] or 0
+
+
+def _count_unread_notifications(user):
+    """Read the maintained per-user notification counter"""
+    from notifications.models import NotificationCounter
+    total, unread = NotificationCounter.counts_for(user)
+    return unread
+
+
+COUNTERS = {
+    'messages': _count_unread_messages,
+    'notifications': _count_unread_notifications,
+}
+
+
+def get_unread_badges(user):
+    """
+    Get {'messages': n, 'notifications': m} for a user
+
+    Served from the cache; only the missing counts are recomputed.
+    """
+    keys = {kind: badge_cache_key(user.pk, kind) for kind in BADGE_KINDS}
+    cached = cache.get_many(keys.values())
+
+    badges = {}
+    missing = {}
+    for kind, key in keys.items():
+        if key in cached:
+            badges[kind] = cached[key]
+        else:
+            badges[kind] = missing[key] = COUNTERS[kind](user)
+
+    if missing:
+        cache.set_many(missing, _badge_timeout())
+    return badges
+
+
+def increment_unread_badge(user_id, kind, delta=1):
+    """Adjust a cached badge in place; a cold cache is left to be recomputed"""
+    try:
+        cache.incr(badge_cache_key(user_id, kind), delta)
+    except ValueError:
+        pass
+
+
+def invalidate_unread_badges(user_id, kind=None):
+    """Drop cached badge counts so the next render recomputes them"""
+    kinds = BADGE_KINDS if kind is None else (kind,)
+    cache.delete_many([badge_cache_key(user_id, k) for k in kinds])
+
+
+def invalidate_unread_badges_many(user_ids, kind=None):
+    """Drop cached badge counts for many users in one cache call"""
+    kinds = BADGE_KINDS if kind is None else (kind,)
+    cache.delete_many([badge_cache_key(user_id, k) for user_id in user_ids for k in kinds])
@@ -0,0 +1,173 @@
+"""
+Dashboard Summaries for Lwazi Blue
+Per-user summary objects behind the dashboard pages, cached between visits
+
+A summary holds everything the dashboard shows except the unread badges,
+which already have their own signal-maintained cache (core.services.badges)
+shared with the navbar. A warm dashboard render therefore reads two cache
+entries and runs no queries of its own. Summaries are dropped by the
+signals that change what they hold, once the change is committed (a
+summary rebuilt before the commit would cache the old data); intern matches
+also depend on the whole catalogue, so entries expire after
+CACHE_TTL['dashboard_summary'] as well. That TTL is short unless the cache
+is shared (CACHE_URL): a per-process cache only hears its own invalidations.
+"""
+
+from dataclasses import dataclass, field
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import OuterRef, Q, Subquery, Sum
+from django.db.models.functions import Coalesce
+
+
+def dashboard_cache_key(user_id):
+    return f'dashboard_summary:{user_id}'
+
+
+def _summary_timeout():
+    return getattr(settings, 'CACHE_TTL', {}).get('dashboard_summary', 60 * 5)
+
+
+@dataclass
+class InternDashboardSummary:
+    """What the intern dashboard shows, minus the unread badges"""
+    profile: object
+    total_applications: int = 0
+    recent_applications: list = field(default_factory=list)
+    matched_internships: list = field(default_factory=list)
+
+    @property
+    def completion_percentage(self):
+        return self.profile.profile_completion
+
+
+def _build_intern_summary(user):
+    from applications.models import Application, InternStatusCount
+    from ..models import InternProfile
+    from .matching import InternshipMatchingService
+
+    profile, created = InternProfile.objects.get_or_create(user=user)
+    recent_applications = list(
+        Application.objects.filter(intern=profile).select_related(
+            'internship', 'internship__employer'
+        ).order_by('-applied_at')[:5]
+    )
+    return InternDashboardSummary(
+        profile=profile,
+        total_applications=sum(InternStatusCount.counts_for(profile.pk).values()),
+        recent_applications=recent_applications,
+        matched_internships=InternshipMatchingService().get_matched_internships(profile, limit=5),
+    )
+
+
+def get_intern_dashboard_summary(user):
+    """Cached InternDashboardSummary for an intern user, built on a miss"""
+    key = dashboard_cache_key(user.pk)
+    summary = cache.get(key)
+    if summary is None:
+        summary = _build_intern_summary(user)
+        cache.set(key, summary, _summary_timeout())
+    return summary
+
+
+@dataclass
+class EmployerDashboardSummary:
+    """What the employer dashboard shows, minus the unread badges"""
+    profile: object
+    active_internships_count: int = 0
+    active_internships: list = field(default_factory=list)
+    total_applications: int = 0
+    recent_applications: list = field(default_factory=list)
+    recent_conversations: list = field(default_factory=list)
+
+
+def _build_employer_summary(profile):
+    """Fixed number of queries however many internships and conversations the employer has"""
+    from applications.models import Application, InternshipStatusCount
+    from ..models import Conversation, InternshipPost
+
+    application_counts = InternshipStatusCount.objects.filter(
+        internship=OuterRef('pk')
+    ).order_by().values('internship').annotate(total=Sum('count')).values('total')
+
+    active_internships = InternshipPost.objects.filter(
+        employer=profile,
+        is_active=True,
+        is_published=True
+    )
+    total_applications = InternshipStatusCount.objects.filter(
+        internship__employer=profile
+    ).aggregate(total=Sum('count'))['total'] or 0
+
+    recent_applications = list(
+        Application.objects.filter(internship__employer=profile).select_related(
+            'intern', 'intern__user', 'internship'
+        ).order_by('-applied_at')[:5]
+    )
+
+    # Unread counts are denormalized on the conversation
+    recent_conversations = list(
+        Conversation.objects.filter(employer=profile).select_related(
+            'intern', 'intern__user'
+        ).order_by('-last_message_at')[:5]
+    )
+    for conversation in recent_conversations:
+        conversation.unread_count = conversation.employer_unread
+
+    return EmployerDashboardSummary(
+        profile=profile,
+        active_internships_count=active_internships.count(),
+        active_internships=list(active_internships.annotate(application_count=Coalesce(Subquery(application_counts), 0))[:5]),
+        total_applications=total_applications,
+        recent_applications=recent_applications,
+        recent_conversations=recent_conversations,
+    )
+
+
+def get_employer_dashboard_summary(user):
+    """
+    Cached EmployerDashboardSummary for an employer user, built on a miss
+    Returns None (uncached) while the employer has no profile yet
+    """
+    from ..models import EmployerProfile
+
+    key = dashboard_cache_key(user.pk)
+    summary = cache.get(key)
+    if summary is None:
+        profile = EmployerProfile.objects.filter(user=user).first()
+        if profile is None:
+            return None
+        summary = _build_employer_summary(profile)
+        cache.set(key, summary, _summary_timeout())
+    return summary
+
+
+def invalidate_dashboard_summary(user_id):
+    """Drop a user's cached summary once the transaction commits, so the next visit rebuilds it"""
+    key = dashboard_cache_key(user_id)
+    transaction.on_commit(lambda: cache.delete(key))
+
+
+def invalidate_dashboard_summaries(user_ids):
+    """Drop the cached summaries of many users in one cache call, once the transaction commits"""
+    keys = [dashboard_cache_key(user_id) for user_id in set(user_ids)]
+    if keys:
+        transaction.on_commit(lambda: cache.delete_many(keys))
+
+
+def invalidate_intern_dashboards(profile_ids):
+    """Drop the summaries of the given InternProfile ids (one query to find their users)"""
+    from ..models import InternProfile
+    user_ids = InternProfile.objects.filter(pk__in=set(profile_ids)).values_list('user_id', flat=True)
+    invalidate_dashboard_summaries(user_ids)
+
+
+def invalidate_employer_dashboards(employer_ids=(), internship_ids=()):
+    """Drop the summaries of the given EmployerProfile ids and of the given internships' employers (one query)"""
+    from ..models import EmployerProfile
+    user_ids = EmployerProfile.objects.filter(
+        Q(pk__in=set(employer_ids)) | Q(internship_posts__pk__in=set(internship_ids))
+    ).values_list('user_id', flat=True)
+    invalidate_dashboard_summaries(user_ids)
@@ -0,0 +1,326 @@
+"""
+Document Text Extraction for Lwazi Blue
+Pulls plain text out of uploaded CVs and transcripts so search can see it
+"""
+
+import re
+import zlib
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
+from xml.etree import ElementTree
+
+from django.conf import settings
+from django.db import close_old_connections, connection, transaction
+from django.utils import timezone
+
+
+# Upper bound on stored text per document (roughly 30 pages of prose)
+MAX_EXTRACTED_CHARS = 100000
+
+WORD_NAMESPACE = '{http://schemas.openxmlformats.org/wordprocessingml/2006/main}'
+
+# Inside a PDF content stream: font selection (/F1 12 Tf) and the text showing
+# operators (text) Tj, <0048> Tj, [(te) -20 <0078>] TJ, ' and "
+PDF_TEXT_TOKENS = re.compile(
+    rb'/([^\s/<>\[\]()]+)\s+[-\d.]+\s+Tf'
+    rb'|(\((?:\\.|[^\\)])*\)|<[0-9A-Fa-f\s]*>|\[(?:\\.|[^\]])*\])\s*(?:Tj|TJ|\'|")'
+)
+PDF_STRING = re.compile(rb'\((?:\\.|[^\\)])*\)|<[0-9A-Fa-f\s]*>')
+PDF_OBJECT = re.compile(rb'(\d+)\s+\d+\s+obj\b(.*?)\bendobj', re.DOTALL)
+PDF_STREAM = re.compile(rb'<<(.*?)>>\s*stream\r?\n(.*?)\r?\nendstream', re.DOTALL)
+PDF_REF = re.compile(rb'(\d+)\s+\d+\s+R')
+PDF_FONT_ENTRY = re.compile(rb'/([^\s/<>\[\]()]+)\s*(\d+)\s+\d+\s+R')
+PDF_HEX = re.compile(rb'<([0-9A-Fa-f\s]*)>')
+PDF_CMAP_BFCHAR = re.compile(rb'beginbfchar(.*?)endbfchar', re.DOTALL)
+PDF_CMAP_BFRANGE = re.compile(rb'beginbfrange(.*?)endbfrange', re.DOTALL)
+PDF_CMAP_RANGE = re.compile(rb'<([0-9A-Fa-f]+)>\s*<([0-9A-Fa-f]+)>\s*(<[0-9A-Fa-f\s]*>|\[[^\]]*\])')
+PDF_ESCAPES = {
+    b'n': b'\n', b'r': b'\r', b't': b'\t', b'b': b'\b', b'f': b'\f',
+    b'(': b'(', b')': b')', b'\\': b'\\',
+}
+
+
+class DocumentTextExtractor:
+    """Extract plain text from DOCX and text-based PDF files"""
+
+    SUPPORTED_EXTENSIONS = ('docx', 'pdf')
+
+    def extract(self, file_obj, filename):
+        """
+        Extract text from an open file
+
+        Returns an empty string for unsupported or unreadable files
+        (scanned PDFs, images, legacy .doc).
+        """
+        ext = filename.rsplit('.', 1)[-1].lower() if '.' in filename else ''
+        try:
+            if ext == 'docx':
+                text = self._extract_docx(file_obj)
+            elif ext == 'pdf':
+                text = self._extract_pdf(file_obj.read())
+            else:
+                return ''
+        except (zipfile.BadZipFile, ElementTree.ParseError, KeyError, zlib.error) as e:
+            print(f"⚠️  Text extraction failed for {filename}: {e}")
+            return ''
+        return self._normalize(text)[:MAX_EXTRACTED_CHARS]
+
+    def _extract_docx(self, file_obj):
+        """Read paragraphs from word/document.xml inside the DOCX zip"""
+        with zipfile.ZipFile(file_obj) as archive:
+            xml = archive.read('word/document.xml')
+        root = ElementTree.fromstring(xml)
+        paragraphs = []
+        for paragraph in root.iter(f'{WORD_NAMESPACE}p'):
+            parts = []
+            for node in paragraph.iter():
+                if node.tag == f'{WORD_NAMESPACE}t' and node.text:
+                    parts.append(node.text)
+                elif node.tag == f'{WORD_NAMESPACE}tab':
+                    parts.append('\t')
+            if parts:
+                paragraphs.append(''.join(parts))
+        return '\n'.join(paragraphs)
+
+    def _extract_pdf(self, data):
+        """
+        Decode content streams and collect the strings drawn by text operators
+
+        Strings are decoded through the ToUnicode map of the font selected
+        with Tf, which is how Word and most "Save as PDF" tools (hex strings
+        in Identity-H fonts) make text recoverable. Text that can't be
+        decoded is skipped rather than stored as junk.
+        """
+        objects = self._pdf_objects(data)
+        fonts = self._pdf_fonts(objects)
+
+        # Font resource names per content stream; names seen anywhere are
+        # the fallback for inherited resources
+        content_fonts = {}
+        fallback_names = {}
+        for num, (dictionary, stream) in objects.items():
+            if re.search(rb'/Type\s*/Page\b', dictionary):
+                names = self._pdf_font_names(dictionary, objects)
+                contents = re.search(rb'/Contents\s*(\[[^\]]*\]|\d+\s+\d+\s+R)', dictionary)
+                for ref in PDF_REF.findall(contents.group(1)) if contents else ():
+                    content_fonts[int(ref)] = names
+            elif stream is not None and re.search(rb'/Subtype\s*/Form\b', dictionary):
+                names = content_fonts[num] = self._pdf_font_names(dictionary, objects)
+            else:
+                continue
+            for name, font_num in names.items():
+                fallback_names.setdefault(name, font_num)
+
+        chunks = []
+        for num, (dictionary, stream) in objects.items():
+            if not stream or b'BT' not in stream:
+                continue
+            names = content_fonts.get(num, {})
+            font = None
+            for match in PDF_TEXT_TOKENS.finditer(stream):
+                name, operand = match.groups()
+                if name is not None:
+                    font = fonts.get(names.get(name, fallback_names.get(name)))
+                    continue
+                text = ''.join(
+                    self._decode_pdf_text(self._pdf_string_bytes(s), font)
+                    for s in PDF_STRING.findall(operand)
+                )
+                if text and self._looks_like_text(text):
+                    chunks.append(text)
+        return '\n'.join(chunks)
+
+    def _pdf_objects(self, data):
+        """{object number: (dictionary, decoded stream or None)}, including objects packed in object streams"""
+        objects = {}
+        for num, body in PDF_OBJECT.findall(data):
+            match = PDF_STREAM.search(body)
+            if match:
+                dictionary, stream = match.groups()
+                objects[int(num)] = (dictionary, self._decode_pdf_stream(dictionary, stream))
+            else:
+                objects[int(num)] = (body, None)
+
+        for dictionary, stream in list(objects.values()):
+            if not stream or not re.search(rb'/Type\s*/ObjStm\b', dictionary):
+                continue
+            first = re.search(rb'/First\s+(\d+)', dictionary)
+            if not first:
+                continue
+            first = int(first.group(1))
+            header = [int(token) for token in stream[:first].split() if token.isdigit()]
+            entries = list(zip(header[::2], header[1::2]))
+            for i, (num, offset) in enumerate(entries):
+                end = entries[i + 1][1] if i + 1 < len(entries) else len(stream) - first
+                objects.setdefault(num, (stream[first + offset:first + end], None))
+        return objects
+
+    @staticmethod
+    def _decode_pdf_stream(dictionary, stream):
+        if b'/FlateDecode' in dictionary:
+            try:
+                # decompressobj tolerates the padding some writers leave after the data
+                return zlib.decompressobj().decompress(stream)
+            except zlib.error:
+                return None
+        if b'/Filter' in dictionary:
+            return None  # Images and other encodings carry no text
+        return stream
+
+    def _pdf_fonts(self, objects):
+        """{font object number: (ToUnicode map or None, composite)}"""
+        fonts = {}
+        for num, (dictionary, stream) in objects.items():
+            if not re.search(rb'/Type\s*/Font\b', dictionary):
+                continue
+            cmap = None
+            ref = re.search(rb'/ToUnicode\s*(\d+)\s+\d+\s+R', dictionary)
+            if ref:
+                cmap_stream = objects.get(int(ref.group(1)), (b'', None))[1]
+                cmap = self._parse_cmap(cmap_stream) if cmap_stream else None
+            fonts[num] = (cmap, bool(re.search(rb'/Subtype\s*/Type0\b', dictionary)))
+        return fonts
+
+    @staticmethod
+    def _pdf_font_names(dictionary, objects):
+        """{resource name: font object number} for a page or form dictionary"""
+        resources = re.search(rb'/Resources\s*(\d+)\s+\d+\s+R', dictionary)
+        if resources:
+            dictionary = objects.get(int(resources.group(1)), (b'', None))[0]
+        fonts = re.search(rb'/Font\s*(\d+)\s+\d+\s+R', dictionary)
+        if fonts:
+            dictionary = objects.get(int(fonts.group(1)), (b'', None))[0]
+        else:
+            inline = re.search(rb'/Font\s*<<(.*?)>>', dictionary, re.DOTALL)
+            dictionary = inline.group(1) if inline else b''
+        return {name: int(num) for name, num in PDF_FONT_ENTRY.findall(dictionary)}
+
+    @staticmethod
+    def _unhex(raw):
+        digits = re.sub(rb'\s', b'', raw)
+        if len(digits) % 2:
+            digits += b'0'  # A missing final digit is taken as 0
+        return bytes.fromhex(digits.decode('ascii'))
+
+    def _parse_cmap(self, stream):
+        """{character code bytes: unicode text} from a ToUnicode CMap's bfchar/bfrange blocks"""
+        cmap = {}
+        for block in PDF_CMAP_BFCHAR.findall(stream):
+            tokens = PDF_HEX.findall(block)
+            for source, target in zip(tokens[::2], tokens[1::2]):
+                cmap[self._unhex(source)] = self._unhex(target).decode('utf-16-be', 'ignore')
+        for block in PDF_CMAP_BFRANGE.findall(stream):
+            for low, high, target in PDF_CMAP_RANGE.findall(block):
+                width = len(self._unhex(low))
+                start, end = int(low, 16), int(high, 16)
+                if end < start or end - start > 0xFFFF:
+                    continue
+                if target.startswith(b'['):
+                    targets = [self._unhex(t) for t in PDF_HEX.findall(target)]
+                else:
+                    base = self._unhex(target[1:-1])
+                    base_value = int.from_bytes(base, 'big') if base else 0
+                    targets = [
+                        (base_value + offset).to_bytes(max(len(base), 2), 'big')
+                        for offset in range(end - start + 1)
+                    ]
+                for offset, unicode_bytes in enumerate(targets[:end - start + 1]):
+                    code = (start + offset).to_bytes(width, 'big')
+                    cmap[code] = unicode_bytes.decode('utf-16-be', 'ignore')
+        return cmap
+
+    def _pdf_string_bytes(self, token):
+        if token.startswith(b'<'):
+            return self._unhex(token[1:-1])
+        return self._unescape_pdf_string(token[1:-1])
+
+    @staticmethod
+    def _decode_pdf_text(raw, font):
+        """Map a string's character codes to text with the font's ToUnicode map"""
+        cmap, composite = font or (None, False)
+        if cmap:
+            width = 2 if composite else 1
+            return ''.join(cmap.get(raw[i:i + width], '') for i in range(0, len(raw), width))
+        if composite:
+            return ''  # Glyph ids without a ToUnicode map can't be turned into text
+        return raw.decode('latin-1')
+
+    @staticmethod
+    def _looks_like_text(text):
+        """Reject chunks that are mostly control characters (undecodable glyph ids)"""
+        printable = sum(1 for ch in text if ch.isprintable() or ch in '\t\n\r')
+        return printable >= len(text) * 0.9
+
+    @staticmethod
+    def _unescape_pdf_string(raw):
+        """Resolve backslash escapes in a PDF literal string"""
+        def replace(match):
+            escaped = match.group(1)
+            if escaped in PDF_ESCAPES:
+                return PDF_ESCAPES[escaped]
+            return bytes([int(escaped, 8) & 0xFF])
+        return re.sub(rb'\\([nrtbf()\\]|[0-7]{1,3})', replace, raw)
+
+    @staticmethod
+    def _normalize(text):
+        """Collapse runs of whitespace but keep line breaks"""
+        lines = (re.sub(r'[ \t\x0b\x0c]+', ' ', line).strip() for line in text.splitlines())
+        return '\n'.join(line for line in lines if line)
+
+
+# Small worker pool so uploads never wait on extraction
+_executor = None
+
+
+def get_extraction_executor():
+    """Get the shared extraction worker pool"""
+    global _executor
+    if _executor is None:
+        workers = getattr(settings, 'DOCUMENT_EXTRACTION_WORKERS', 2)
+        _executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='doc-extract')
+    return _executor
+
+
+def store_document_text(document):
+    """Extract text for an InternDocument and save it. Returns the characters stored."""
+    text = ''
+    if document.document:
+        with document.document.open('rb') as f:
+            text = DocumentTextExtractor().extract(f, document.document.name)
+
+    document.extracted_text = text
+    document.text_extracted_at = timezone.now()
+    type(document).objects.filter(pk=document.pk).update(
+        extracted_text=text,
+        text_extracted_at=document.text_extracted_at
+    )
+    return len(text)
+
+
+def extract_document_text(document_id):
+    """
+    Worker entry point: extract and store text for one InternDocument
+
+    Runs in a pool thread, so it manages its own DB connection.
+    """
+    from ..models import InternDocument
+
+    close_old_connections()
+    try:
+        document = InternDocument.objects.filter(pk=document_id).first()
+        if document is None:
+            return 0
+        return store_document_text(document)
+    except Exception as e:
+        # Extraction is best-effort, never let it break anything else
+        print(f"⚠️  Document text extraction error ({document_id}): {e}")
+        return 0
+    finally:
+        connection.close()
+
+
+def schedule_text_extraction(document_id):
+    """Queue extraction once the upload transaction has committed"""
+    transaction.on_commit(
+        lambda: get_extraction_executor().submit(extract_document_text, document_id)
+    )
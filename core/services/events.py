@@ -0,0 +1,261 @@
+"""
+Live Event Streaming for Lwazi Blue
+In-process pub/sub feeding the Server-Sent Events endpoints
+
+Model signals publish events; each open SSE connection subscribes to a
+channel with its own asyncio queue. Publishing is thread-safe, so sync
+views and signals can feed async streams. A published event only wakes
+the stream up: what is sent is always read from the database in id
+order, so rows saved by other processes (which this broker never sees)
+or committed out of order are not skipped. Quiet streams also poll the
+database every poll_interval.
+"""
+
+import asyncio
+import json
+import threading
+from collections import defaultdict
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+
+
+def conversation_channel(conversation_id):
+    return f'conversation:{conversation_id}'
+
+
+def notification_channel(user_id):
+    return f'notifications:{user_id}'
+
+
+class EventBroker:
+    """Fan out published events to the asyncio queues subscribed to a channel"""
+
+    def __init__(self, queue_size=100):
+        self.queue_size = queue_size
+        self._subscribers = defaultdict(set)
+        self._lock = threading.Lock()
+
+    def subscribe(self, channel):
+        """Register a queue for a channel (call from inside the event loop)"""
+        queue = asyncio.Queue(maxsize=self.queue_size)
+        with self._lock:
+            self._subscribers[channel].add((queue, asyncio.get_running_loop()))
+        return queue
+
+    def unsubscribe(self, channel, queue):
+        with self._lock:
+            subscribers = self._subscribers.get(channel)
+            if not subscribers:
+                return
+            subscribers.difference_update({s for s in subscribers if s[0] is queue})
+            if not subscribers:
+                del self._subscribers[channel]
+
+    def subscriber_count(self, channel=None):
+        with self._lock:
+            if channel is not None:
+                return len(self._subscribers.get(channel, ()))
+            return sum(len(s) for s in self._subscribers.values())
+
+    def publish(self, channel, event):
+        """Deliver an event to every subscriber; safe to call from any thread"""
+        with self._lock:
+            subscribers = list(self._subscribers.get(channel, ()))
+        for queue, loop in subscribers:
+            try:
+                loop.call_soon_threadsafe(self._offer, queue, event)
+            except RuntimeError:
+                # Loop already closed, the connection is going away
+                self.unsubscribe(channel, queue)
+
+    @staticmethod
+    def _offer(queue, event):
+        # A slow client drops live events; the database poll catches it up
+        if not queue.full():
+            queue.put_nowait(event)
+
+
+broker = EventBroker()
+
+
+def format_sse(event):
+    """Encode an event dict ({'id', 'type', 'data'}) as an SSE frame"""
+    return (
+        f"id: {event['id']}\n"
+        f"event: {event['type']}\n"
+        f"data: {json.dumps(event['data'], default=str)}\n\n"
+    )
+
+
+def _stream_settings():
+    config = getattr(settings, 'LIVE_EVENTS', {})
+    return (
+        config.get('poll_interval', 15),
+        config.get('max_duration', 300),
+        config.get('retry_ms', 3000),
+    )
+
+
+async def event_stream(channel, poll, last_id):
+    """
+    Async generator of SSE frames for one connection
+
+    Args:
+        channel: Broker channel to subscribe to
+        poll: Sync callable(last_id) returning events newer than last_id from the DB
+        last_id: Id of the last event the client already has
+
+    Polls the database when a published event wakes it up, or when nothing
+    arrived for poll_interval seconds. Ends after max_duration seconds so
+    proxies recycle connections; the browser reconnects with Last-Event-ID.
+    """
+    poll_interval, max_duration, retry_ms = _stream_settings()
+    poll = sync_to_async(poll)
+    queue = broker.subscribe(channel)
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + max_duration
+    try:
+        yield f'retry: {retry_ms}\n\n'
+
+        # The first pass catches up on anything sent while the client was disconnected
+        timed_out = False
+        while True:
+            sent = 0
+            while True:
+                events = await poll(last_id)
+                for event in events:
+                    last_id = max(last_id, event['id'])
+                    yield format_sse(event)
+                sent += len(events)
+                if len(events) < POLL_BATCH_SIZE:
+                    break
+            if timed_out and not sent:
+                yield ': keep-alive\n\n'
+
+            if loop.time() >= deadline:
+                break
+            timeout = min(poll_interval, deadline - loop.time())
+            try:
+                # The event itself is not sent: it only says there is something to read
+                await asyncio.wait_for(queue.get(), timeout=timeout)
+                while not queue.empty():
+                    queue.get_nowait()  # Events published together need one poll
+                timed_out = False
+            except asyncio.TimeoutError:
+                timed_out = True
+    finally:
+        broker.unsubscribe(channel, queue)
+
+
+def single_poll_stream(poll, last_id):
+    """
+    Sync fallback when served under WSGI (no long-lived async streams)
+
+    Returns whatever is new and closes; EventSource reconnects after the
+    retry interval, which turns the endpoint into cheap incremental polling.
+    """
+    poll_interval, _, _ = _stream_settings()
+    yield f'retry: {poll_interval * 1000}\n\n'
+    for event in poll(last_id):
+        yield format_sse(event)
+
+
+def last_event_id(request):
+    """Resume point sent by the client (?after= on first connect, then Last-Event-ID)"""
+    for value in (request.headers.get('Last-Event-ID'), request.GET.get('after')):
+        if value and value.isdigit():
+            return int(value)
+    return None
+
+
+def sse_response(request, channel, poll, last_id):
+    """
+    Build the streaming response for an SSE endpoint
+
+    Under ASGI this is a long-lived async stream fed by the broker;
+    under WSGI it degrades to a single database poll per reconnect.
+    """
+    from django.core.handlers.asgi import ASGIRequest
+    from django.http import StreamingHttpResponse
+
+    if isinstance(request, ASGIRequest):
+        content = event_stream(channel, poll, last_id)
+    else:
+        content = single_poll_stream(poll, last_id)
+
+    response = StreamingHttpResponse(content, content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache, no-store, must-revalidate, private'
+    response['X-Accel-Buffering'] = 'no'  # Stop nginx from buffering the stream
+    return response
+
+
+# =====================================================
+# EVENT PAYLOADS
+# =====================================================
+
+def message_event(message):
+    """SSE event for a chat message"""
+    return {
+        'id': message.pk,
+        'type': 'message',
+        'data': {
+            'id': message.pk,
+            'conversation': message.conversation_id,
+            'sender_id': message.sender_user_id,
+            'message': message.message,
+            'sent_at': message.sent_at.isoformat(),
+        },
+    }
+
+
+def notification_event(notification):
+    """SSE event for an internal notification"""
+    return {
+        'id': notification.pk,
+        'type': 'notification',
+        'data': {
+            'id': notification.pk,
+            'notification_type': notification.notification_type,
+            'title': notification.title,
+            'message': notification.message,
+            'link': notification.link,
+            'icon': notification.type_icon,
+            'created_at': notification.created_at.isoformat(),
+        },
+    }
+
+
+POLL_BATCH_SIZE = 50
+
+
+def poll_conversation_messages(conversation_id):
+    """Database fallback for a conversation stream"""
+    from ..models import Message
+
+    def poll(last_id):
+        messages = Message.objects.filter(
+            conversation_id=conversation_id,
+            pk__gt=last_id
+        ).order_by('pk')[:POLL_BATCH_SIZE]
+        return [message_event(m) for m in messages]
+    return poll
+
+
+def poll_user_notifications(user_id):
+    """Database fallback for a notification stream"""
+    from notifications.models import Notification
+
+    def poll(last_id):
+        notifications = Notification.objects.filter(
+            user_id=user_id,
+            pk__gt=last_id
+        ).order_by('pk')[:POLL_BATCH_SIZE]
+        return [notification_event(n) for n in notifications]
+    return poll
+
+
+def publish_on_commit(channel, event):
+    """Publish once the row is committed, so a concurrent poll can't miss or precede it"""
+    from django.db import transaction
+    transaction.on_commit(lambda: broker.publish(channel, event))
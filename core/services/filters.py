@@ -0,0 +1,176 @@
+"""
+Internship Filter Pipeline for Lwazi Blue
+Single place where internship search/filter criteria are compiled into a queryset
+Shared by the internship list, the intern explore view and SearchService
+"""
+
+import hashlib
+import json
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.paginator import Paginator
+from django.db.models import Q
+from ..models import InternshipPost, PROVINCE_CHOICES
+
+
+# Bumped whenever an internship changes so cached result ids are never stale
+FILTER_VERSION_KEY = 'internship_filter:version'
+
+# Search forms submit province names, the model stores province codes
+PROVINCE_CODES = {name.lower(): code for code, name in PROVINCE_CHOICES if code}
+
+
+def bump_filter_version():
+    """Invalidate every cached filter result"""
+    try:
+        cache.incr(FILTER_VERSION_KEY)
+    except ValueError:
+        cache.set(FILTER_VERSION_KEY, 1, None)
+
+
+def _to_id(value):
+    """Accept a model instance or a raw primary key"""
+    return getattr(value, 'pk', value)
+
+
+class InternshipFilterPipeline:
+    """
+    Compiles internship filter criteria into an optimized queryset
+
+    Criteria are normalized on construction so that equivalent searches share
+    the same cache key, whichever entry point (form or dict) they came from.
+    """
+
+    TEXT_FIELDS = (
+        'title',
+        'description',
+        'requirements',
+        'responsibilities',
+        'employer__company_name',
+    )
+
+    def __init__(self, query='', skills=None, industry=None, province=None,
+                 municipality=None, stipend_min=None, stipend_max=None,
+                 duration_min=None, duration_max=None,
+                 start_date_from=None, start_date_to=None):
+        self.criteria = {
+            'query': (query or '').strip(),
+            'skills': sorted({int(_to_id(s)) for s in (skills or [])}),
+            'industry': _to_id(industry) or None,
+            'province': self._normalize_province(province),
+            'municipality': (municipality or '').strip(),
+            'stipend_min': stipend_min or None,
+            'stipend_max': stipend_max or None,
+            'duration_min': duration_min or None,
+            'duration_max': duration_max or None,
+            'start_date_from': start_date_from or None,
+            'start_date_to': start_date_to or None,
+        }
+
+    @classmethod
+    def from_form(cls, form):
+        """Build a pipeline from an InternshipSearchForm (unfiltered if invalid)"""
+        if not form.is_bound or not form.is_valid():
+            return cls()
+        return cls(**form.cleaned_data)
+
+    @classmethod
+    def from_filters(cls, query='', filters=None):
+        """Build a pipeline from the SearchService filters dict"""
+        return cls(query=query, **(filters or {}))
+
+    @staticmethod
+    def _normalize_province(province):
+        if not province:
+            return None
+        return PROVINCE_CODES.get(str(province).lower(), province)
+
+    @property
+    def has_filters(self):
+        return any(self.criteria.values())
+
+    @property
+    def cache_key(self):
+        """Stable key for these criteria and the current catalogue version"""
+        version = cache.get(FILTER_VERSION_KEY, 0)
+        payload = json.dumps(self.criteria, sort_keys=True, default=str)
+        digest = hashlib.sha1(payload.encode('utf-8')).hexdigest()
+        return f'internship_filter:{version}:{digest}'
+
+    def base_queryset(self):
+        """Published, active internships with the relations every listing renders"""
+        return InternshipPost.objects.filter(
+            is_active=True,
+            is_published=True
+        ).select_related('employer', 'employer__user', 'industry').prefetch_related('skills_required')
+
+    def get_queryset(self):
+        """
+        Apply the criteria to the base queryset
+
+        Skills use one subquery per skill instead of chained joins, so the
+        result never needs DISTINCT.
+        """
+        internships = self.base_queryset()
+        c = self.criteria
+
+        if c['query']:
+            text_filter = Q()
+            for field in self.TEXT_FIELDS:
+                text_filter |= Q(**{f'{field}__icontains': c['query']})
+            internships = internships.filter(text_filter)
+
+        skill_through = InternshipPost.skills_required.through
+        for skill_id in c['skills']:
+            internships = internships.filter(
+                pk__in=skill_through.objects.filter(skill_id=skill_id).values('internshippost_id')
+            )
+
+        if c['industry']:
+            internships = internships.filter(industry_id=c['industry'])
+        if c['province']:
+            internships = internships.filter(province=c['province'])
+        if c['municipality']:
+            internships = internships.filter(municipality__icontains=c['municipality'])
+        if c['stipend_min']:
+            internships = internships.filter(stipend__gte=c['stipend_min'])
+        if c['stipend_max']:
+            internships = internships.filter(stipend__lte=c['stipend_max'])
+        if c['duration_min']:
+            internships = internships.filter(duration_months__gte=c['duration_min'])
+        if c['duration_max']:
+            internships = internships.filter(duration_months__lte=c['duration_max'])
+        if c['start_date_from']:
+            internships = internships.filter(start_date__gte=c['start_date_from'])
+        if c['start_date_to']:
+            internships = internships.filter(start_date__lte=c['start_date_to'])
+
+        return internships.order_by('-created_at', '-pk')
+
+    def get_result_ids(self):
+        """Ordered ids of matching internships, cached per criteria"""
+        key = self.cache_key
+        ids = cache.get(key)
+        if ids is None:
+            ids = list(self.get_queryset().values_list('pk', flat=True))
+            timeout = getattr(settings, 'CACHE_TTL', {}).get('search_results', 60 * 5)
+            cache.set(key, ids, timeout)
+        return ids
+
+    def load(self, ids):
+        """Fetch internships for a slice of ids, preserving their order"""
+        ids = list(ids)
+        internships = self.base_queryset().in_bulk(ids)
+        return [internships[pk] for pk in ids if pk in internships]
+
+    def paginate(self, per_page, page_number):
+        """
+        Paginate over the cached ids and only load the rows on the page
+
+        Returns the page object with its object_list replaced by internships.
+        """
+        paginator = Paginator(self.get_result_ids(), per_page)
+        page_obj = paginator.get_page(page_number)
+        page_obj.object_list = self.load(page_obj.object_list)
+        return page_obj
@@ -4,7 +4,7 @@ Matches interns with internships and vice versa based on configurable weights
 """
 
 from django.conf import settings
-from django.db.models import Q, Count, Case, When, IntegerField, Value
+from django.db.models import Q, Count, Case, When, IntegerField, Value, prefetch_related_objects
 from ..models import InternshipPost, InternProfile
 
 
@@ -28,6 +28,9 @@ class InternshipMatchingService:
         Get internships matched to an intern profile
         Returns a list of (internship, score) tuples ordered by score
         """
+        # The profile's skills, industries and locations are read once per internship
+        prefetch_related_objects([intern_profile], 'skills', 'industries', 'preferred_locations')
+        
         # Start with active, published internships
         internships = InternshipPost.objects.filter(
             is_active=True,
@@ -73,8 +76,9 @@ class InternshipMatchingService:
     
     def _calculate_skills_match(self, internship, intern_profile):
         """Calculate skills match percentage (0-100)"""
-        required_skills = set(internship.skills_required.values_list('id', flat=True))
-        intern_skills = set(intern_profile.skills.values_list('id', flat=True))
+        # .all() so prefetched skills are used when the caller loaded them
+        required_skills = {skill.id for skill in internship.skills_required.all()}
+        intern_skills = {skill.id for skill in intern_profile.skills.all()}
         
         if not required_skills:
             return 50  # Neutral score if no skills required
@@ -90,9 +94,9 @@ class InternshipMatchingService:
         if not internship.industry:
             return 50  # Neutral score if no industry specified
         
-        intern_industries = intern_profile.industries.values_list('id', flat=True)
+        intern_industries = {industry.id for industry in intern_profile.industries.all()}
         
-        if internship.industry.id in intern_industries:
+        if internship.industry_id in intern_industries:
             return 100  # Perfect match
         else:
             return 0  # No match
@@ -128,8 +132,8 @@ class InternshipMatchingService:
         """Calculate qualification/experience match (0-100)"""
         score = 0
         
-        # Check if intern has education records
-        education_count = intern_profile.education_set.count()
+        # Check if intern has education records (denormalized count)
+        education_count = intern_profile.education_count
         if education_count > 0:
             score += 50  # Has education
             
@@ -138,7 +142,7 @@ class InternshipMatchingService:
                 score += 20
         
         # Check if intern has work experience
-        experience_count = intern_profile.work_experience_set.count()
+        experience_count = intern_profile.experience_count
         if experience_count > 0:
             score += 30  # Has experience
         
@@ -167,8 +171,7 @@ class InternMatchingService:
         """
         # Get all intern profiles with related data
         interns = InternProfile.objects.select_related('user').prefetch_related(
-            'skills', 'industries', 'preferred_locations', 
-            'education_set', 'work_experience_set'
+            'skills', 'industries', 'preferred_locations'
         ).filter(
             user__email_confirmed=True  # Only show confirmed users
         )
@@ -281,14 +284,14 @@ class InternMatchingService:
         score = 0
         
         # Education score (up to 50 points)
-        education_count = intern_profile.education_set.count()
+        education_count = intern_profile.education_count
         if education_count > 0:
             score += 30  # Has education
             if education_count > 1:
                 score += 20  # Multiple qualifications
         
         # Work experience score (up to 50 points)
-        experience_count = intern_profile.work_experience_set.count()
+        experience_count = intern_profile.experience_count
         if experience_count > 0:
             score += 30  # Has experience
             if experience_count > 1:
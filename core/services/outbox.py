@@ -0,0 +1,504 @@
+"""
+Email Outbox for Lwazi Blue
+Queues outgoing email in the database so requests never wait on SMTP
+
+Rows are delivered by the send_queued_emails management command.
+High-priority rows (confirmation and login codes) are also handed to a
+small background thread pool after commit, which sends them with send_now
+without holding up the request; if that fails they stay queued under the
+worker's retry and dead-letter rules.
+"""
+
+import smtplib
+import time
+from collections import Counter, deque
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import close_old_connections, connection, transaction
+from django.utils import timezone
+
+from ..email_service import SMTPUnavailable, get_email_template
+from ..models import EmailOutbox
+
+
+def _outbox_settings():
+    return getattr(settings, 'EMAIL_OUTBOX', {})
+
+
+def queue_email(to_email, subject, html_body, text_body='', delay=0,
+                priority=EmailOutbox.PRIORITY_NORMAL):
+    """
+    Queue an email for the outbox worker
+
+    Args:
+        to_email: Recipient email address
+        subject: Email subject
+        html_body: HTML body content
+        text_body: Plain text alternative (optional)
+        delay: Seconds to hold the email before it may be sent
+        priority: EmailOutbox.PRIORITY_HIGH for time-sensitive email (login codes),
+            also sent in the background after commit unless EMAIL_OUTBOX['send_high_priority_now'] is off
+
+    Returns:
+        EmailOutbox: The queued row
+    """
+    email = EmailOutbox.objects.create(
+        to_email=to_email,
+        subject=subject,
+        html_body=html_body,
+        text_body=text_body,
+        priority=priority,
+        send_after=timezone.now() + timedelta(seconds=delay),
+    )
+    if (priority == EmailOutbox.PRIORITY_HIGH and not delay
+            and _outbox_settings().get('send_high_priority_now', True)):
+        transaction.on_commit(lambda: get_send_executor().submit(send_in_background, email.pk))
+    return email
+
+
+def queue_template_email(to_email, subject, template_name, context, delay=0,
+                         priority=EmailOutbox.PRIORITY_NORMAL):
+    """Render an email template (see email_service.EmailTemplate) and queue it"""
+    context = {'site_url': getattr(settings, 'SITE_URL', ''), **context}
+    html_body, text_body = get_email_template(template_name).render(context)
+    return queue_email(to_email, subject, html_body, text_body, delay=delay, priority=priority)
+
+
+def queue_template_emails(template_name, recipients, common_context=None):
+    """
+    Render one template for many recipients in a single pass and queue them together
+
+    Args:
+        template_name: Email template shared by every recipient
+        recipients: Iterable of (to_email, subject, context) tuples
+        common_context: Context shared by all recipients, built once
+
+    Returns:
+        int: Number of emails queued
+    """
+    recipients = list(recipients)
+    common_context = {'site_url': getattr(settings, 'SITE_URL', ''), **(common_context or {})}
+    bodies = get_email_template(template_name).render_many(
+        [context for _, _, context in recipients], common_context
+    )
+    now = timezone.now()
+    EmailOutbox.objects.bulk_create([
+        EmailOutbox(
+            to_email=to_email,
+            subject=subject,
+            html_body=html_body,
+            text_body=text_body,
+            send_after=now,
+        )
+        for (to_email, subject, _), (html_body, text_body) in zip(recipients, bodies)
+    ], batch_size=500)
+    return len(recipients)
+
+
+def queue_coalesced_email(to_email, coalesce_key, build, delay):
+    """
+    Queue an email, merging it into a still-pending one with the same key
+
+    Args:
+        to_email: Recipient email address
+        coalesce_key: Rows with this key are merged while pending
+        build: Callable(count) returning (subject, html_body, text_body)
+        delay: Seconds the first email waits to collect followers
+
+    The merge is a conditional UPDATE on status=pending, so a row the worker
+    has already claimed is never modified; a new row is queued instead.
+    """
+    pending = EmailOutbox.objects.filter(
+        coalesce_key=coalesce_key,
+        status=EmailOutbox.STATUS_PENDING,
+        send_after__gt=timezone.now()
+    ).order_by('-pk').values_list('pk', 'coalesced_count').first()
+
+    if pending:
+        pk, count = pending
+        subject, html_body, text_body = build(count + 1)
+        merged = EmailOutbox.objects.filter(
+            pk=pk,
+            status=EmailOutbox.STATUS_PENDING
+        ).update(
+            subject=subject,
+            html_body=html_body,
+            text_body=text_body,
+            coalesced_count=count + 1,
+        )
+        if merged:
+            return pk
+
+    subject, html_body, text_body = build(1)
+    return EmailOutbox.objects.create(
+        to_email=to_email,
+        subject=subject,
+        html_body=html_body,
+        text_body=text_body,
+        coalesce_key=coalesce_key,
+        send_after=timezone.now() + timedelta(seconds=delay),
+    ).pk
+
+
+def queue_message_email(message):
+    """
+    Queue the "new message" email for the recipient of a chat message
+
+    Messages to the same recipient within the coalesce window are combined
+    into one email that counts them and previews the latest. Recipients on
+    an hourly or daily message digest get a digest item instead.
+    """
+    from notifications.models import FREQUENCY_IMMEDIATE
+    from notifications.services import NotificationService
+
+    conversation = message.conversation
+    if message.sender_user.user_type == 'employer':
+        recipient = conversation.intern.user
+        sender_name = conversation.employer.company_name
+    else:
+        recipient = conversation.employer.user
+        sender_name = conversation.intern.full_name or conversation.intern.user.username
+
+    if not recipient.email:
+        return None
+
+    preview = f"{message.message[:200]}{'...' if len(message.message) > 200 else ''}"
+
+    frequency = NotificationService.get_email_frequency(recipient, 'new_message')
+    if frequency is None:
+        return None
+    if frequency != FREQUENCY_IMMEDIATE:
+        NotificationService.add_to_digest(
+            recipient, frequency, 'new_message', f'New message from {sender_name}',
+            preview, f'/messages/{conversation.pk}/'
+        )
+        return None
+
+    template = get_email_template('emails/new_message.html')
+    context = {
+        'recipient': recipient,
+        'sender_name': sender_name,
+        'preview': preview,
+        'link': f'/messages/{conversation.pk}/',
+        'site_url': getattr(settings, 'SITE_URL', ''),
+    }
+
+    def build(count):
+        if count == 1:
+            subject = f'New Message from {sender_name}'
+        else:
+            subject = f'{count} New Messages on Lwazi Blue'
+        html_body, text_body = template.render({**context, 'count': count})
+        return subject, html_body, text_body
+
+    window = _outbox_settings().get('message_coalesce_seconds', 120)
+    return queue_coalesced_email(recipient.email, f'messages:{recipient.pk}', build, window)
+
+
+# =====================================================
+# DELIVERY
+# =====================================================
+
+def release_stale_claims(timeout):
+    """Return emails claimed by a worker that died more than timeout seconds ago"""
+    return EmailOutbox.objects.filter(
+        status=EmailOutbox.STATUS_SENDING,
+        locked_at__lt=timezone.now() - timedelta(seconds=timeout)
+    ).update(status=EmailOutbox.STATUS_PENDING, locked_at=None)
+
+
+def claim_due_emails(batch_size):
+    """
+    Claim up to batch_size due emails for this worker
+
+    Rows move from pending to sending with a conditional UPDATE, so two
+    workers never deliver the same row.
+    """
+    due_ids = list(EmailOutbox.objects.filter(
+        status=EmailOutbox.STATUS_PENDING,
+        send_after__lte=timezone.now()
+    ).order_by('-priority', 'send_after', 'pk').values_list('pk', flat=True)[:batch_size])
+    if not due_ids:
+        return []
+
+    EmailOutbox.objects.filter(
+        pk__in=due_ids,
+        status=EmailOutbox.STATUS_PENDING
+    ).update(status=EmailOutbox.STATUS_SENDING, locked_at=timezone.now())
+
+    # Re-read after claiming to pick up any last-moment coalesced content
+    return list(EmailOutbox.objects.filter(
+        pk__in=due_ids,
+        status=EmailOutbox.STATUS_SENDING
+    ).order_by('-priority', 'send_after', 'pk'))
+
+
+def is_permanent_failure(error):
+    """5xx replies (bad mailbox, rejected content) will never succeed on retry"""
+    if isinstance(error, smtplib.SMTPRecipientsRefused):
+        return all(500 <= code < 600 for code, _ in error.recipients.values())
+    if isinstance(error, smtplib.SMTPAuthenticationError):
+        return False  # A configuration problem, not a problem with the email
+    if isinstance(error, smtplib.SMTPResponseException):
+        return 500 <= error.smtp_code < 600
+    return False
+
+
+class RateLimiter:
+    """Allow at most per_minute sends in any sliding one-minute window"""
+
+    def __init__(self, per_minute, clock=time.monotonic, sleep=time.sleep):
+        self.per_minute = per_minute
+        self.clock = clock
+        self.sleep = sleep
+        self._sent = deque()
+
+    def wait(self):
+        """Block until another send is allowed, then record it"""
+        if not self.per_minute:
+            return
+        now = self.clock()
+        while self._sent and now - self._sent[0] >= 60:
+            self._sent.popleft()
+        if len(self._sent) >= self.per_minute:
+            self.sleep(60 - (now - self._sent.popleft()))
+        self._sent.append(self.clock())
+
+
+# Fields a delivery attempt changes
+RESULT_FIELDS = ['status', 'attempts', 'sent_at', 'last_error', 'send_after', 'locked_at']
+
+
+class OutboxWorker:
+    """
+    Delivers queued emails over the email service's pooled SMTP connections
+
+    Transient failures (dropped connections, 4xx replies) are retried with
+    exponential backoff; permanent 5xx failures and emails that run out of
+    attempts are dead-lettered. Point EMAIL_HOST/EMAIL_PORT at a local
+    SMTP server to exercise it end to end.
+    """
+
+    def __init__(self, service=None, batch_size=None, rate_per_minute=None,
+                 max_attempts=None, sleep=time.sleep):
+        from ..email_service import get_email_service
+
+        config = _outbox_settings()
+        self.service = service or get_email_service()
+        self.batch_size = batch_size or config.get('batch_size', 50)
+        self.max_attempts = max_attempts or config.get('max_attempts', 5)
+        self.backoff = config.get('retry_backoff', 60)
+        self.backoff_max = config.get('retry_backoff_max', 60 * 60)
+        self.claim_timeout = config.get('claim_timeout', 60 * 10)
+        if rate_per_minute is None:
+            rate_per_minute = config.get('rate_per_minute', 60)
+        self.limiter = RateLimiter(rate_per_minute, sleep=sleep)
+
+    def retry_delay(self, attempts):
+        """Seconds to wait before the next attempt: backoff, 2x, 4x, ... capped"""
+        return min(self.backoff * 2 ** (attempts - 1), self.backoff_max)
+
+    def run_batch(self):
+        """
+        Deliver one batch of due emails
+
+        Returns:
+            Counter: Emails 'sent', scheduled to 'retry', 'dead'-lettered, and
+            'deferred' untried because the server was unavailable
+        """
+        results = Counter()
+        release_stale_claims(self.claim_timeout)
+        emails = claim_due_emails(self.batch_size)
+        for index, email in enumerate(emails):
+            try:
+                results[self._deliver(email)] += 1
+            except SMTPUnavailable as e:
+                # No point trying the rest of the batch against a dead server
+                results[self._fail(email, e)] += 1
+                results['deferred'] += self._defer(emails[index + 1:])
+                break
+        return results
+
+    def _deliver(self, email):
+        email.attempts += 1
+        try:
+            self._send(email)
+        except SMTPUnavailable:
+            raise
+        except Exception as e:
+            return self._fail(email, e)
+
+        outcome = self._mark_sent(email)
+        email.save(update_fields=RESULT_FIELDS)
+        return outcome
+
+    def _send(self, email):
+        recipients = [email.to_email]
+        if not self.service.enabled:
+            return
+        if not self.service.has_credentials:
+            self.service._print_email(recipients, email.subject, email.html_body, email.text_body)
+            return
+
+        self.limiter.wait()
+        message = self.service.build_message(
+            recipients, email.subject, email.html_body, email.text_body or None
+        )
+        self.service.pool.send_message(message)
+
+    def _mark_sent(self, email):
+        email.status = EmailOutbox.STATUS_SENT
+        email.sent_at = timezone.now()
+        email.locked_at = None
+        return 'sent'
+
+    def _fail(self, email, error):
+        outcome = self._mark_failed(email, error)
+        email.save(update_fields=RESULT_FIELDS)
+        return outcome
+
+    def _mark_failed(self, email, error):
+        """Schedule a retry or dead-letter the email (without saving)"""
+        email.last_error = f'{type(error).__name__}: {error}'[:1000]
+        email.locked_at = None
+        if is_permanent_failure(error) or email.attempts >= self.max_attempts:
+            email.status = EmailOutbox.STATUS_DEAD
+            outcome = 'dead'
+            print(f"❌ Email {email.pk} to {email.to_email} dead-lettered: {email.last_error}")
+        else:
+            email.status = EmailOutbox.STATUS_PENDING
+            email.send_after = timezone.now() + timedelta(seconds=self.retry_delay(email.attempts))
+            outcome = 'retry'
+            print(f"⚠️  Email {email.pk} to {email.to_email} failed, retrying: {email.last_error}")
+        return outcome
+
+    def _defer(self, emails):
+        """Hand claimed emails back untouched, to be retried after the backoff"""
+        return EmailOutbox.objects.filter(
+            pk__in=[email.pk for email in emails],
+            status=EmailOutbox.STATUS_SENDING
+        ).update(
+            status=EmailOutbox.STATUS_PENDING,
+            locked_at=None,
+            send_after=timezone.now() + timedelta(seconds=self.backoff)
+        )
+
+    def close(self):
+        """Drop idle SMTP connections"""
+        self.service.pool.clear()
+
+
+def send_now(email_id, worker=None):
+    """
+    Deliver one queued email immediately instead of waiting for the worker
+
+    The row is claimed with the same conditional UPDATE as a batch, so it is
+    never sent twice; a failure schedules a retry (or dead-letters it) for
+    the outbox worker exactly as a batch failure would.
+
+    Returns:
+        str: 'sent', 'retry' or 'dead', or None if a worker already claimed it
+    """
+    claimed = EmailOutbox.objects.filter(
+        pk=email_id,
+        status=EmailOutbox.STATUS_PENDING
+    ).update(status=EmailOutbox.STATUS_SENDING, locked_at=timezone.now())
+    if not claimed:
+        return None
+
+    worker = worker or OutboxWorker()
+    email = EmailOutbox.objects.get(pk=email_id)
+    try:
+        return worker._deliver(email)
+    except SMTPUnavailable as e:
+        return worker._fail(email, e)
+
+
+_executor = None
+
+
+def get_send_executor():
+    """Shared pool of threads sending high-priority email outside the request"""
+    global _executor
+    if _executor is None:
+        workers = _outbox_settings().get('send_now_workers', 2)
+        _executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='email-send')
+    return _executor
+
+
+def send_in_background(email_id):
+    """
+    Pool entry point for send_now
+
+    Runs in a pool thread, so it manages its own DB connection. Any error
+    leaves the row to the outbox worker.
+    """
+    close_old_connections()
+    try:
+        return send_now(email_id)
+    except Exception as e:
+        print(f"⚠️  Immediate send of queued email {email_id} failed: {e}")
+        return None
+    finally:
+        connection.close()
+
+
+class BulkOutboxWorker(OutboxWorker):
+    """
+    Drains large batches through the asyncio bulk sender
+
+    Same retry and dead-letter rules as OutboxWorker, but a batch is sent
+    over several concurrent SMTP sessions and results are written back with
+    a single bulk_update.
+    """
+
+    def __init__(self, concurrency=5, **kwargs):
+        super().__init__(**kwargs)
+        self.concurrency = concurrency
+
+    def run_batch(self, progress=None):
+        """
+        Deliver one batch of due emails concurrently
+
+        Args:
+            progress: Optional callable(done, total, result) per recipient
+        """
+        from ..async_email import AsyncBulkEmailSender
+
+        results = Counter()
+        release_stale_claims(self.claim_timeout)
+        emails = {email.pk: email for email in claim_due_emails(self.batch_size)}
+        if not emails:
+            return results
+
+        sender = AsyncBulkEmailSender(
+            self.service,
+            concurrency=self.concurrency,
+            rate_per_minute=self.limiter.per_minute
+        )
+        outcomes = sender.send_all(
+            ((e.pk, e.to_email, e.subject, e.html_body, e.text_body) for e in emails.values()),
+            progress
+        )
+
+        deferred = []
+        for outcome in outcomes:
+            email = emails[outcome.key]
+            if not outcome.attempted:
+                deferred.append(email)
+                continue
+            email.attempts += 1
+            if outcome.ok:
+                results[self._mark_sent(email)] += 1
+            else:
+                results[self._mark_failed(email, outcome.error)] += 1
+
+        deferred_ids = {email.pk for email in deferred}
+        attempted = [email for pk, email in emails.items() if pk not in deferred_ids]
+        EmailOutbox.objects.bulk_update(attempted, RESULT_FIELDS, batch_size=500)
+        if deferred:
+            results['deferred'] += self._defer(deferred)
+        return results
+
@@ -3,8 +3,9 @@ Search Service for Lwazi Blue
 Provides advanced search functionality for internships and interns
 """
 
-from django.db.models import Q, Count
-from ..models import InternshipPost, InternProfile
+from django.db.models import Q
+from ..models import InternProfile, InternDocument
+from .filters import InternshipFilterPipeline
 
 
 class SearchService:
@@ -20,7 +21,7 @@ class SearchService:
             filters: Dict with keys:
                 - skills: List of skill IDs
                 - industry: Industry ID
-                - province: Province name
+                - province: Province name or code
                 - municipality: Municipality name
                 - stipend_min: Minimum stipend
                 - stipend_max: Maximum stipend
@@ -32,75 +33,7 @@ class SearchService:
         Returns:
             QuerySet of InternshipPost
         """
-        # Start with active, published internships
-        internships = InternshipPost.objects.filter(
-            is_active=True,
-            is_published=True
-        ).select_related('employer', 'employer__user', 'industry').prefetch_related('skills_required')
-        
-        # Text search
-        if query:
-            internships = internships.filter(
-                Q(title__icontains=query) |
-                Q(description__icontains=query) |
-                Q(requirements__icontains=query) |
-                Q(responsibilities__icontains=query) |
-                Q(employer__company_name__icontains=query)
-            )
-        
-        # Apply filters
-        if filters:
-            # Skills filter
-            skills = filters.get('skills')
-            if skills:
-                for skill_id in skills:
-                    internships = internships.filter(skills_required__id=skill_id)
-            
-            # Industry filter
-            industry = filters.get('industry')
-            if industry:
-                internships = internships.filter(industry_id=industry)
-            
-            # Province filter
-            province = filters.get('province')
-            if province:
-                internships = internships.filter(province=province)
-            
-            # Municipality filter
-            municipality = filters.get('municipality')
-            if municipality:
-                internships = internships.filter(municipality__icontains=municipality)
-            
-            # Stipend filters
-            stipend_min = filters.get('stipend_min')
-            if stipend_min:
-                internships = internships.filter(
-                    Q(stipend__gte=stipend_min) | Q(stipend__isnull=True)
-                )
-            
-            stipend_max = filters.get('stipend_max')
-            if stipend_max:
-                internships = internships.filter(stipend__lte=stipend_max)
-            
-            # Duration filters
-            duration_min = filters.get('duration_min')
-            if duration_min:
-                internships = internships.filter(duration_months__gte=duration_min)
-            
-            duration_max = filters.get('duration_max')
-            if duration_max:
-                internships = internships.filter(duration_months__lte=duration_max)
-            
-            # Date range filters
-            start_date_from = filters.get('start_date_from')
-            if start_date_from:
-                internships = internships.filter(start_date__gte=start_date_from)
-            
-            start_date_to = filters.get('start_date_to')
-            if start_date_to:
-                internships = internships.filter(start_date__lte=start_date_to)
-        
-        return internships.distinct()
+        return InternshipFilterPipeline.from_filters(query, filters).get_queryset()
     
     @staticmethod
     def search_interns(query='', filters=None):
@@ -108,7 +41,7 @@ class SearchService:
         Search intern profiles with full-text search and filters
         
         Args:
-            query: Text to search in name, bio, username
+            query: Text to search in name, bio, username and CV/document text
             filters: Dict with keys:
                 - skills: List of skill IDs
                 - industries: List of industry IDs
@@ -125,7 +58,7 @@ class SearchService:
         interns = InternProfile.objects.filter(
             user__email_confirmed=True
         ).select_related('user').prefetch_related(
-            'skills', 'industries', 'education_set', 'work_experience_set'
+            'skills', 'industries'
         )
         
         # Text search
@@ -135,7 +68,11 @@ class SearchService:
                 Q(user__username__icontains=query) |
                 Q(user__email__icontains=query) |
                 Q(bio__icontains=query) |
-                Q(phone__icontains=query)
+                Q(phone__icontains=query) |
+                Q(pk__in=InternDocument.objects.filter(
+                    is_latest=True,
+                    extracted_text__icontains=query
+                ).values('intern_id'))
             )
         
         # Apply filters
@@ -162,19 +99,15 @@ class SearchService:
             if municipality:
                 interns = interns.filter(current_municipality__icontains=municipality)
             
-            # Has experience filter
+            # Has experience filter (indexed counter column, no join)
             has_experience = filters.get('has_experience')
             if has_experience:
-                interns = interns.annotate(
-                    exp_count=Count('work_experience_set')
-                ).filter(exp_count__gt=0)
+                interns = interns.filter(experience_count__gt=0)
             
             # Has education filter
             has_education = filters.get('has_education')
             if has_education:
-                interns = interns.annotate(
-                    edu_count=Count('education_set')
-                ).filter(edu_count__gt=0)
+                interns = interns.filter(education_count__gt=0)
         
         return interns.distinct()
 
@@ -0,0 +1,263 @@
+"""
+Buffered View Counters for Lwazi Blue
+Detail-page views are counted in the cache and written to the database in bulk
+
+Each view is an atomic cache increment instead of a write transaction, so
+readers never queue behind view-count updates and concurrent views are not
+lost. The view that takes a counter from 0 to 1 also appends its pk to a
+per-model dirty list (a sequence number plus one cache key per slot), so a
+flush reads only the objects that have views buffered, never the tables.
+A flush moves the buffered counts into views_count with one
+F('views_count') + n UPDATE per distinct n. It runs from any request at
+most once per flush_interval (guarded by a cache.add lock) and from the
+flush_view_counters command; a second lock keeps two flushes from taking
+the same counts.
+
+Counts, dirty lists and locks live in their own cache alias
+(VIEW_COUNTERS['cache']) so other entries can't push them out; the
+per-session dedup keys stay in the default cache. In production that alias
+must be shared (CACHE_URL) for the cron command to see every worker's
+buffer. With a per-process cache (core.W001) each web worker only flushes
+its own counts from requests and the command has nothing to flush.
+Counts still buffered when a cache entry is evicted are lost: view
+counts are best-effort.
+"""
+
+import time
+from collections import defaultdict
+
+from django.apps import apps
+from django.conf import settings
+from django.core.cache import cache, caches
+from django.core.cache.backends.dummy import DummyCache
+from django.core.cache.backends.locmem import LocMemCache
+from django.db.models import F
+
+
+# Models with a views_count column whose views are buffered
+COUNTED_MODELS = ('core.internshippost', 'blog.blogpost')
+
+FLUSH_LOCK_KEY = 'view_counters:flush_lock'
+FLUSH_RUNNING_KEY = 'view_counters:flush_running'
+FLUSH_RUNNING_TIMEOUT = 60 * 10  # A crashed flush releases its lock after this
+STATS_KEY = 'view_counters:stats'
+FLUSH_CHUNK_SIZE = 500
+
+
+def counter_cache():
+    """The cache holding buffered counts, dirty lists and flush locks"""
+    return caches[getattr(settings, 'VIEW_COUNTERS', {}).get('cache', 'default')]
+
+
+def is_shared_cache():
+    """False when counter_cache() lives inside this process, where no other process can flush it"""
+    return not isinstance(counter_cache(), (LocMemCache, DummyCache))
+
+
+def _config():
+    config = getattr(settings, 'VIEW_COUNTERS', {})
+    return (
+        config.get('flush_interval', 60),
+        config.get('dedup_seconds', 60 * 30),
+        config.get('key_timeout', 60 * 60 * 24),
+    )
+
+
+def counter_key(label, pk):
+    return f'views:{label}:{pk}'
+
+
+def _dirty_seq_key(label):
+    return f'view_counters:dirty_seq:{label}'
+
+
+def _dirty_done_key(label):
+    return f'view_counters:dirty_done:{label}'
+
+
+def _dirty_slot_key(label, number):
+    return f'view_counters:dirty:{label}:{number}'
+
+
+def _mark_dirty(label, pk, key_timeout):
+    """Append pk to the model's list of objects with buffered views"""
+    counters = counter_cache()
+    seq_key = _dirty_seq_key(label)
+    try:
+        number = counters.incr(seq_key)
+    except ValueError:
+        number = 1 if counters.add(seq_key, 1, None) else counters.incr(seq_key)
+    counters.set(_dirty_slot_key(label, number), pk, key_timeout)
+
+
+def _dirty_pks(label):
+    """
+    Pks appended since the last flush: (last slot number, set of pks)
+    A pk can appear more than once; only its counter key holds views.
+    """
+    counters = counter_cache()
+    last = counters.get(_dirty_seq_key(label)) or 0
+    done = counters.get(_dirty_done_key(label)) or 0
+    if done > last:
+        done = 0  # The sequence was evicted and started over
+    pks = set()
+    for start in range(done + 1, last + 1, FLUSH_CHUNK_SIZE):
+        keys = [_dirty_slot_key(label, number) for number in range(start, min(start + FLUSH_CHUNK_SIZE, last + 1))]
+        pks.update(counters.get_many(keys).values())
+    return last, pks
+
+
+def _clear_dirty(label, last):
+    """Drop the slots up to `last` once their pks have been flushed"""
+    counters = counter_cache()
+    done = counters.get(_dirty_done_key(label)) or 0
+    if done > last:
+        done = 0
+    for start in range(done + 1, last + 1, FLUSH_CHUNK_SIZE):
+        counters.delete_many([
+            _dirty_slot_key(label, number) for number in range(start, min(start + FLUSH_CHUNK_SIZE, last + 1))
+        ])
+    counters.set(_dirty_done_key(label), last, None)
+
+
+def _viewer_id(request):
+    """Session key, or user id for logged-in users without one; None means don't dedup"""
+    if request is None:
+        return None
+    session_key = getattr(getattr(request, 'session', None), 'session_key', None)
+    if session_key:
+        return session_key
+    user = getattr(request, 'user', None)
+    if user is not None and user.is_authenticated:
+        return f'user-{user.pk}'
+    return None
+
+
+def record_view(obj, request=None):
+    """
+    Count one view of obj (an instance of a COUNTED_MODELS model)
+
+    With a request, repeat views from the same session within
+    dedup_seconds are ignored. Returns True if the view was counted.
+    """
+    flush_interval, dedup_seconds, key_timeout = _config()
+    label = obj._meta.label_lower
+
+    viewer = _viewer_id(request)
+    if viewer and dedup_seconds:
+        # In the default cache, so dedup keys never crowd out buffered counts
+        if not cache.add(f'views_seen:{label}:{obj.pk}:{viewer}', 1, dedup_seconds):
+            return False
+
+    counters = counter_cache()
+    key = counter_key(label, obj.pk)
+    try:
+        views = counters.incr(key)
+    except ValueError:
+        # First view since the key was evicted (or ever)
+        views = 1 if counters.add(key, 1, key_timeout) else counters.incr(key)
+    if views == 1:
+        # Nothing was buffered for obj: the next flush has to visit it
+        _mark_dirty(label, obj.pk, key_timeout)
+
+    maybe_flush()
+    return True
+
+
+def pending_views(obj):
+    """Views of obj recorded but not yet written to views_count"""
+    return counter_cache().get(counter_key(obj._meta.label_lower, obj.pk)) or 0
+
+
+def maybe_flush():
+    """Flush if no process has done so within flush_interval"""
+    flush_interval, _, _ = _config()
+    if counter_cache().add(FLUSH_LOCK_KEY, time.time(), flush_interval):
+        flush_view_counts()
+
+
+def _buffered_counts(label, pks):
+    """Yield {pk: pending views} per chunk of the given pks"""
+    pks = sorted(pks)
+    for start in range(0, len(pks), FLUSH_CHUNK_SIZE):
+        yield _read_chunk(label, pks[start:start + FLUSH_CHUNK_SIZE])
+
+
+def _read_chunk(label, pks):
+    counters = counter_cache()
+    keys = {counter_key(label, pk): pk for pk in pks}
+    return {keys[key]: count for key, count in counters.get_many(keys).items() if count}
+
+
+def flush_view_counts():
+    """
+    Write every buffered count to the database
+
+    Only objects on the dirty lists are read. Each taken amount is
+    subtracted from its cache key with an atomic decr, so views recorded
+    during the flush stay buffered; their objects go back on the dirty
+    list for the next one. If another flush is running this one writes
+    nothing.
+
+    Returns:
+        dict: {model label: views written}
+    """
+    counters = counter_cache()
+    flushed = {label: 0 for label in COUNTED_MODELS}
+    if not counters.add(FLUSH_RUNNING_KEY, time.time(), FLUSH_RUNNING_TIMEOUT):
+        return flushed
+    try:
+        _, _, key_timeout = _config()
+        for label in COUNTED_MODELS:
+            model = apps.get_model(label)
+            last, dirty = _dirty_pks(label)
+            for counts in _buffered_counts(label, dirty):
+                by_amount = defaultdict(list)
+                for pk, count in counts.items():
+                    try:
+                        remaining = counters.decr(counter_key(label, pk), count)
+                    except ValueError:
+                        continue  # Evicted since it was read
+                    by_amount[count].append(pk)
+                    if remaining > 0:
+                        _mark_dirty(label, pk, key_timeout)
+
+                for count, pks in by_amount.items():
+                    model.objects.filter(pk__in=pks).update(views_count=F('views_count') + count)
+                    flushed[label] += count * len(pks)
+            _clear_dirty(label, last)
+    finally:
+        counters.delete(FLUSH_RUNNING_KEY)
+
+    _record_flush(flushed)
+    return flushed
+
+
+def _record_flush(flushed):
+    counters = counter_cache()
+    stats = counters.get(STATS_KEY) or {'flushes': 0, 'views_flushed': 0, 'last_flush': None}
+    stats['flushes'] += 1
+    stats['views_flushed'] += sum(flushed.values())
+    stats['last_flush'] = time.time()
+    counters.set(STATS_KEY, stats, None)
+
+
+def view_counter_stats():
+    """
+    Metrics for the buffer
+
+    Returns:
+        dict: {'pending': {label: {'objects': n, 'views': m}}, 'flushes',
+               'views_flushed', 'last_flush'} (the flush totals are per cache)
+    """
+    pending = {}
+    for label in COUNTED_MODELS:
+        objects = views = 0
+        _, dirty = _dirty_pks(label)
+        for counts in _buffered_counts(label, dirty):
+            objects += len(counts)
+            views += sum(counts.values())
+        pending[label] = {'objects': objects, 'views': views}
+
+    stats = counter_cache().get(STATS_KEY) or {'flushes': 0, 'views_flushed': 0, 'last_flush': None}
+    return {'pending': pending, **stats}
@@ -36,6 +36,8 @@ urlpatterns = [
     # Messages
     path('messages/', views.messages_list, name='messages'),
     path('messages/<int:conversation_id>/', views.conversation_detail_view, name='conversation_detail'),
+    path('messages/<int:conversation_id>/history/', views.conversation_history_view, name='conversation_history'),
+    path('messages/<int:conversation_id>/events/', views.conversation_events_view, name='conversation_events'),
     path('messages/start/<str:intern_username>/', views.start_conversation_view, name='start_conversation'),
     
     # Internships
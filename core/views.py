@@ -11,6 +11,8 @@ from .forms import (
     InternProfileForm, EmployerProfileForm, DocumentUploadForm,
     EducationForm, WorkExperienceForm
 )
+from .services.badges import get_unread_badges
+from .services.dashboard import get_employer_dashboard_summary, get_intern_dashboard_summary
 
 
 # =====================================================
@@ -71,95 +73,41 @@ def dashboard(request):
     user = request.user
     
     if user.user_type == 'intern':
-        # Get or create intern profile
-        profile, created = InternProfile.objects.get_or_create(user=user)
-        completion = profile.get_profile_completion_percentage()
-        
-        # Get statistics
-        from applications.models import Application
-        applications = Application.objects.filter(intern=profile)
-        recent_applications = applications.order_by('-applied_at')[:5]
-        
-        # Get matched internships preview (top 5)
-        from .services.matching import InternshipMatchingService
-        matching_service = InternshipMatchingService()
-        matched_internships = matching_service.get_matched_internships(profile, limit=5)
-        
-        # Get unread messages count
-        unread_messages = Message.objects.filter(
-            conversation__intern=profile,
-            is_read=False
-        ).exclude(sender_user=user).count()
+        # Profile, applications and matches come from the cached summary;
+        # the unread count shares the navbar's badge cache
+        summary = get_intern_dashboard_summary(user)
+        completion = summary.completion_percentage
         
         context = {
-            'profile': profile,
+            'profile': summary.profile,
             'completion_percentage': completion,
             'needs_profile_setup': completion < 50,
-            'total_applications': applications.count(),
-            'recent_applications': recent_applications,
-            'matched_internships': matched_internships,
-            'unread_messages': unread_messages,
+            'total_applications': summary.total_applications,
+            'recent_applications': summary.recent_applications,
+            'matched_internships': summary.matched_internships,
+            'unread_messages': get_unread_badges(user)['messages'],
         }
         return render(request, 'core/dashboard/intern_dashboard.html', context)
     
     elif user.user_type == 'employer':
-        # Get or create employer profile
-        try:
-            profile = EmployerProfile.objects.get(user=user)
-            needs_setup = False
-        except EmployerProfile.DoesNotExist:
-            profile = None
-            needs_setup = True
+        # Cached summary; None until the employer has set up a profile
+        summary = get_employer_dashboard_summary(user)
         
-        if not needs_setup:
-            # Get statistics
-            from applications.models import Application
-            
-            active_internships = InternshipPost.objects.filter(
-                employer=profile,
-                is_active=True,
-                is_published=True
-            )
-            
-            # Get all applications for employer's internships
-            total_applications = Application.objects.filter(
-                internship__employer=profile
-            ).count()
-            
-            # Recent applications
-            recent_applications = Application.objects.filter(
-                internship__employer=profile
-            ).select_related('intern', 'intern__user', 'internship').order_by('-applied_at')[:5]
-            
-            # Recent conversations with unread counts
-            recent_conversations = Conversation.objects.filter(
-                employer=profile
-            ).select_related('intern', 'intern__user').order_by('-last_message_at')[:5]
-            
-            # Add unread count to each conversation
-            for conversation in recent_conversations:
-                conversation.unread_count = conversation.get_unread_count(user)
-            
-            # Unread messages
-            unread_messages = Message.objects.filter(
-                conversation__employer=profile,
-                is_read=False
-            ).exclude(sender_user=user).count()
-            
+        if summary is not None:
             context = {
-                'profile': profile,
-                'needs_profile_setup': needs_setup,
-                'active_internships_count': active_internships.count(),
-                'active_internships': active_internships[:5],
-                'total_applications': total_applications,
-                'recent_applications': recent_applications,
-                'recent_conversations': recent_conversations,
-                'unread_messages': unread_messages,
+                'profile': summary.profile,
+                'needs_profile_setup': False,
+                'active_internships_count': summary.active_internships_count,
+                'active_internships': summary.active_internships,
+                'total_applications': summary.total_applications,
+                'recent_applications': summary.recent_applications,
+                'recent_conversations': summary.recent_conversations,
+                'unread_messages': get_unread_badges(user)['messages'],
             }
         else:
             context = {
-                'profile': profile,
-                'needs_profile_setup': needs_setup,
+                'profile': None,
+                'needs_profile_setup': True,
             }
         
         return render(request, 'core/dashboard/employer_dashboard.html', context)
@@ -208,7 +156,7 @@ def intern_profile_view(request):
         'documents': documents,
         'education': education,
         'work_experience': work_experience,
-        'completion_percentage': profile.get_profile_completion_percentage(),
+        'completion_percentage': profile.profile_completion,
     }
     
     return render(request, 'core/profiles/intern_profile.html', context)
@@ -449,6 +397,7 @@ def work_experience_delete_view(request, experience_id):
 # =====================================================
 
 from .services.matching import InternshipMatchingService, InternMatchingService
+from .services.filters import InternshipFilterPipeline
 
 
 @login_required
@@ -477,54 +426,10 @@ def intern_explore_view(request):
     has_filters = any(request.GET.values())
     
     if has_filters:
-        # Use search/filter (same as internship_list_view)
-        internships = InternshipPost.objects.filter(
-            is_published=True,
-            is_active=True
-        ).select_related('employer', 'employer__user', 'industry')
-        
+        # Use the shared filter pipeline (same as internship_list_view)
         form = InternshipSearchForm(request.GET)
-        
-        if form.is_valid():
-            # Text search
-            query = form.cleaned_data.get('query')
-            if query:
-                internships = internships.filter(
-                    Q(title__icontains=query) |
-                    Q(description__icontains=query) |
-                    Q(employer__company_name__icontains=query)
-                )
-            
-            # Filter by skills
-            skills = form.cleaned_data.get('skills')
-            if skills:
-                for skill in skills:
-                    internships = internships.filter(skills_required=skill)
-            
-            # Filter by industry
-            industry = form.cleaned_data.get('industry')
-            if industry:
-                internships = internships.filter(industry=industry)
-            
-            # Filter by province
-            province = form.cleaned_data.get('province')
-            if province:
-                internships = internships.filter(province=province)
-            
-            # Filter by minimum stipend
-            stipend_min = form.cleaned_data.get('stipend_min')
-            if stipend_min:
-                internships = internships.filter(stipend__gte=stipend_min)
-            
-            # Filter by maximum duration
-            duration_max = form.cleaned_data.get('duration_max')
-            if duration_max:
-                internships = internships.filter(duration_months__lte=duration_max)
-        
-        # Pagination
-        paginator = Paginator(internships, 12)
-        page_number = request.GET.get('page')
-        page_obj = paginator.get_page(page_number)
+        pipeline = InternshipFilterPipeline.from_form(form)
+        page_obj = pipeline.paginate(12, request.GET.get('page'))
         
         matched_internships = [(internship, None) for internship in page_obj]
         show_match_scores = False
@@ -636,7 +541,7 @@ def messages_list(request):
             intern_profile = InternProfile.objects.get(user=request.user)
             conversations = Conversation.objects.filter(
                 intern=intern_profile
-            ).select_related('employer', 'employer__user').prefetch_related('messages')
+            ).select_related('employer', 'employer__user')
         except InternProfile.DoesNotExist:
             conversations = []
     elif request.user.user_type == 'employer':
@@ -644,13 +549,13 @@ def messages_list(request):
             employer_profile = EmployerProfile.objects.get(user=request.user)
             conversations = Conversation.objects.filter(
                 employer=employer_profile
-            ).select_related('intern', 'intern__user').prefetch_related('messages')
+            ).select_related('intern', 'intern__user')
         except EmployerProfile.DoesNotExist:
             conversations = []
     else:
         conversations = []
     
-    # Add unread count to each conversation
+    # Unread counts come from the denormalized counters (no extra queries)
     conversations_with_unread = []
     for conv in conversations:
         unread_count = conv.get_unread_count(request.user)
@@ -665,6 +570,51 @@ def messages_list(request):
 
 
 from django.views.decorators.cache import never_cache
+import base64
+from django.utils.dateparse import parse_datetime
+from django.template.loader import render_to_string
+
+
+MESSAGES_PAGE_SIZE = 50
+
+
+def _encode_message_cursor(message):
+    """Opaque cursor pointing at a message by (sent_at, id)"""
+    raw = f"{message.sent_at.isoformat()}|{message.pk}"
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+
+def _decode_message_cursor(cursor):
+    """Return (sent_at, id) for a cursor, or None if it is malformed"""
+    try:
+        sent_at, pk = base64.urlsafe_b64decode(cursor.encode()).decode().split('|')
+        sent_at = parse_datetime(sent_at)
+        return (sent_at, int(pk)) if sent_at else None
+    except (ValueError, UnicodeError):
+        return None
+
+
+def _message_page(conversation, before=None):
+    """
+    One page of a conversation's messages, newest page first
+    
+    Walks the (conversation, sent_at) index backwards from the cursor with
+    a keyset condition on (sent_at, id), so opening a long thread costs the
+    same as a short one. Returns (messages oldest-first, cursor for the
+    next older page or None).
+    """
+    messages_qs = conversation.messages.select_related('sender_user').order_by('-sent_at', '-pk')
+    if before:
+        sent_at, pk = before
+        messages_qs = messages_qs.filter(Q(sent_at__lt=sent_at) | Q(sent_at=sent_at, pk__lt=pk))
+    
+    page = list(messages_qs[:MESSAGES_PAGE_SIZE + 1])
+    has_older = len(page) > MESSAGES_PAGE_SIZE
+    page = page[:MESSAGES_PAGE_SIZE]
+    page.reverse()
+    
+    older_cursor = _encode_message_cursor(page[0]) if has_older else None
+    return page, older_cursor
 
 
 @login_required
@@ -689,8 +639,8 @@ def conversation_detail_view(request, conversation_id):
     else:
         return HttpResponseForbidden()
     
-    # Get all messages ordered by sent time (oldest first for chronological display)
-    chat_messages = conversation.messages.all().select_related('sender_user').order_by('sent_at')
+    # Latest page of messages (oldest first for chronological display)
+    chat_messages, older_cursor = _message_page(conversation)
     
     # Mark messages as read
     conversation.mark_messages_as_read(request.user)
@@ -710,11 +660,6 @@ def conversation_detail_view(request, conversation_id):
             new_message.save()
             print(f"✅ Message saved! ID: {new_message.pk}")
             
-            # Update conversation's last_message_at manually (in case signal doesn't fire)
-            conversation.last_message_at = new_message.sent_at
-            conversation.save(update_fields=['last_message_at'])
-            print(f"✅ Conversation updated")
-            
             # Force redirect with GET to refresh the page and show new message
             messages.success(request, 'Message sent!')
             print(f"🔄 Redirecting to conversation detail...")
@@ -731,6 +676,7 @@ def conversation_detail_view(request, conversation_id):
     context = {
         'conversation': conversation,
         'chat_messages': chat_messages,  # Renamed to avoid conflict with Django messages
+        'older_cursor': older_cursor,
         'form': form,
         'is_employer': request.user.user_type == 'employer',
     }
@@ -738,6 +684,92 @@ def conversation_detail_view(request, conversation_id):
     return render(request, 'core/messages/conversation_detail.html', context)
 
 
+@login_required
+def conversation_history_view(request, conversation_id):
+    """
+    JSON fragment with an older page of messages
+    Used by the "Load older messages" button in conversation_detail_view
+    """
+    conversation = get_object_or_404(
+        Conversation.objects.select_related('intern', 'employer'),
+        pk=conversation_id
+    )
+    
+    # Check permissions
+    if request.user.user_type == 'intern':
+        if conversation.intern.user_id != request.user.pk:
+            return HttpResponseForbidden()
+    elif request.user.user_type == 'employer':
+        if conversation.employer.user_id != request.user.pk:
+            return HttpResponseForbidden()
+    else:
+        return HttpResponseForbidden()
+    
+    before = _decode_message_cursor(request.GET.get('before', ''))
+    if before is None:
+        return JsonResponse({'error': 'Invalid cursor'}, status=400)
+    
+    chat_messages, older_cursor = _message_page(conversation, before)
+    html = render_to_string(
+        'core/messages/message_bubbles.html',
+        {'chat_messages': chat_messages},
+        request=request
+    )
+    
+    return JsonResponse({
+        'html': html,
+        'older_cursor': older_cursor,
+    })
+
+
+from asgiref.sync import sync_to_async
+from .services.events import (
+    sse_response, last_event_id, conversation_channel, poll_conversation_messages
+)
+
+
+def _stream_conversation_for(request, conversation_id):
+    """Return the conversation if the user may stream it, otherwise None"""
+    user = request.user
+    if not user.is_authenticated:
+        return None
+    conversation = Conversation.objects.select_related('intern', 'employer').filter(
+        pk=conversation_id
+    ).first()
+    if conversation is None:
+        return None
+    if user.user_type == 'intern' and conversation.intern.user_id == user.pk:
+        return conversation
+    if user.user_type == 'employer' and conversation.employer.user_id == user.pk:
+        return conversation
+    return None
+
+
+def _latest_message_id(conversation):
+    return conversation.messages.order_by('-pk').values_list('pk', flat=True).first() or 0
+
+
+async def conversation_events_view(request, conversation_id):
+    """
+    Server-Sent Events stream of new messages in a conversation
+    Replaces reloading conversation_detail_view to see replies
+    """
+    conversation = await sync_to_async(_stream_conversation_for)(request, conversation_id)
+    if conversation is None:
+        return HttpResponseForbidden()
+    
+    last_id = last_event_id(request)
+    if last_id is None:
+        last_id = await sync_to_async(_latest_message_id)(conversation)
+    
+    return sse_response(
+        request,
+        conversation_channel(conversation.pk),
+        poll_conversation_messages(conversation.pk),
+        last_id
+    )
+
+
 @login_required
 def start_conversation_view(request, intern_username):
     """
@@ -796,60 +828,17 @@ from django.db.models import Q
 
 def internship_list_view(request):
     """Browse/search internships - available to all (interns browse, employers can view)"""
-    # Start with published and active internships
-    internships = InternshipPost.objects.filter(
-        is_published=True,
-        is_active=True
-    ).select_related('employer', 'employer__user', 'industry').prefetch_related('skills_required')
-    
     # Search and filter
     form = InternshipSearchForm(request.GET or None)
+    pipeline = InternshipFilterPipeline.from_form(form)
     
-    if form.is_valid():
-        # Text search
-        query = form.cleaned_data.get('query')
-        if query:
-            internships = internships.filter(
-                Q(title__icontains=query) |
-                Q(description__icontains=query) |
-                Q(employer__company_name__icontains=query)
-            )
-        
-        # Filter by skills
-        skills = form.cleaned_data.get('skills')
-        if skills:
-            for skill in skills:
-                internships = internships.filter(skills_required=skill)
-        
-        # Filter by industry
-        industry = form.cleaned_data.get('industry')
-        if industry:
-            internships = internships.filter(industry=industry)
-        
-        # Filter by province
-        province = form.cleaned_data.get('province')
-        if province:
-            internships = internships.filter(province=province)
-        
-        # Filter by minimum stipend
-        stipend_min = form.cleaned_data.get('stipend_min')
-        if stipend_min:
-            internships = internships.filter(stipend__gte=stipend_min)
-        
-        # Filter by maximum duration
-        duration_max = form.cleaned_data.get('duration_max')
-        if duration_max:
-            internships = internships.filter(duration_months__lte=duration_max)
-    
-    # Pagination
-    paginator = Paginator(internships, 12)  # 12 internships per page
-    page_number = request.GET.get('page')
-    page_obj = paginator.get_page(page_number)
+    # Pagination over cached result ids (12 internships per page)
+    page_obj = pipeline.paginate(12, request.GET.get('page'))
     
     context = {
         'form': form,
         'internships': page_obj,
-        'total_count': internships.count(),
+        'total_count': page_obj.paginator.count,
     }
     
     return render(request, 'core/internships/internship_list.html', context)
@@ -863,8 +852,8 @@ def internship_detail_view(request, pk):
         is_published=True
     )
     
-    # Increment view count
-    internship.increment_views()
+    # Count the view (buffered, one per session)
+    internship.increment_views(request)
     
     # Check if user has applied
     has_applied = False
@@ -968,21 +957,33 @@ def employer_internships_view(request):
     
     employer_profile = get_object_or_404(EmployerProfile, user=request.user)
     
-    # Get all internships (active and inactive) with optimized queries
-    internships = InternshipPost.objects.filter(
+    # One query: application counts come from the per-posting status counters
+    # (a few rows per posting) rather than from the applications themselves
+    from django.db.models import Sum
+    from django.db.models.functions import Coalesce
+    from applications.models import Application
+    
+    status_counts = {
+        f'{status}_count': Coalesce(Sum('status_counts__count', filter=Q(status_counts__status=status)), 0)
+        for status, label in Application.STATUS_CHOICES
+    }
+    internships = list(InternshipPost.objects.filter(
         employer=employer_profile
-    ).select_related('industry').prefetch_related('skills_required', 'applications').order_by('-created_at')
+    ).select_related('industry').annotate(
+        application_count=Coalesce(Sum('status_counts__count'), 0),
+        **status_counts
+    ).order_by('-created_at'))
     
-    # Separate by status
-    active_internships = internships.filter(is_active=True, is_published=True)
-    draft_internships = internships.filter(is_published=False)
-    closed_internships = internships.filter(is_active=False)
+    # Separate by status in Python (drafts that were closed appear in both lists)
+    active_internships = [i for i in internships if i.is_active and i.is_published]
+    draft_internships = [i for i in internships if not i.is_published]
+    closed_internships = [i for i in internships if not i.is_active]
     
     context = {
         'active_internships': active_internships,
         'draft_internships': draft_internships,
         'closed_internships': closed_internships,
-        'total_count': internships.count(),
+        'total_count': len(internships),
     }
     
     return render(request, 'core/internships/employer_internships.html', context)
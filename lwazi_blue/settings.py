@@ -47,6 +47,9 @@ ALLOWED_IMAGE_EXTENSIONS = ['jpg', 'jpeg', 'png', 'gif', 'webp']
 ALLOWED_DOCUMENT_EXTENSIONS = ['pdf', 'doc', 'docx', 'txt']
 MAX_FILE_SIZE = 5 * 1024 * 1024  # 5MB
 
+# Background workers that extract CV/transcript text for search
+DOCUMENT_EXTRACTION_WORKERS = int(os.getenv('DOCUMENT_EXTRACTION_WORKERS', 2))
+
 # Security Headers - Production only (HTTPS required)
 if DEBUG:
     print("Security Headers - Development", DEBUG)
@@ -72,6 +75,13 @@ else:
     SECURE_HSTS_INCLUDE_SUBDOMAINS = True
     SECURE_HSTS_PRELOAD = True
 
+# Shared cache for multi-process deployments (pip install redis), e.g.
+# CACHE_URL=redis://localhost:6379/1. Without it every process has its own
+# LocMem cache and signal invalidations only reach the process that handled
+# the write, so signal-maintained entries are kept short-lived.
+CACHE_URL = os.getenv('CACHE_URL', '')
+SHARED_CACHE = bool(CACHE_URL)
+
 # Cache timeouts for different content types
 CACHE_TTL = {
     # 'homepage': 60 * 15,  # 15 minutes
@@ -79,7 +89,10 @@ CACHE_TTL = {
     'blog_list': 60 * 10,  # 10 minutes
     'blog_detail': 60 * 30,  # 30 minutes
     'matching_results': 60 * 5,  # 5 minutes
-    'profile_completion': 60 * 60,  # 1 hour
+    'search_results': 60 * 5,  # 5 minutes
+    'unread_badges': 60 * 60 if SHARED_CACHE else 30,  # kept current by signals (in the shared cache)
+    'notification_preferences': 60,  # 1 minute (per-process cache; email paths always read the database)
+    'dashboard_summary': 60 * 5 if SHARED_CACHE else 30,  # invalidated by signals; matches follow the catalogue
 }
 
 
@@ -266,16 +279,39 @@ else:
 # CACHING CONFIGURATION
 # =====================================================
 
-CACHES = {
-    'default': {
-        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
-        'LOCATION': 'lwazi-blue-cache',
-        'OPTIONS': {
-            'MAX_ENTRIES': 1000,
+# 'view_counters' holds buffered view counts only, so other entries can't
+# push them out (see VIEW_COUNTERS)
+if SHARED_CACHE:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': CACHE_URL,
+            'TIMEOUT': 300,  # 5 minutes default
+        },
+        'view_counters': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': CACHE_URL,
+            'KEY_PREFIX': 'view_counters',
+        },
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            'LOCATION': 'lwazi-blue-cache',
+            'OPTIONS': {
+                'MAX_ENTRIES': 1000,
+            },
+            'TIMEOUT': 300,  # 5 minutes default
+        },
+        'view_counters': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            'LOCATION': 'lwazi-blue-view-counters',
+            'OPTIONS': {
+                'MAX_ENTRIES': 20000,
+            },
         },
-        'TIMEOUT': 300,  # 5 minutes default
     }
-}
 
 
 # Password validation (configured above in SECURITY SETTINGS)
@@ -339,9 +375,62 @@ EMAIL_USE_TLS = os.getenv('EMAIL_USE_TLS', 'True') == 'True'
 EMAIL_PORT = os.getenv('EMAIL_PORT', 587)
 EMAIL_HOST = os.getenv('EMAIL_HOST', 'smtp.gmail.com')
 
+# Absolute base for links in emails (digests)
+SITE_URL = os.getenv('SITE_URL', 'http://127.0.0.1:8000')
+
 # In development without credentials, emails will be printed to console
 # In production with credentials, emails will be sent via SMTP
 
+# Pooled SMTP connections kept by core.email_service.EmailService
+EMAIL_CONNECTION_POOL = {
+    'max_size': 2,  # idle connections kept open per process
+    'max_messages': 100,  # recycle a connection after this many messages
+    'max_idle': 60,  # seconds; most servers drop idle sessions soon after
+}
+
+# Email outbox (drained by: python manage.py send_queued_emails --loop)
+EMAIL_OUTBOX = {
+    'batch_size': 50,  # emails claimed per worker batch
+    'poll_interval': 5,  # seconds between polls when the outbox is empty
+    'rate_per_minute': 60,  # SMTP provider sending limit (0 = unlimited)
+    'max_attempts': 5,  # dead-letter after this many failed sends
+    'retry_backoff': 60,  # seconds before the first retry, doubled each attempt
+    'retry_backoff_max': 60 * 60,
+    'claim_timeout': 60 * 10,  # seconds before a crashed worker's claims are released
+    'message_coalesce_seconds': 120,  # new-message emails to one recipient are merged within this window
+    'send_high_priority_now': True,  # send confirmation/login codes right after commit, the worker retries failures
+    'send_now_workers': 2,  # background threads for those immediate sends, so requests never wait on SMTP
+}
+
+# Notification retention (python manage.py prune_notifications, run daily)
+NOTIFICATION_RETENTION = {
+    'read_days': 90,  # read notifications older than this are removed
+    'archive': False,  # copy to ArchivedNotification instead of discarding
+    'batch_size': 1000,  # rows per delete transaction
+    'batch_pause': 0.1,  # seconds between batches to keep lock time short
+    'collapse_min': 3,  # similar unread notifications needed before they are collapsed
+}
+
+# Live events (Server-Sent Events for messages and notifications)
+# Long-lived streams need the ASGI server (lwazi_blue.asgi); under WSGI the
+# endpoints answer one poll per reconnect instead.
+LIVE_EVENTS = {
+    'poll_interval': 15,  # seconds of silence before polling the database
+    'max_duration': 300,  # seconds before a stream is recycled
+    'retry_ms': 3000,  # browser reconnect delay
+}
+
+# Buffered view counters for internship and blog detail pages. Production needs
+# a shared cache alias (CACHE_URL) so the flush_view_counters cron job sees every
+# worker's buffer; with a per-process cache each web worker flushes its own
+# (checked by core.W001)
+VIEW_COUNTERS = {
+    'cache': 'view_counters',  # cache alias holding the buffered counts (dedup keys use 'default')
+    'flush_interval': 60,  # seconds between bulk writes of buffered views
+    'dedup_seconds': 60 * 30,  # repeat views from one session within this window count once (0 = off)
+    'key_timeout': 60 * 60 * 24,  # lifetime of an unflushed counter key
+}
+
 # Login/Logout URLs
 LOGIN_URL = 'accounts:login'
 LOGIN_REDIRECT_URL = 'core:dashboard'
@@ -1,10 +1,12 @@
 from django.contrib import admin
-from .models import Notification, NotificationPreference
+from .models import (
+    Notification, NotificationPreference, NotificationCounter, ArchivedNotification, EmailDigestItem
+)
 
 
 @admin.register(Notification)
 class NotificationAdmin(admin.ModelAdmin):
-    list_display = ['user', 'title', 'notification_type', 'is_read', 'created_at']
+    list_display = ['user', 'title', 'notification_type', 'is_read', 'collapsed_count', 'created_at']
     list_filter = ['notification_type', 'is_read', 'created_at']
     search_fields = ['user__username', 'title', 'message']
     readonly_fields = ['created_at', 'read_at']
@@ -14,19 +16,56 @@ class NotificationAdmin(admin.ModelAdmin):
     
     def mark_as_read(self, request, queryset):
         from django.utils import timezone
+        user_ids = set(queryset.values_list('user_id', flat=True))
         updated = queryset.update(is_read=True, read_at=timezone.now())
+        NotificationCounter.recompute(user_ids)
         self.message_user(request, f'{updated} notification(s) marked as read.')
     mark_as_read.short_description = 'Mark selected as read'
     
     def mark_as_unread(self, request, queryset):
+        user_ids = set(queryset.values_list('user_id', flat=True))
         updated = queryset.update(is_read=False, read_at=None)
+        NotificationCounter.recompute(user_ids)
         self.message_user(request, f'{updated} notification(s) marked as unread.')
     mark_as_unread.short_description = 'Mark selected as unread'
 
 
+@admin.register(NotificationCounter)
+class NotificationCounterAdmin(admin.ModelAdmin):
+    list_display = ['user', 'unread', 'total']
+    search_fields = ['user__username']
+    readonly_fields = ['user', 'unread', 'total']
+    
+    actions = ['recompute_counters']
+    
+    def recompute_counters(self, request, queryset):
+        rebuilt = NotificationCounter.recompute(queryset.values_list('user_id', flat=True))
+        self.message_user(request, f'{rebuilt} counter(s) rebuilt from notifications.')
+    recompute_counters.short_description = 'Rebuild selected counters'
+
+
+@admin.register(ArchivedNotification)
+class ArchivedNotificationAdmin(admin.ModelAdmin):
+    list_display = ['user', 'title', 'notification_type', 'created_at', 'archived_at']
+    list_filter = ['notification_type', 'created_at']
+    search_fields = ['user__username', 'title']
+    readonly_fields = ['created_at', 'read_at', 'archived_at']
+    date_hierarchy = 'created_at'
+
+
 @admin.register(NotificationPreference)
 class NotificationPreferenceAdmin(admin.ModelAdmin):
     list_display = ['user', 'email_application_submitted', 'email_new_message', 
+                    'application_email_frequency', 'message_email_frequency',
                     'internal_notifications']
-    list_filter = ['email_application_submitted', 'email_new_message', 'internal_notifications']
+    list_filter = ['email_application_submitted', 'email_new_message', 'internal_notifications',
+                   'application_email_frequency', 'message_email_frequency', 'internship_email_frequency']
     search_fields = ['user__username']
+
+
+@admin.register(EmailDigestItem)
+class EmailDigestItemAdmin(admin.ModelAdmin):
+    list_display = ['user', 'frequency', 'kind', 'title', 'created_at']
+    list_filter = ['frequency', 'kind', 'created_at']
+    search_fields = ['user__username', 'title']
+    readonly_fields = ['created_at']
@@ -13,6 +13,9 @@ class NotificationPreferenceForm(forms.ModelForm):
             'email_new_message',
             'email_matched_internships',
             'email_deadline_reminders',
+            'application_email_frequency',
+            'message_email_frequency',
+            'internship_email_frequency',
             'internal_notifications',
         ]
         widgets = {
@@ -21,6 +24,9 @@ class NotificationPreferenceForm(forms.ModelForm):
             'email_new_message': forms.CheckboxInput(attrs={'class': 'form-check-input'}),
             'email_matched_internships': forms.CheckboxInput(attrs={'class': 'form-check-input'}),
             'email_deadline_reminders': forms.CheckboxInput(attrs={'class': 'form-check-input'}),
+            'application_email_frequency': forms.Select(attrs={'class': 'form-select'}),
+            'message_email_frequency': forms.Select(attrs={'class': 'form-select'}),
+            'internship_email_frequency': forms.Select(attrs={'class': 'form-select'}),
             'internal_notifications': forms.CheckboxInput(attrs={'class': 'form-check-input'}),
         }
 
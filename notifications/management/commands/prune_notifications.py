@@ -0,0 +1,65 @@
+"""
+Management command to apply the notification retention policy
+"""
+
+from django.core.management.base import BaseCommand
+from notifications.services import NotificationService
+
+
+class Command(BaseCommand):
+    help = 'Delete or archive old read notifications in small batches and optionally collapse similar unread ones (schedule daily)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--days',
+            type=int,
+            default=None,
+            help='Remove read notifications older than this (default: NOTIFICATION_RETENTION["read_days"])'
+        )
+        parser.add_argument(
+            '--archive',
+            action='store_true',
+            default=None,
+            help='Copy notifications to ArchivedNotification before deleting them'
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=None,
+            help='Rows deleted per transaction (default: NOTIFICATION_RETENTION["batch_size"])'
+        )
+        parser.add_argument(
+            '--pause',
+            type=float,
+            default=None,
+            help='Seconds to sleep between batches (default: NOTIFICATION_RETENTION["batch_pause"])'
+        )
+        parser.add_argument(
+            '--collapse',
+            action='store_true',
+            help='Also fold runs of similar unread notifications into one'
+        )
+        parser.add_argument(
+            '--collapse-min',
+            type=int,
+            default=None,
+            help='Smallest run of similar unread notifications to collapse (default: NOTIFICATION_RETENTION["collapse_min"])'
+        )
+
+    def handle(self, *args, **options):
+        verb = 'Archived' if options['archive'] else 'Deleted'
+        self.stdout.write('Pruning read notifications...')
+        removed = NotificationService.prune_read_notifications(
+            days=options['days'],
+            archive=options['archive'],
+            batch_size=options['batch_size'],
+            pause=options['pause'],
+            progress=lambda total: self.stdout.write(f'  {verb} {total} so far')
+        )
+        self.stdout.write(self.style.SUCCESS(f'>> {verb} {removed} read notification(s)'))
+
+        if options['collapse']:
+            groups, rows = NotificationService.collapse_unread_notifications(options['collapse_min'])
+            self.stdout.write(self.style.SUCCESS(
+                f'>> Collapsed {rows} unread notification(s) into {groups} group(s)'
+            ))
@@ -0,0 +1,24 @@
+"""
+Management command to send hourly or daily notification email digests
+"""
+
+from django.core.management.base import BaseCommand
+from notifications.models import FREQUENCY_HOURLY, FREQUENCY_DAILY
+from notifications.services import NotificationService
+
+
+class Command(BaseCommand):
+    help = 'Queue one digest email per user from pending digest items (schedule hourly and daily)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'frequency',
+            choices=[FREQUENCY_HOURLY, FREQUENCY_DAILY],
+            help='Which digest to send'
+        )
+
+    def handle(self, *args, **options):
+        frequency = options['frequency']
+        self.stdout.write(f'Building {frequency} digests...')
+        digests, items = NotificationService.send_email_digests(frequency)
+        self.stdout.write(self.style.SUCCESS(f'>> Queued {digests} digest(s) covering {items} notification(s)'))
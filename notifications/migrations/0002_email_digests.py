@@ -0,0 +1,50 @@
+# Generated by Django 4.2.8 on 2026-10-19 01:22
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('notifications', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='notificationpreference',
+            name='application_email_frequency',
+            field=models.CharField(choices=[('immediate', 'Immediately'), ('hourly', 'Hourly digest'), ('daily', 'Daily digest')], default='immediate', help_text='Application submissions, new applicants and status updates', max_length=10),
+        ),
+        migrations.AddField(
+            model_name='notificationpreference',
+            name='internship_email_frequency',
+            field=models.CharField(choices=[('immediate', 'Immediately'), ('hourly', 'Hourly digest'), ('daily', 'Daily digest')], default='immediate', help_text='Matched internships and deadline reminders', max_length=10),
+        ),
+        migrations.AddField(
+            model_name='notificationpreference',
+            name='message_email_frequency',
+            field=models.CharField(choices=[('immediate', 'Immediately'), ('hourly', 'Hourly digest'), ('daily', 'Daily digest')], default='immediate', help_text='New messages', max_length=10),
+        ),
+        migrations.CreateModel(
+            name='EmailDigestItem',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('frequency', models.CharField(choices=[('hourly', 'Hourly digest'), ('daily', 'Daily digest')], max_length=10)),
+                ('kind', models.CharField(choices=[('application_submitted', 'Applications Submitted'), ('new_application', 'New Applicants'), ('application_status', 'Application Status Updates'), ('new_message', 'New Messages'), ('matched_internship', 'Matched Internships'), ('deadline_reminder', 'Deadline Reminders')], max_length=30)),
+                ('title', models.CharField(max_length=200)),
+                ('message', models.TextField(blank=True)),
+                ('link', models.CharField(blank=True, max_length=255)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='email_digest_items', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Email Digest Item',
+                'verbose_name_plural': 'Email Digest Items',
+                'ordering': ['user', 'created_at'],
+                'indexes': [models.Index(fields=['frequency', 'user'], name='notificatio_frequen_4302c8_idx')],
+            },
+        ),
+    ]
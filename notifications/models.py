@@ -1,6 +1,11 @@
 from django.db import models
 from django.conf import settings
+from django.core.cache import cache
 from django.utils import timezone
+from django.db.models import Count, Q
+from django.db.models.functions import Greatest
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
 
 
 class Notification(models.Model):
@@ -28,6 +33,8 @@ class Notification(models.Model):
     is_read = models.BooleanField(default=False)
     created_at = models.DateTimeField(auto_now_add=True)
     read_at = models.DateTimeField(null=True, blank=True)
+    # How many similar unread notifications this row stands for after compaction
+    collapsed_count = models.PositiveIntegerField(default=1)
     
     class Meta:
         verbose_name = 'Notification'
@@ -46,7 +53,16 @@ class Notification(models.Model):
         if not self.is_read:
             self.is_read = True
             self.read_at = timezone.now()
-            self.save(update_fields=['is_read', 'read_at'])
+            # Conditional update so a concurrent read can't decrement the counter twice
+            updated = Notification.objects.filter(pk=self.pk, is_read=False).update(
+                is_read=True,
+                read_at=self.read_at
+            )
+            if updated:
+                NotificationCounter.adjust(self.user_id, unread=-1)
+            
+            from core.services.badges import invalidate_unread_badges
+            invalidate_unread_badges(self.user_id, 'notifications')
     
     @property
     def type_icon(self):
@@ -61,6 +77,142 @@ class Notification(models.Model):
         return icons.get(self.notification_type, 'bi-bell')
 
 
+class NotificationCounter(models.Model):
+    """
+    Denormalized per-user notification counts
+    
+    Kept in step by the Notification signals and bulk paths so the
+    notification list and navbar badge read one row instead of counting.
+    A missing row is rebuilt from the Notification table on first read.
+    """
+    user = models.OneToOneField(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='notification_counter'
+    )
+    total = models.PositiveIntegerField(default=0)
+    unread = models.PositiveIntegerField(default=0)
+    
+    class Meta:
+        verbose_name = 'Notification Counter'
+        verbose_name_plural = 'Notification Counters'
+    
+    def __str__(self):
+        return f"{self.user_id}: {self.unread} unread of {self.total}"
+    
+    @classmethod
+    def adjust(cls, user_id, total=0, unread=0):
+        """Atomically shift a user's counters; a missing row is left to be rebuilt on read"""
+        cls.objects.filter(user_id=user_id).update(
+            total=Greatest(models.F('total') + total, models.Value(0)),
+            unread=Greatest(models.F('unread') + unread, models.Value(0))
+        )
+    
+    @classmethod
+    def counts_for(cls, user):
+        """(total, unread) for a user, one primary-key lookup when the row exists"""
+        user_id = getattr(user, 'pk', user)
+        counts = cls.objects.filter(user_id=user_id).values_list('total', 'unread').first()
+        if counts is None:
+            cls.recompute([user_id])
+            counts = cls.objects.filter(user_id=user_id).values_list('total', 'unread').first()
+        return counts
+    
+    @classmethod
+    def recompute(cls, user_ids):
+        """
+        Rebuild counters for the given users from Notification rows
+        One grouped count, then a bulk update of the existing rows and an
+        insert of the missing ones (ignore_conflicts, so a row created
+        concurrently is left alone). bulk_create(update_conflicts=...) would
+        be one statement but is not supported on MySQL.
+        Returns the number of users rebuilt
+        """
+        user_ids = set(user_ids)
+        if not user_ids:
+            return 0
+        counts = {
+            row['user_id']: row
+            for row in Notification.objects.filter(user_id__in=user_ids).order_by().values('user_id').annotate(
+                total=Count('pk'),
+                unread=Count('pk', filter=Q(is_read=False))
+            )
+        }
+        empty = {'total': 0, 'unread': 0}
+        counters = [
+            cls(user_id=user_id, total=counts.get(user_id, empty)['total'],
+                unread=counts.get(user_id, empty)['unread'])
+            for user_id in user_ids
+        ]
+        existing = set(cls.objects.filter(user_id__in=user_ids).values_list('user_id', flat=True))
+        cls.objects.bulk_update([c for c in counters if c.user_id in existing], ['total', 'unread'])
+        cls.objects.bulk_create([c for c in counters if c.user_id not in existing], ignore_conflicts=True)
+        
+        # Badges derived from the old counters are now stale
+        from core.services.badges import invalidate_unread_badges_many
+        invalidate_unread_badges_many(user_ids, 'notifications')
+        return len(user_ids)
+
+
+class ArchivedNotification(models.Model):
+    """
+    Read notifications moved out of the live table by the retention job
+    
+    Append-only and keyed by created_at, so it can be range-partitioned or
+    dumped and truncated by month without touching the Notification table.
+    """
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name='archived_notifications'
+    )
+    notification_type = models.CharField(
+        max_length=50,
+        choices=Notification.NOTIFICATION_TYPE_CHOICES
+    )
+    title = models.CharField(max_length=200)
+    message = models.TextField()
+    link = models.URLField(blank=True, null=True)
+    created_at = models.DateTimeField()
+    read_at = models.DateTimeField(null=True, blank=True)
+    archived_at = models.DateTimeField(auto_now_add=True)
+    
+    # Columns copied from Notification when archiving
+    COPIED_FIELDS = ('user_id', 'notification_type', 'title', 'message', 'link', 'created_at', 'read_at')
+    
+    class Meta:
+        verbose_name = 'Archived Notification'
+        verbose_name_plural = 'Archived Notifications'
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['created_at']),
+            models.Index(fields=['user', 'created_at']),
+        ]
+    
+    def __str__(self):
+        return f"{self.user_id} - {self.title} (archived)"
+
+
+FREQUENCY_IMMEDIATE = 'immediate'
+FREQUENCY_HOURLY = 'hourly'
+FREQUENCY_DAILY = 'daily'
+DIGEST_FREQUENCY_CHOICES = (
+    (FREQUENCY_HOURLY, 'Hourly digest'),
+    (FREQUENCY_DAILY, 'Daily digest'),
+)
+FREQUENCY_CHOICES = ((FREQUENCY_IMMEDIATE, 'Immediately'),) + DIGEST_FREQUENCY_CHOICES
+
+EMAIL_KIND_CHOICES = (
+    ('application_submitted', 'Applications Submitted'),
+    ('new_application', 'New Applicants'),
+    ('application_status', 'Application Status Updates'),
+    ('new_message', 'New Messages'),
+    ('matched_internship', 'Matched Internships'),
+    ('deadline_reminder', 'Deadline Reminders'),
+)
+
+
 class NotificationPreference(models.Model):
     """User preferences for notifications"""
     user = models.OneToOneField(
@@ -91,15 +243,165 @@ class NotificationPreference(models.Model):
         help_text='Receive email reminders about deadlines'
     )
     
+    # Email cadence per category: send each email straight away or batch into a digest
+    application_email_frequency = models.CharField(
+        max_length=10,
+        choices=FREQUENCY_CHOICES,
+        default=FREQUENCY_IMMEDIATE,
+        help_text='Application submissions, new applicants and status updates'
+    )
+    message_email_frequency = models.CharField(
+        max_length=10,
+        choices=FREQUENCY_CHOICES,
+        default=FREQUENCY_IMMEDIATE,
+        help_text='New messages'
+    )
+    internship_email_frequency = models.CharField(
+        max_length=10,
+        choices=FREQUENCY_CHOICES,
+        default=FREQUENCY_IMMEDIATE,
+        help_text='Matched internships and deadline reminders'
+    )
+    
     # Internal notification preference
     internal_notifications = models.BooleanField(
         default=True,
         help_text='Receive internal notifications in the platform'
     )
     
+    # Email kind -> (opt-in flag or None if always on, cadence field)
+    EMAIL_KINDS = {
+        'application_submitted': ('email_application_submitted', 'application_email_frequency'),
+        'application_status': ('email_application_status', 'application_email_frequency'),
+        'new_application': (None, 'application_email_frequency'),
+        'new_message': ('email_new_message', 'message_email_frequency'),
+        'matched_internship': ('email_matched_internships', 'internship_email_frequency'),
+        'deadline_reminder': ('email_deadline_reminders', 'internship_email_frequency'),
+    }
+    
     class Meta:
         verbose_name = 'Notification Preference'
         verbose_name_plural = 'Notification Preferences'
     
     def __str__(self):
         return f"{self.user.username}'s Notification Preferences"
+    
+    @staticmethod
+    def cache_key(user_id):
+        return f'notification_prefs:{user_id}'
+    
+    @classmethod
+    def for_user(cls, user, fresh=False):
+        """
+        Get (or create) a user's preferences, served from the cache
+        
+        Every notification path asks for preferences, so after the first
+        lookup they cost no queries until the row is saved again. The cache
+        is per process and save() only clears the saving process's copy, so
+        entries are short-lived; email paths pass fresh=True to read the
+        database, an opt-out must never be missed there.
+        """
+        user_id = getattr(user, 'pk', user)
+        prefs = None if fresh else cache.get(cls.cache_key(user_id))
+        if prefs is None:
+            prefs, created = cls.objects.get_or_create(user_id=user_id)
+            cls.cache_preferences([prefs])
+        return prefs
+    
+    @classmethod
+    def for_users(cls, user_ids, fresh=False):
+        """
+        Preferences for many users: {user_id: prefs}
+        
+        Cache hits first (skipped with fresh=True, see for_user), then one
+        query for the rest; rows that don't exist yet are created with
+        bulk_create(ignore_conflicts=True) and re-read.
+        """
+        user_ids = list(user_ids)
+        preferences = {}
+        if not fresh:
+            keys = {cls.cache_key(user_id): user_id for user_id in user_ids}
+            preferences = {keys[key]: prefs for key, prefs in cache.get_many(keys).items()}
+        
+        missing = [user_id for user_id in user_ids if user_id not in preferences]
+        if missing:
+            loaded = {prefs.user_id: prefs for prefs in cls.objects.filter(user_id__in=missing)}
+            new_ids = [user_id for user_id in missing if user_id not in loaded]
+            if new_ids:
+                cls.objects.bulk_create([cls(user_id=user_id) for user_id in new_ids], ignore_conflicts=True)
+                # Re-read so cached rows carry their pk (and any concurrently created values)
+                loaded.update({prefs.user_id: prefs for prefs in cls.objects.filter(user_id__in=new_ids)})
+            cls.cache_preferences(loaded.values())
+            preferences.update(loaded)
+        return preferences
+    
+    @classmethod
+    def cache_preferences(cls, preferences):
+        timeout = getattr(settings, 'CACHE_TTL', {}).get('notification_preferences', 60)
+        cache.set_many({cls.cache_key(prefs.user_id): prefs for prefs in preferences}, timeout)
+    
+    def email_frequency(self, kind):
+        """Cadence for an email kind, or None if the user opted out of it"""
+        flag, frequency_field = self.EMAIL_KINDS[kind]
+        if flag and not getattr(self, flag):
+            return None
+        return getattr(self, frequency_field)
+
+
+class EmailDigestItem(models.Model):
+    """A notification email held back for the user's next hourly or daily digest"""
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name='email_digest_items'
+    )
+    frequency = models.CharField(max_length=10, choices=DIGEST_FREQUENCY_CHOICES)
+    kind = models.CharField(max_length=30, choices=EMAIL_KIND_CHOICES)
+    title = models.CharField(max_length=200)
+    message = models.TextField(blank=True)
+    link = models.CharField(max_length=255, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    
+    class Meta:
+        verbose_name = 'Email Digest Item'
+        verbose_name_plural = 'Email Digest Items'
+        ordering = ['user', 'created_at']
+        indexes = [
+            models.Index(fields=['frequency', 'user']),
+        ]
+    
+    def __str__(self):
+        return f"{self.user.username} ({self.frequency}): {self.title}"
+
+
+@receiver(post_save, sender=Notification)
+def update_notification_badge(sender, instance, created, **kwargs):
+    """Keep the counters and cached unread badge in step with new rows"""
+    if created:
+        NotificationCounter.adjust(instance.user_id, total=1, unread=0 if instance.is_read else 1)
+        if not instance.is_read:
+            from core.services.badges import increment_unread_badge
+            increment_unread_badge(instance.user_id, 'notifications')
+
+
+@receiver(post_save, sender=Notification)
+def publish_notification_event(sender, instance, created, **kwargs):
+    """Push new notifications to the user's open streams"""
+    if created:
+        from core.services.events import notification_channel, notification_event, publish_on_commit
+        publish_on_commit(notification_channel(instance.user_id), notification_event(instance))
+
+
+@receiver(post_delete, sender=Notification)
+def invalidate_notification_badge(sender, instance, **kwargs):
+    """Deleted notifications may have been counted as unread"""
+    NotificationCounter.adjust(instance.user_id, total=-1, unread=0 if instance.is_read else -1)
+    from core.services.badges import invalidate_unread_badges
+    invalidate_unread_badges(instance.user_id, 'notifications')
+
+
+@receiver(post_save, sender=NotificationPreference)
+@receiver(post_delete, sender=NotificationPreference)
+def invalidate_notification_preferences(sender, instance, **kwargs):
+    """Drop the cached preferences so the next lookup sees the change"""
+    cache.delete(NotificationPreference.cache_key(instance.user_id))
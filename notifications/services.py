@@ -3,8 +3,22 @@ Notification Service for Lwazi Blue
 Handles creation and management of internal and email notifications
 """
 
+import time
+from datetime import timedelta
+from itertools import groupby
+from operator import attrgetter
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import Count, F, Max
 from django.utils import timezone
-from .models import Notification, NotificationPreference
+from core.services.badges import invalidate_unread_badges
+from core.services.events import notification_channel, notification_event, publish_on_commit
+from core.services.outbox import queue_template_email, queue_template_emails
+from .models import (
+    Notification, NotificationPreference, NotificationCounter, ArchivedNotification, EmailDigestItem,
+    FREQUENCY_IMMEDIATE, EMAIL_KIND_CHOICES
+)
 
 
 class NotificationService:
@@ -16,8 +30,8 @@ class NotificationService:
         Create an internal notification
         Check user preferences before creating
         """
-        # Get or create user preferences
-        prefs, created = NotificationPreference.objects.get_or_create(user=user)
+        # Cached user preferences
+        prefs = NotificationPreference.for_user(user)
         
         # Check if user wants internal notifications
         if prefs.internal_notifications:
@@ -31,6 +45,48 @@ class NotificationService:
             return notification
         return None
     
+    @staticmethod
+    def create_notifications_bulk(users, notification_type, title, message, link=None, batch_size=1000):
+        """
+        Create the same internal notification for many users
+        
+        Preferences come from the cache with one query per batch for the
+        rest (missing rows created in bulk), opted-out users are filtered in
+        memory and notifications inserted with bulk_create. Accepts users or
+        user ids.
+        
+        Returns:
+            list: The created notifications
+        """
+        user_ids = list(dict.fromkeys(getattr(user, 'pk', user) for user in users))
+        created = []
+        
+        for start in range(0, len(user_ids), batch_size):
+            batch_ids = user_ids[start:start + batch_size]
+            preferences = NotificationPreference.for_users(batch_ids)
+            recipients = [user_id for user_id in batch_ids if preferences[user_id].internal_notifications]
+            created.extend(NotificationService._insert_notifications([
+                Notification(
+                    user_id=user_id,
+                    notification_type=notification_type,
+                    title=title,
+                    message=message,
+                    link=link
+                )
+                for user_id in recipients
+            ]))
+        return created
+    
+    @staticmethod
+    def _insert_notifications(notifications):
+        """bulk_create notifications and do the counter, badge and live-event work post_save would"""
+        created = Notification.objects.bulk_create(notifications)
+        NotificationCounter.recompute({n.user_id for n in created})
+        for notification in created:
+            if notification.pk:
+                publish_on_commit(notification_channel(notification.user_id), notification_event(notification))
+        return created
+    
     @staticmethod
     def send_application_notification(application):
         """Create notification for application submission"""
@@ -53,6 +109,25 @@ class NotificationService:
             link=f'/applications/{application.pk}/'
         )
     
+    @staticmethod
+    def send_status_update_notifications(applications):
+        """
+        Status update notifications for many applications in one insert
+        Applications need intern and internship loaded
+        """
+        preferences = NotificationPreference.for_users({a.intern.user_id for a in applications})
+        return NotificationService._insert_notifications([
+            Notification(
+                user_id=application.intern.user_id,
+                notification_type='application_status_update',
+                title='Application Status Updated',
+                message=f'Your application for {application.internship.title} status: {application.get_status_display()}',
+                link=f'/applications/{application.pk}/'
+            )
+            for application in applications
+            if preferences[application.intern.user_id].internal_notifications
+        ])
+    
     @staticmethod
     def send_message_notification(message):
         """Create notification for new message"""
@@ -96,8 +171,261 @@ class NotificationService:
     @staticmethod
     def mark_all_as_read(user):
         """Mark all notifications as read for a user"""
-        return Notification.objects.filter(user=user, is_read=False).update(
+        updated = Notification.objects.filter(user=user, is_read=False).update(
             is_read=True,
             read_at=timezone.now()
         )
-
+        if updated:
+            NotificationCounter.adjust(user.pk, unread=-updated)
+        invalidate_unread_badges(user.pk, 'notifications')
+        return updated
+    
+    # =====================================================
+    # RETENTION
+    # =====================================================
+    
+    @staticmethod
+    def _delete_rows(pks):
+        """
+        Delete notifications by primary key in a single statement
+        
+        A plain DELETE rather than QuerySet.delete(): the post_delete receiver
+        would make Django fetch the rows and send one signal (one counter
+        update) each. Nothing references notifications, so there is nothing
+        to cascade; callers rebuild the affected users' counters once per
+        batch instead.
+        """
+        if not pks:
+            return 0
+        quote = connection.ops.quote_name
+        table, pk = quote(Notification._meta.db_table), quote(Notification._meta.pk.column)
+        placeholders = ', '.join(['%s'] * len(pks))
+        with connection.cursor() as cursor:
+            cursor.execute(f'DELETE FROM {table} WHERE {pk} IN ({placeholders})', list(pks))
+            return cursor.rowcount
+    
+    @staticmethod
+    def prune_read_notifications(days=None, archive=None, batch_size=None, pause=None, progress=None):
+        """
+        Delete (or archive) read notifications older than `days`
+        
+        Works in short transactions of at most batch_size rows picked by
+        primary key, pausing between batches, so the table is never locked
+        for long and replicas can keep up.
+        
+        Args:
+            progress: Optional callable(rows removed so far) after each batch
+        
+        Returns:
+            int: Number of notifications removed
+        """
+        config = getattr(settings, 'NOTIFICATION_RETENTION', {})
+        days = config.get('read_days', 90) if days is None else days
+        archive = config.get('archive', False) if archive is None else archive
+        batch_size = batch_size or config.get('batch_size', 1000)
+        pause = config.get('batch_pause', 0.1) if pause is None else pause
+        
+        stale = Notification.objects.filter(
+            is_read=True,
+            created_at__lt=timezone.now() - timedelta(days=days)
+        ).order_by('pk')
+        fields = ('pk',) + ArchivedNotification.COPIED_FIELDS
+        removed = 0
+        
+        while True:
+            with transaction.atomic():
+                rows = list(stale.values(*fields)[:batch_size])
+                if not rows:
+                    break
+                if archive:
+                    ArchivedNotification.objects.bulk_create([
+                        ArchivedNotification(**{field: row[field] for field in ArchivedNotification.COPIED_FIELDS})
+                        for row in rows
+                    ])
+                NotificationService._delete_rows([row['pk'] for row in rows])
+                NotificationCounter.recompute({row['user_id'] for row in rows})
+            
+            removed += len(rows)
+            if progress:
+                progress(removed)
+            if len(rows) < batch_size:
+                break
+            if pause:
+                time.sleep(pause)
+        return removed
+    
+    @staticmethod
+    def collapse_unread_notifications(min_group=None):
+        """
+        Fold runs of similar unread notifications into their newest row
+        
+        Unread notifications with the same user, type, title and link (e.g.
+        twelve "New message from X") become one row whose collapsed_count
+        records how many it stands for. Groups are read batch_size at a time
+        (keyed on their newest row), so no cursor stays open while rows are
+        deleted.
+        
+        Returns:
+            tuple: (groups collapsed, rows removed)
+        """
+        config = getattr(settings, 'NOTIFICATION_RETENTION', {})
+        min_group = min_group or config.get('collapse_min', 3)
+        batch_size = config.get('batch_size', 1000)
+        
+        groups = Notification.objects.filter(is_read=False).order_by().values(
+            'user_id', 'notification_type', 'title', 'link'
+        ).annotate(
+            rows=Count('pk'),
+            latest=Max('pk')
+        ).filter(rows__gte=min_group).order_by('latest')
+        
+        collapsed = removed = 0
+        last_latest = 0
+        while True:
+            batch = list(groups.filter(latest__gt=last_latest)[:batch_size])
+            for group in batch:
+                with transaction.atomic():
+                    # Re-check inside the transaction, rows may have been read meanwhile
+                    siblings = Notification.objects.filter(
+                        user_id=group['user_id'],
+                        notification_type=group['notification_type'],
+                        title=group['title'],
+                        is_read=False,
+                        pk__lt=group['latest']
+                    )
+                    if group['link'] is None:
+                        siblings = siblings.filter(link__isnull=True)
+                    else:
+                        siblings = siblings.filter(link=group['link'])
+                    rows = list(siblings.select_for_update().values_list('pk', 'collapsed_count'))
+                    if not rows:
+                        continue
+                    
+                    updated = Notification.objects.filter(pk=group['latest'], is_read=False).update(
+                        collapsed_count=F('collapsed_count') + sum(count for pk, count in rows)
+                    )
+                    if not updated:
+                        continue
+                    NotificationService._delete_rows([pk for pk, count in rows])
+                    NotificationCounter.adjust(group['user_id'], total=-len(rows), unread=-len(rows))
+                    invalidate_unread_badges(group['user_id'], 'notifications')
+                collapsed += 1
+                removed += len(rows)
+            if len(batch) < batch_size:
+                return collapsed, removed
+            last_latest = batch[-1]['latest']
+    
+    # =====================================================
+    # EMAIL NOTIFICATIONS
+    # =====================================================
+    
+    @staticmethod
+    def get_email_frequency(user, kind):
+        """Cadence for an email kind ('immediate', 'hourly', 'daily') or None if opted out"""
+        return NotificationPreference.for_user(user, fresh=True).email_frequency(kind)
+    
+    @staticmethod
+    def add_to_digest(user, frequency, kind, title, message='', link=''):
+        """Hold a notification email for the user's next digest"""
+        return EmailDigestItem.objects.create(
+            user=user,
+            frequency=frequency,
+            kind=kind,
+            title=title,
+            message=message,
+            link=link or ''
+        )
+    
+    @staticmethod
+    def send_email_notification(user, kind, subject, template_name, context, summary='', link=''):
+        """
+        Email a user according to their preferences
+        
+        Immediate emails are rendered from template_name (with link added to
+        the context) and queued; digest subscribers get a digest item instead.
+        Returns the cadence used, or None if opted out.
+        """
+        if not user.email:
+            return None
+        
+        frequency = NotificationService.get_email_frequency(user, kind)
+        if frequency == FREQUENCY_IMMEDIATE:
+            queue_template_email(user.email, subject, template_name, {**context, 'link': link})
+        elif frequency:
+            NotificationService.add_to_digest(user, frequency, kind, subject, summary, link)
+        return frequency
+    
+    @staticmethod
+    def send_email_notifications(kind, template_name, entries):
+        """
+        send_email_notification for many users at once
+        
+        Preferences are read from the database in one batch, immediate emails
+        are rendered in one pass and queued with a single insert, digest items
+        likewise.
+        
+        Args:
+            entries: Iterable of (user, subject, context, summary, link)
+        
+        Returns:
+            tuple: (emails queued, digest items added)
+        """
+        entries = [entry for entry in entries if entry[0].email]
+        preferences = NotificationPreference.for_users({user.pk for user, *rest in entries}, fresh=True)
+        immediate = []
+        digest_items = []
+        for user, subject, context, summary, link in entries:
+            frequency = preferences[user.pk].email_frequency(kind)
+            if frequency == FREQUENCY_IMMEDIATE:
+                immediate.append((user.email, subject, {**context, 'link': link}))
+            elif frequency:
+                digest_items.append(EmailDigestItem(
+                    user=user, frequency=frequency, kind=kind,
+                    title=subject, message=summary, link=link or ''
+                ))
+        
+        if immediate:
+            queue_template_emails(template_name, immediate)
+        EmailDigestItem.objects.bulk_create(digest_items)
+        return len(immediate), len(digest_items)
+    
+    @staticmethod
+    def send_email_digests(frequency):
+        """
+        Queue one digest email per user for all pending items of a cadence
+        
+        Items of kinds the user has opted out of since they were added are
+        dropped (preferences read from the database).
+        
+        Returns:
+            tuple: (digests queued, items included)
+        """
+        items = EmailDigestItem.objects.filter(
+            frequency=frequency
+        ).select_related('user').order_by('user_id', 'created_at')
+        
+        kind_order = [kind for kind, label in EMAIL_KIND_CHOICES]
+        items = list(items)
+        preferences = NotificationPreference.for_users({item.user_id for item in items}, fresh=True)
+        digests = []
+        item_ids = []
+        for user_id, user_items in groupby(items, key=attrgetter('user_id')):
+            user_items = list(user_items)
+            item_ids.extend(item.pk for item in user_items)
+            user = user_items[0].user
+            user_items = [item for item in user_items if preferences[user_id].email_frequency(item.kind)]
+            if not user.email or not user_items:
+                continue
+            # Sections in a fixed order, oldest first within each
+            user_items.sort(key=lambda item: kind_order.index(item.kind))
+            digests.append((
+                user.email,
+                f'Your {frequency} Lwazi Blue digest: {len(user_items)} update(s)',
+                {'user': user, 'items': user_items},
+            ))
+        
+        with transaction.atomic():
+            queue_template_emails('emails/notification_digest.html', digests, {'frequency': frequency})
+            # Only delete what was read, anything added meanwhile waits for the next run
+            EmailDigestItem.objects.filter(pk__in=item_ids).delete()
+        return len(digests), sum(len(context['items']) for _, _, context in digests)
@@ -8,5 +8,6 @@ urlpatterns = [
     path('settings/', views.notification_settings, name='settings'),
     path('<int:pk>/mark-read/', views.mark_read, name='mark_read'),
     path('mark-all-read/', views.mark_all_read, name='mark_all_read'),
+    path('events/', views.notification_events, name='events'),
 ]
 
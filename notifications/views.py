@@ -2,8 +2,12 @@ from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib.auth.decorators import login_required
 from django.contrib import messages
 from django.core.paginator import Paginator
-from django.http import JsonResponse
-from .models import Notification, NotificationPreference
+from django.http import JsonResponse, HttpResponseForbidden
+from asgiref.sync import sync_to_async
+from core.services.events import (
+    sse_response, last_event_id, notification_channel, poll_user_notifications
+)
+from .models import Notification, NotificationPreference, NotificationCounter
 from .forms import NotificationPreferenceForm
 from .services import NotificationService
 
@@ -20,15 +24,15 @@ def notification_list(request):
     elif filter_type == 'read':
         notifications = notifications.filter(is_read=True)
     
-    # Pagination
+    # Counts from the maintained counters instead of COUNT queries
+    total_count, unread_count = NotificationCounter.counts_for(request.user)
+    
+    # Pagination (the paginator's count comes from the counters too)
     paginator = Paginator(notifications, 20)
+    paginator.count = {'unread': unread_count, 'read': total_count - unread_count}.get(filter_type, total_count)
     page_number = request.GET.get('page')
     page_obj = paginator.get_page(page_number)
     
-    # Counts
-    unread_count = Notification.objects.filter(user=request.user, is_read=False).count()
-    total_count = Notification.objects.filter(user=request.user).count()
-    
     context = {
         'notifications': page_obj,
         'filter_type': filter_type,
@@ -66,7 +70,7 @@ def mark_all_read(request):
 @login_required
 def notification_settings(request):
     """Manage notification preferences"""
-    prefs, created = NotificationPreference.objects.get_or_create(user=request.user)
+    prefs = NotificationPreference.for_user(request.user)
     
     if request.method == 'POST':
         form = NotificationPreferenceForm(request.POST, instance=prefs)
@@ -78,3 +82,32 @@ def notification_settings(request):
         form = NotificationPreferenceForm(instance=prefs)
     
     return render(request, 'notifications/notification_settings.html', {'form': form})
+
+
+def _stream_user_id(request):
+    """Authenticated user id for the notification stream, or None"""
+    return request.user.pk if request.user.is_authenticated else None
+
+
+def _latest_notification_id(user_id):
+    return Notification.objects.filter(user_id=user_id).order_by('-pk').values_list(
+        'pk', flat=True
+    ).first() or 0
+
+
+async def notification_events(request):
+    """Server-Sent Events stream of the user's new notifications"""
+    user_id = await sync_to_async(_stream_user_id)(request)
+    if user_id is None:
+        return HttpResponseForbidden()
+    
+    last_id = last_event_id(request)
+    if last_id is None:
+        last_id = await sync_to_async(_latest_notification_id)(user_id)
+    
+    return sse_response(
+        request,
+        notification_channel(user_id),
+        poll_user_notifications(user_id),
+        last_id
+    )